@@ -0,0 +1,171 @@
+import re
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+from .config import (
+    ADMISSION_SENDER_RATE, ADMISSION_SENDER_BURST, ADMISSION_MAX_SENDERS,
+    ADMISSION_MAX_IN_FLIGHT, ADMISSION_MAX_SHED_IN_FLIGHT, ADMISSION_MAX_EMERGENCY_IN_FLIGHT,
+    ADMISSION_EMERGENCY_KEYWORDS,
+)
+from .metrics import ADMISSION_IN_FLIGHT
+
+# Admission decisions
+ADMITTED = "admitted"      # full FAQ → Gemini → Rasa pipeline
+EMERGENCY = "emergency"    # full pipeline regardless of rate limits and load, up to its own cap
+EMERGENCY_SHED = "emergency_shed"  # emergency past its cap: canned reply pointing to 108, never dropped
+SHED = "shed"              # saturated: local FAQ match or a canned busy reply
+THROTTLED = "throttled"    # sender over its rate: one canned slow-down notice
+DROPPED = "dropped"        # no reply at all
+
+BUSY_REPLIES = {
+    "en": "We're receiving a very large number of messages right now. Please try again in a few minutes. "
+          "In a medical emergency, call 108 immediately.",
+    "hi": "अभी बहुत अधिक संदेश आ रहे हैं। कृपया कुछ मिनट बाद फिर से प्रयास करें। "
+          "मेडिकल इमरजेंसी में तुरंत 108 पर कॉल करें।",
+    "or": "ବର୍ତ୍ତମାନ ବହୁତ ଅଧିକ ବାର୍ତ୍ତା ଆସୁଛି। ଦୟାକରି କିଛି ମିନିଟ୍ ପରେ ପୁଣି ଚେଷ୍ଟା କରନ୍ତୁ। "
+          "ମେଡିକାଲ ଜରୁରୀକାଳୀନ ପରିସ୍ଥିତିରେ ତୁରନ୍ତ 108 କୁ କଲ କରନ୍ତୁ।",
+}
+EMERGENCY_REPLIES = {
+    "en": "If this is a medical emergency, call 108 for an ambulance immediately. "
+          "We're receiving a very large number of messages and can't answer in detail right now.",
+    "hi": "यदि यह मेडिकल इमरजेंसी है, तो एम्बुलेंस के लिए तुरंत 108 पर कॉल करें। "
+          "अभी बहुत अधिक संदेश आ रहे हैं, इसलिए हम अभी विस्तार से उत्तर नहीं दे सकते।",
+    "or": "ଯଦି ଏହା ମେଡିକାଲ ଜରୁରୀକାଳୀନ ପରିସ୍ଥିତି, ତେବେ ଆମ୍ବୁଲାନ୍ସ ପାଇଁ ତୁରନ୍ତ 108 କୁ କଲ କରନ୍ତୁ। "
+          "ବର୍ତ୍ତମାନ ବହୁତ ଅଧିକ ବାର୍ତ୍ତା ଆସୁଛି, ତେଣୁ ଆମେ ଏବେ ବିସ୍ତାରରେ ଉତ୍ତର ଦେଇପାରୁନାହୁଁ।",
+}
+THROTTLED_REPLIES = {
+    "en": "You're sending messages faster than we can answer. Please wait a moment before sending more. "
+          "In a medical emergency, call 108 immediately.",
+    "hi": "आप बहुत तेज़ी से संदेश भेज रहे हैं। कृपया और संदेश भेजने से पहले थोड़ा रुकें। "
+          "मेडिकल इमरजेंसी में तुरंत 108 पर कॉल करें।",
+    "or": "ଆପଣ ବହୁତ ଶୀଘ୍ର ବାର୍ତ୍ତା ପଠାଉଛନ୍ତି। ଦୟାକରି ଆଉ ପଠାଇବା ପୂର୍ବରୁ ଟିକେ ଅପେକ୍ଷା କରନ୍ତୁ। "
+          "ମେଡିକାଲ ଜରୁରୀକାଳୀନ ପରିସ୍ଥିତିରେ ତୁରନ୍ତ 108 କୁ କଲ କରନ୍ତୁ।",
+}
+
+
+def emergency_pattern(keywords: List[str]) -> Optional["re.Pattern"]:
+    """Whole-word, case-insensitive match of any keyword ("108" must not match "91081...")"""
+    if not keywords:
+        return None
+    alternatives = "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True))
+    return re.compile(rf"(?<!\w)(?:{alternatives})(?!\w)", re.IGNORECASE)
+
+
+class AdmissionController:
+    """
+    Decides, before any reply work is scheduled, how an inbound message is answered.
+
+    Each sender has a token bucket (`rate` per second, bursts of `burst`); buckets live in
+    an LRU bounded by `max_senders`. At most `max_in_flight` messages run the full answer
+    pipeline at once; past that they get a cheap reply, itself capped at `max_shed`
+    concurrent replies, and anything beyond is dropped. A sender over its rate gets one
+    notice and is then dropped until a token is free again. Emergency messages skip the
+    sender bucket and the caps above and are never dropped; at most `max_emergency` of them
+    run the full pipeline at once, the rest get a canned reply pointing to 108.
+    """
+
+    def __init__(self, rate: float = ADMISSION_SENDER_RATE, burst: float = ADMISSION_SENDER_BURST,
+                 max_senders: int = ADMISSION_MAX_SENDERS, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT,
+                 max_shed: int = ADMISSION_MAX_SHED_IN_FLIGHT,
+                 max_emergency: int = ADMISSION_MAX_EMERGENCY_IN_FLIGHT,
+                 emergency_keywords: List[str] = ADMISSION_EMERGENCY_KEYWORDS):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_senders = max(1, max_senders)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_shed = max(0, max_shed)
+        self.max_emergency = max(0, max_emergency)
+        self._emergency = emergency_pattern(emergency_keywords)
+        # sender -> [tokens, updated_at, notified], least recently seen first
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self.in_flight = 0
+        self.shed_in_flight = 0
+        self.emergency_in_flight = 0
+        self.counts = {d: 0 for d in (ADMITTED, EMERGENCY, EMERGENCY_SHED, SHED, THROTTLED, DROPPED)}
+
+    def is_emergency(self, text: str) -> bool:
+        return self._emergency is not None and self._emergency.search(text) is not None
+
+    def _take_token(self, sender: str) -> Optional[bool]:
+        """True if the sender had a token; otherwise False the first time, None after that"""
+        if self.rate <= 0:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.get(sender)
+        if bucket is None:
+            bucket = self._buckets[sender] = [self.burst, now, False]
+            while len(self._buckets) > self.max_senders:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(sender)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            bucket[2] = False
+            return True
+        if bucket[2]:
+            return None
+        bucket[2] = True
+        return False
+
+    def admit(self, sender: str, text: str) -> str:
+        """
+        Decision for one message. ADMITTED, EMERGENCY and SHED/THROTTLED/EMERGENCY_SHED hold
+        a full, emergency or cheap slot respectively, which the caller must give back with
+        `release`.
+        """
+        if self.is_emergency(text):
+            decision = EMERGENCY if self.emergency_in_flight < self.max_emergency else EMERGENCY_SHED
+        else:
+            token = self._take_token(sender)
+            if token is None:
+                decision = DROPPED
+            elif not token:
+                decision = THROTTLED if self.shed_in_flight < self.max_shed else DROPPED
+            elif self.in_flight < self.max_in_flight:
+                decision = ADMITTED
+            else:
+                decision = SHED if self.shed_in_flight < self.max_shed else DROPPED
+
+        if decision == ADMITTED:
+            self.in_flight += 1
+            ADMISSION_IN_FLIGHT.labels("full").inc()
+        elif decision == EMERGENCY:
+            self.emergency_in_flight += 1
+            ADMISSION_IN_FLIGHT.labels("emergency").inc()
+        elif decision in (SHED, THROTTLED, EMERGENCY_SHED):
+            self.shed_in_flight += 1
+            ADMISSION_IN_FLIGHT.labels("shed").inc()
+        self.counts[decision] += 1
+        return decision
+
+    def release(self, decision: str):
+        if decision == ADMITTED:
+            self.in_flight -= 1
+            ADMISSION_IN_FLIGHT.labels("full").dec()
+        elif decision == EMERGENCY:
+            self.emergency_in_flight -= 1
+            ADMISSION_IN_FLIGHT.labels("emergency").dec()
+        elif decision in (SHED, THROTTLED, EMERGENCY_SHED):
+            self.shed_in_flight -= 1
+            ADMISSION_IN_FLIGHT.labels("shed").dec()
+
+    def stats(self) -> dict:
+        return {
+            "sender_rate_per_sec": self.rate,
+            "sender_burst": self.burst,
+            "senders_tracked": len(self._buckets),
+            "max_senders": self.max_senders,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "shed_in_flight": self.shed_in_flight,
+            "max_shed_in_flight": self.max_shed,
+            "emergency_in_flight": self.emergency_in_flight,
+            "max_emergency_in_flight": self.max_emergency,
+            "decisions": dict(self.counts),
+        }
+
+
+admission = AdmissionController()
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from datetime import timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .config import ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL, ANSWER_CACHE_PERSIST
+from .db import get_cached_answer, put_cached_answer, run_db
+from .keyword_matcher import WORD_CHARS
+
+logger = logging.getLogger(__name__)
+
+# Indic vowel signs and viramas are part of the word: "दिल" and "दाल" must not collide
+_PUNCT_RE = re.compile(f"[^{WORD_CHARS}\\s]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def cache_key(question: str, language: str = "en") -> str:
+    """Normalized cache key: case-folded, punctuation stripped, whitespace collapsed"""
+    text = _PUNCT_RE.sub(" ", question.casefold())
+    return f"{language}:{_SPACES_RE.sub(' ', text).strip()}"
+
+
+class AnswerCache:
+    """
+    LRU + TTL cache for generated answers with single-flight de-duplication.
+
+    Concurrent misses for the same key share one upstream call. With `persist` enabled,
+    entries are written through to the CachedAnswer table so they survive restarts.
+    """
+
+    def __init__(self, max_entries: int = ANSWER_CACHE_SIZE, ttl: float = ANSWER_CACHE_TTL,
+                 persist: bool = ANSWER_CACHE_PERSIST):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.persist = persist
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            answer, expires_at = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return answer
+            del self._entries[key]
+            self.expirations += 1
+
+        if self.persist:
+            try:
+                stored = await run_db(get_cached_answer, key, self.ttl)
+            except Exception as e:
+                logger.warning(f"Answer cache read failed: {e}")
+                stored = None
+            if stored is not None:
+                created = stored.created_at.replace(tzinfo=timezone.utc).timestamp()
+                self._store(key, stored.answer, created + self.ttl)
+                self.persistent_hits += 1
+                return stored.answer
+        return None
+
+    async def put(self, key: str, answer: str):
+        self._store(key, answer, time.time() + self.ttl)
+        if self.persist:
+            try:
+                await run_db(put_cached_answer, key, answer)
+            except Exception as e:
+                logger.warning(f"Answer cache write failed: {e}")
+
+    def _store(self, key: str, answer: str, expires_at: float):
+        self._entries[key] = (answer, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        """
+        Return the cached answer for `key`, or run `compute` once for all concurrent callers.
+        The upstream call runs as its own task, so a caller giving up (e.g. a hedged request
+        that lost) neither cancels it for the others nor loses the result for the cache.
+        Empty results are not cached.
+        """
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(self._compute(key, compute))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._in_flight[key] = task
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Optional[str]]]) -> Optional[str]:
+        try:
+            answer = await compute()
+            if answer:
+                await self.put(key, answer)
+            return answer
+        finally:
+            self._in_flight.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.persistent_hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "persistent": self.persist,
+            "hits": self.hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "in_flight": len(self._in_flight),
+            "hit_rate": round((lookups - self.misses) / lookups, 4) if lookups else 0.0,
+        }
+
+
+answer_cache = AnswerCache()
@@ -0,0 +1,402 @@
+import asyncio
+import inspect
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from .config import (
+    BROADCAST_CONCURRENCY, WHATSAPP_RATE_PER_SEC, TELEGRAM_RATE_PER_SEC, BROADCAST_LEDGER_BATCH,
+)
+from .db import (
+    create_broadcast_run, get_broadcast_run, list_broadcast_runs, set_broadcast_run_status,
+    pending_deliveries, record_deliveries, reset_failed_deliveries, delivery_stats, run_db,
+)
+from .messaging_utils import send_whatsapp_cloud, send_telegram
+from .metrics import BROADCAST_MESSAGES, BROADCASTS_RUNNING
+
+logger = logging.getLogger(__name__)
+
+Sender = Callable[[str, str], Awaitable[dict]]
+
+# Public channel names accepted by the API, mapped to the sender that serves them
+CHANNEL_ALIASES = {
+    "whatsapp": "whatsapp",
+    "sms": "whatsapp",
+    "telegram": "telegram",
+    "tg": "telegram",
+}
+
+# How many finished jobs to keep around for status lookups
+MAX_TRACKED_JOBS = 100
+
+
+class TokenBucket:
+    """
+    Async token bucket: allows `rate` acquisitions per second with bursts up to `capacity`.
+    A rate <= 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastJob:
+    """Progress of a single broadcast; counters are updated live while it runs."""
+
+    def __init__(self, text: str, channel: str, total: int, job_id: Optional[str] = None,
+                 created_at: Optional[datetime] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.text = text
+        self.channel = channel
+        self.total = total
+        self.sent = 0
+        self.failed = 0
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created_at = created_at or datetime.utcnow()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Audience segments: {"language", "region", "channel", "text"} plus a "recipients"
+        # count once seeded; a single unfiltered segment means every subscriber
+        self.segments: List[dict] = [{"language": None, "region": None, "channel": None, "text": text}]
+        # Deliveries already done before this run started, and whether this run only
+        # retries failures of a broadcast that had already completed (set when resuming)
+        self.resumed_from = 0
+        self.retry = False
+
+    @classmethod
+    def from_run(cls, run, stats: dict) -> "BroadcastJob":
+        """Rebuild a job from its BroadcastRun row and ledger counts"""
+        job = cls(run.text, run.channel, run.total, job_id=run.id, created_at=run.created_at)
+        job.sent = stats.get("sent", 0)
+        job.failed = stats.get("failed", 0)
+        job.status = run.status
+        job.error = run.error
+        if run.segments:
+            job.segments = json.loads(run.segments)
+        job.resumed_from = job.done
+        return job
+
+    @property
+    def done(self) -> int:
+        return self.sent + self.failed
+
+    def to_dict(self) -> dict:
+        elapsed = None
+        rate = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.monotonic()) - self.started_at
+            rate = round((self.done - self.resumed_from) / elapsed, 2) if elapsed > 0 else None
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "channel": self.channel,
+            "total": self.total,
+            "sent": self.sent,
+            "failed": self.failed,
+            "pending": max(self.total - self.done, 0),
+            "created_at": self.created_at.isoformat(),
+            "elapsed_seconds": round(elapsed, 3) if elapsed is not None else None,
+            "messages_per_second": rate,
+            "segments": [
+                {key: segment.get(key) for key in ("language", "region", "channel", "recipients")}
+                for segment in self.segments
+            ],
+            "error": self.error,
+        }
+
+
+def _message_id(result: dict) -> Optional[str]:
+    """Upstream message id from a sender result (WhatsApp Cloud or Telegram response)"""
+    meta = result.get("meta") or {}
+    messages = meta.get("messages")
+    if messages:
+        return messages[0].get("id")
+    message = meta.get("result")
+    if isinstance(message, dict) and "message_id" in message:
+        return str(message["message_id"])
+    return None
+
+
+class BroadcastEngine:
+    """
+    Fans a broadcast out to recipients with bounded concurrency and per-channel rate limits.
+
+    Every broadcast is backed by a delivery ledger (one Delivery row per recipient):
+    recipients are seeded up front, workers pull pending rows in keyset batches, and
+    outcomes are written back `ledger_batch` at a time. Pausing, a failure or a restart
+    leaves unsent rows pending, and `resume` picks up from exactly those. A crash can
+    resend at most the unflushed outcomes of one batch.
+
+    Jobs run in the background; `get_job` returns live counters.
+    """
+
+    def __init__(
+        self,
+        senders: Optional[Dict[str, Sender]] = None,
+        rates: Optional[Dict[str, float]] = None,
+        concurrency: int = BROADCAST_CONCURRENCY,
+        on_complete: Optional[Callable[[BroadcastJob], Optional[Awaitable[None]]]] = None,
+        ledger_batch: int = BROADCAST_LEDGER_BATCH,
+    ):
+        self.senders = senders or {"whatsapp": send_whatsapp_cloud, "telegram": send_telegram}
+        rates = rates or {"whatsapp": WHATSAPP_RATE_PER_SEC, "telegram": TELEGRAM_RATE_PER_SEC}
+        self.buckets = {name: TokenBucket(rate) for name, rate in rates.items()}
+        self.concurrency = max(1, concurrency)
+        self.on_complete = on_complete
+        self.ledger_batch = max(1, ledger_batch)
+        self.jobs: "OrderedDict[str, BroadcastJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._pausing: set = set()
+
+    def _resolve(self, channel: str) -> str:
+        resolved = CHANNEL_ALIASES.get(channel.lower())
+        if resolved is None or resolved not in self.senders:
+            raise ValueError(f"Unknown channel: {channel}")
+        return resolved
+
+    def _schedule(self, job: BroadcastJob, channel: str, recipients: Optional[Iterable[str]] = None,
+                  resuming: bool = False):
+        task = asyncio.create_task(self.run(job, channel, recipients, resuming))
+        self._tasks[job.id] = task
+        task.add_done_callback(lambda _t, job_id=job.id: self._tasks.pop(job_id, None))
+        self._track(job)
+
+    def _segments(self, text: str, segments: Optional[List[dict]], channel: str) -> List[dict]:
+        """
+        Normalize audience segments. A segment's `channel` selects subscribers who prefer
+        that channel and sends through it; without one the broadcast's resolved `channel`
+        is used, so subscribers registered on another channel are never messaged through it.
+        """
+        if not segments:
+            return [{"language": None, "region": None, "channel": channel, "text": text}]
+        normalized = []
+        for segment in segments:
+            segment_channel = segment.get("channel")
+            normalized.append({
+                "language": segment.get("language") or None,
+                "region": segment.get("region") or None,
+                "channel": self._resolve(segment_channel) if segment_channel else channel,
+                "text": segment.get("text") or text,
+            })
+        return normalized
+
+    def start(self, text: str, channel: str, recipients: Optional[Iterable[str]] = None, total: int = 0,
+              segments: Optional[List[dict]] = None) -> BroadcastJob:
+        """
+        Register a job and schedule it on the running loop. Returns immediately.
+
+        Recipients are selected from the subscriber table by `segments` when the job
+        starts, unless an explicit `recipients` iterable is given. `total` is an estimate
+        until the ledger has been seeded.
+        """
+        resolved = self._resolve(channel)
+        job = BroadcastJob(text, channel, total)
+        job.segments = self._segments(text, segments, resolved)
+        if recipients is not None and len(job.segments) > 1:
+            raise ValueError("Explicit recipients can't be combined with several segments")
+        self._schedule(job, resolved, recipients)
+        return job
+
+    def pause(self, job_id: str) -> Optional[BroadcastJob]:
+        """Ask a running job to stop after its in-flight sends; pending deliveries stay queued"""
+        job = self.jobs.get(job_id)
+        if job is not None and job_id in self._tasks:
+            self._pausing.add(job_id)
+        return job
+
+    async def resume(self, job_id: str, retry_failed: bool = False) -> Optional[BroadcastJob]:
+        """
+        Continue a paused, failed or interrupted broadcast from its pending deliveries.
+        With `retry_failed`, deliveries that failed are sent again as well.
+        """
+        if job_id in self._tasks:
+            raise ValueError("Broadcast is already running")
+        run = await run_db(get_broadcast_run, job_id)
+        if run is None:
+            return None
+        if run.status == "completed" and not retry_failed:
+            raise ValueError("Broadcast already completed")
+        if retry_failed:
+            await run_db(reset_failed_deliveries, job_id)
+        # Mark it running first, so a crash from here on is resumed on the next start
+        await run_db(set_broadcast_run_status, job_id, "running")
+        job = BroadcastJob.from_run(run, await run_db(delivery_stats, job_id))
+        job.retry = run.status == "completed"
+        job.status = "queued"
+        job.error = None
+        self._schedule(job, self._resolve(run.resolved_channel), resuming=True)
+        return job
+
+    async def resume_interrupted(self) -> int:
+        """Resume every broadcast a previous process left 'running'; returns how many"""
+        runs = await run_db(list_broadcast_runs, ["running"])
+        for run in runs:
+            if run.id not in self._tasks:
+                await self.resume(run.id)
+        return len(runs)
+
+    async def stop(self):
+        """Cancel running jobs without changing their ledger status, so they resume on restart"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def run(self, job: BroadcastJob, channel: str, recipients: Optional[Iterable[str]] = None,
+                  resuming: bool = False):
+        """
+        Seed the ledger (skipped when resuming), then send each pending delivery its
+        segment's text over its segment's channel, using `concurrency` workers sharing
+        one ledger cursor.
+        """
+        routes = []
+        for segment in job.segments:
+            route = segment.get("channel") or channel
+            routes.append((
+                self.senders[route], self.buckets.get(route), segment["text"],
+                BROADCAST_MESSAGES.labels(route, "sent"), BROADCAST_MESSAGES.labels(route, "failed"),
+            ))
+        queue: "deque[Tuple[str, int]]" = deque()
+        cursor = {"after": None, "exhausted": False}
+        fetch_lock = asyncio.Lock()
+        results: List[dict] = []
+
+        async def next_recipient() -> Optional[Tuple[str, int]]:
+            while not queue:
+                if cursor["exhausted"]:
+                    return None
+                async with fetch_lock:
+                    if queue or cursor["exhausted"]:
+                        continue
+                    batch = await run_db(pending_deliveries, job.id, cursor["after"], self.ledger_batch)
+                    if batch:
+                        cursor["after"] = batch[-1][0]
+                        queue.extend(batch)
+                    else:
+                        cursor["exhausted"] = True
+            return queue.popleft()
+
+        async def flush():
+            nonlocal results
+            if results:
+                batch, results = results, []
+                await run_db(record_deliveries, job.id, batch)
+
+        async def worker():
+            while job.id not in self._pausing:
+                item = await next_recipient()
+                if item is None:
+                    return
+                recipient, segment = item
+                sender, bucket, text, sent_metric, failed_metric = routes[segment]
+                if bucket:
+                    await bucket.acquire()
+                try:
+                    result = await sender(recipient, text)
+                except Exception as e:
+                    logger.error(f"Failed to send to {recipient}: {e}")
+                    result = {"status": "error", "reason": str(e)}
+                if result.get("status") == "sent":
+                    job.sent += 1
+                    sent_metric.inc()
+                    results.append({"recipient": recipient, "status": "sent", "message_id": _message_id(result)})
+                else:
+                    job.failed += 1
+                    failed_metric.inc()
+                    results.append({"recipient": recipient, "status": "failed",
+                                    "error": str(result.get("reason") or result.get("status"))[:500]})
+                if len(results) >= self.ledger_batch:
+                    await flush()
+
+        ledger_status = None
+        try:
+            if not resuming:
+                counts = await run_db(
+                    create_broadcast_run, job.id, job.text, job.channel, channel, job.segments,
+                    recipients, self.ledger_batch,
+                )
+                for segment, count in zip(job.segments, counts):
+                    segment["recipients"] = count
+                job.total = sum(counts)
+            job.status = "running"
+            job.started_at = time.monotonic()
+            BROADCASTS_RUNNING.labels().inc()
+            try:
+                await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+            finally:
+                BROADCASTS_RUNNING.labels().dec()
+                await flush()
+            job.status = "paused" if job.id in self._pausing else "completed"
+            ledger_status = job.status
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Broadcast {job.id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+            ledger_status = "failed"
+        finally:
+            self._pausing.discard(job.id)
+            job.finished_at = time.monotonic()
+            if ledger_status is not None:
+                try:
+                    await run_db(set_broadcast_run_status, job.id, ledger_status, job.error)
+                except Exception as e:
+                    logger.error(f"Could not record status of broadcast {job.id}: {e}")
+            if self.on_complete:
+                try:
+                    result = self.on_complete(job)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception as e:
+                    logger.error(f"Broadcast completion hook failed: {e}")
+
+        logger.info(
+            f"Broadcast {job.id} {job.status} - Channel: {job.channel}, "
+            f"Sent: {job.sent}, Failed: {job.failed}, Total: {job.total}"
+        )
+        return job
+
+    def get_job(self, job_id: str) -> Optional[BroadcastJob]:
+        return self.jobs.get(job_id)
+
+    async def load_job(self, job_id: str) -> Optional[BroadcastJob]:
+        """Tracked job, or one rebuilt from the ledger for broadcasts no longer in memory"""
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+        run = await run_db(get_broadcast_run, job_id)
+        if run is None:
+            return None
+        return BroadcastJob.from_run(run, await run_db(delivery_stats, job_id))
+
+    def _track(self, job: BroadcastJob):
+        self.jobs[job.id] = job
+        if len(self.jobs) <= MAX_TRACKED_JOBS:
+            return
+        finished = [jid for jid, j in self.jobs.items() if jid not in self._tasks]
+        for job_id in finished[: len(self.jobs) - MAX_TRACKED_JOBS]:
+            self.jobs.pop(job_id)
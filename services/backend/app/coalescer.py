@@ -0,0 +1,117 @@
+import asyncio
+import inspect
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .config import COALESCE_WINDOW_MS, COALESCE_MAX_WAIT_MS, COALESCE_MAX_FRAGMENTS, COALESCE_MAX_SENDERS
+from .metrics import COALESCED_FRAGMENTS, COALESCE_FLUSHES, COALESCE_WAIT_SECONDS
+
+# handler(sender, combined text, channel, message id); may return an awaitable
+Handler = Callable[[str, str, str, Optional[str]], Optional[Awaitable]]
+
+
+class _Buffer:
+    __slots__ = ("fragments", "message_id", "first_at", "timer")
+
+    def __init__(self, message_id: Optional[str]):
+        self.fragments: List[str] = []
+        self.message_id = message_id
+        self.first_at = time.monotonic()
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class MessageCoalescer:
+    """
+    Per-sender debounce for messages split over several sends ("hi" / "my child has
+    fever" / "what to do"). Each fragment restarts the sender's `window`; when it passes
+    quietly, the fragments go to `handler` as one newline-joined query, keyed by the first
+    fragment's message id. The wait is capped at `max_wait` from the first fragment, and
+    urgent fragments (emergencies) flush the buffer at once.
+
+    Buffered fragments live only in memory; they are answered on stop, but a crash
+    within the wait loses them.
+    """
+
+    def __init__(self, handler: Handler, window_ms: float = COALESCE_WINDOW_MS,
+                 max_wait_ms: float = COALESCE_MAX_WAIT_MS, max_fragments: int = COALESCE_MAX_FRAGMENTS,
+                 max_senders: int = COALESCE_MAX_SENDERS):
+        self.handler = handler
+        self.window = max(0.0, window_ms) / 1000
+        self.max_wait = max(self.window, max_wait_ms / 1000)
+        self.max_fragments = max(1, max_fragments)
+        self.max_senders = max(0, max_senders)
+        self._buffers: Dict[Tuple[str, str], _Buffer] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.fragments = 0
+        self.queries = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def add(self, channel: str, sender: str, text: str, message_id: Optional[str] = None, urgent: bool = False):
+        """Buffer one message; the handler runs once the sender's buffer is flushed"""
+        key = (channel, sender)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            if len(self._buffers) >= self.max_senders:
+                buffer = _Buffer(message_id)
+                buffer.fragments.append(text)
+                self.fragments += 1
+                self._dispatch(channel, sender, buffer, "overflow")
+                return
+            buffer = self._buffers[key] = _Buffer(message_id)
+        buffer.fragments.append(text)
+        self.fragments += 1
+
+        if urgent:
+            self._flush(key, "urgent")
+        elif len(buffer.fragments) >= self.max_fragments:
+            self._flush(key, "max_fragments")
+        else:
+            if buffer.timer is not None:
+                buffer.timer.cancel()
+            remaining = buffer.first_at + self.max_wait - time.monotonic()
+            reason = "window" if self.window < remaining else "max_wait"
+            buffer.timer = asyncio.get_running_loop().call_later(
+                max(0.0, min(self.window, remaining)), self._flush, key, reason
+            )
+
+    def _flush(self, key: Tuple[str, str], reason: str):
+        buffer = self._buffers.pop(key, None)
+        if buffer is None:
+            return
+        if buffer.timer is not None:
+            buffer.timer.cancel()
+        self._dispatch(key[0], key[1], buffer, reason)
+
+    def _dispatch(self, channel: str, sender: str, buffer: _Buffer, reason: str):
+        self.queries += 1
+        COALESCED_FRAGMENTS.labels(channel).observe(len(buffer.fragments))
+        COALESCE_FLUSHES.labels(channel, reason).inc()
+        COALESCE_WAIT_SECONDS.labels(channel).observe(time.monotonic() - buffer.first_at)
+        result = self.handler(sender, "\n".join(buffer.fragments), channel, buffer.message_id)
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def stop(self):
+        """Answer everything still buffered and wait for running handlers"""
+        for key in list(self._buffers):
+            self._flush(key, "shutdown")
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "window_ms": self.window * 1000,
+            "max_wait_ms": self.max_wait * 1000,
+            "max_fragments": self.max_fragments,
+            "buffering_senders": len(self._buffers),
+            "fragments": self.fragments,
+            "queries": self.queries,
+            "fragments_per_query": round(self.fragments / self.queries, 3) if self.queries else 0.0,
+            "running": len(self._tasks),
+        }
@@ -9,5 +9,141 @@ RASA_BASE_URL = os.getenv("RASA_BASE_URL", "http://localhost:5005")
 # SQLite database file
 SQLITE_DB = os.getenv("SQLITE_DB", "subscribers.db")
 
+# SQLite tuning: WAL journal, synchronous level (NORMAL is safe with WAL), lock wait,
+# page cache per connection, and pooled connections (DB workers + streaming exports)
+SQLITE_WAL = os.getenv("SQLITE_WAL", "true").lower() in ("1", "true", "yes")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "16384"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+# Threads running db helpers off the event loop. SQLite has a single writer, and extra
+# threads mostly contend for the GIL with the loop, so one is the default.
+DB_WORKERS = int(os.getenv("DB_WORKERS", "1"))
+
 # Google Gemini API key (from .env)
 GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY", "")
+
+# Broadcast fan-out: max in-flight sends and per-channel send rates (msgs/sec).
+# Defaults follow the WhatsApp Cloud API (80 msg/s per number) and Telegram
+# Bot API (30 msg/s per bot) documented limits.
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "50"))
+WHATSAPP_RATE_PER_SEC = float(os.getenv("WHATSAPP_RATE_PER_SEC", "80"))
+TELEGRAM_RATE_PER_SEC = float(os.getenv("TELEGRAM_RATE_PER_SEC", "30"))
+# Delivery ledger: recipients fetched/recorded per batch (also the most that can be resent
+# after a crash), and whether broadcasts interrupted by a restart resume on startup
+BROADCAST_LEDGER_BATCH = int(os.getenv("BROADCAST_LEDGER_BATCH", "500"))
+BROADCAST_AUTO_RESUME = os.getenv("BROADCAST_AUTO_RESUME", "true").lower() in ("1", "true", "yes")
+
+# Outbound reply queue: worker count, retry policy (seconds) and idle poll interval
+OUTBOUND_WORKERS = int(os.getenv("OUTBOUND_WORKERS", "4"))
+OUTBOUND_MAX_ATTEMPTS = int(os.getenv("OUTBOUND_MAX_ATTEMPTS", "5"))
+OUTBOUND_BACKOFF_BASE = float(os.getenv("OUTBOUND_BACKOFF_BASE", "2.0"))
+OUTBOUND_BACKOFF_MAX = float(os.getenv("OUTBOUND_BACKOFF_MAX", "300"))
+OUTBOUND_POLL_INTERVAL = float(os.getenv("OUTBOUND_POLL_INTERVAL", "1.0"))
+
+# Upstream HTTP pools: per-upstream request timeout (seconds) and max connections
+GRAPH_API_TIMEOUT = float(os.getenv("GRAPH_API_TIMEOUT", "10"))
+TELEGRAM_API_TIMEOUT = float(os.getenv("TELEGRAM_API_TIMEOUT", "10"))
+# Bot API base URL (override to point at a local Bot API server or a test stub)
+TELEGRAM_API_BASE_URL = os.getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org")
+RASA_TIMEOUT = float(os.getenv("RASA_TIMEOUT", "10"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "20"))
+UPSTREAM_MAX_CONNECTIONS = int(os.getenv("UPSTREAM_MAX_CONNECTIONS", "100"))
+
+# Circuit breaker: consecutive failures before opening, seconds before a trial call
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# FAQ similarity retrieval: minimum cosine similarity to answer without Gemini, and how
+# much of it must come from n-grams the runner-up topic doesn't have
+FAQ_RETRIEVAL_THRESHOLD = float(os.getenv("FAQ_RETRIEVAL_THRESHOLD", "0.55"))
+FAQ_RETRIEVAL_MARGIN = float(os.getenv("FAQ_RETRIEVAL_MARGIN", "0.08"))
+
+# Gemini answer cache: max in-memory entries, TTL (seconds), SQLite persistence on/off
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2000"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "21600"))
+ANSWER_CACHE_PERSIST = os.getenv("ANSWER_CACHE_PERSIST", "true").lower() in ("1", "true", "yes")
+
+# Gemini: model name and max concurrent calls (each runs on a dedicated worker thread)
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "8"))
+
+# Answer resolution after the FAQ tiers: "sequential" (Gemini, then Rasa) or "hedged"
+# (start Rasa too if Gemini hasn't answered within RESOLVER_HEDGE_DELAY seconds).
+# Budgets cap the total seconds spent per channel before giving up.
+RESOLVER_MODE = os.getenv("RESOLVER_MODE", "sequential")
+RESOLVER_HEDGE_DELAY = float(os.getenv("RESOLVER_HEDGE_DELAY", "2.0"))
+RESOLVER_BUDGETS = {
+    "whatsapp": float(os.getenv("RESOLVER_BUDGET_WHATSAPP", "15")),
+    "telegram": float(os.getenv("RESOLVER_BUDGET_TELEGRAM", "15")),
+    "web": float(os.getenv("RESOLVER_BUDGET_WEB", "10")),
+}
+# Seconds of each budget held back for Rasa: Gemini is given up on after
+# min(GEMINI_TIMEOUT, budget - RESOLVER_RASA_RESERVE), but never less than half the budget
+RESOLVER_RASA_RESERVE = float(os.getenv("RESOLVER_RASA_RESERVE", "4"))
+
+# Inbound webhook de-duplication: message ids remembered for WEBHOOK_DEDUP_TTL seconds,
+# at most WEBHOOK_DEDUP_SIZE in memory; persist to SQLite to survive restarts
+WEBHOOK_DEDUP_TTL = float(os.getenv("WEBHOOK_DEDUP_TTL", "86400"))
+WEBHOOK_DEDUP_SIZE = int(os.getenv("WEBHOOK_DEDUP_SIZE", "50000"))
+WEBHOOK_DEDUP_PERSIST = os.getenv("WEBHOOK_DEDUP_PERSIST", "false").lower() in ("1", "true", "yes")
+
+# Telegram ingestion: "webhook" (Telegram pushes to /webhook/telegram) or "polling"
+# (getUpdates long-polling, for deployments Telegram can't reach). Poll timeout is the
+# long-poll hold time in seconds; limit is the max updates fetched per batch (1-100).
+TELEGRAM_INGESTION_MODE = os.getenv("TELEGRAM_INGESTION_MODE", "webhook").lower()
+TELEGRAM_POLL_TIMEOUT = int(os.getenv("TELEGRAM_POLL_TIMEOUT", "30"))
+TELEGRAM_POLL_LIMIT = int(os.getenv("TELEGRAM_POLL_LIMIT", "100"))
+
+# Subscriber bulk import: accepted language codes, country code added to bare 10-digit
+# numbers, rows per upsert transaction, and max per-row errors returned in the report
+SUPPORTED_LANGUAGES = [l.strip() for l in os.getenv("SUPPORTED_LANGUAGES", "en,hi,or").split(",") if l.strip()]
+DEFAULT_COUNTRY_CODE = os.getenv("DEFAULT_COUNTRY_CODE", "91")
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "5000"))
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+# Replies use the detected message language only at or above this confidence, else English
+LANGUAGE_MIN_CONFIDENCE = float(os.getenv("LANGUAGE_MIN_CONFIDENCE", "0.6"))
+
+# Per-sender sessions: max senders held in memory, idle seconds before a session leaves
+# memory (its conversation context is then dropped), turns (and characters per answer)
+# kept as Gemini context, seconds between write-behind flushes to SQLite, persistence
+# on/off, and days a stored language preference is kept
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SESSION_CONTEXT_TURNS = int(os.getenv("SESSION_CONTEXT_TURNS", "3"))
+SESSION_CONTEXT_CHARS = int(os.getenv("SESSION_CONTEXT_CHARS", "300"))
+SESSION_FLUSH_INTERVAL = float(os.getenv("SESSION_FLUSH_INTERVAL", "5"))
+SESSION_PERSIST = os.getenv("SESSION_PERSIST", "true").lower() in ("1", "true", "yes")
+SESSION_RETENTION_DAYS = int(os.getenv("SESSION_RETENTION_DAYS", "90"))
+
+# Inbound admission control: per-sender token bucket (messages per second, burst), max
+# senders tracked, max full reply pipelines in flight, and max cheap canned replies in
+# flight once saturated (past both caps messages are dropped). Messages containing an
+# emergency keyword skip the sender bucket and are never dropped: up to
+# ADMISSION_MAX_EMERGENCY_IN_FLIGHT of them get the full pipeline, beyond that a canned
+# reply pointing to 108.
+ADMISSION_SENDER_RATE = float(os.getenv("ADMISSION_SENDER_RATE", "0.2"))
+ADMISSION_SENDER_BURST = float(os.getenv("ADMISSION_SENDER_BURST", "5"))
+ADMISSION_MAX_SENDERS = int(os.getenv("ADMISSION_MAX_SENDERS", "100000"))
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "64"))
+ADMISSION_MAX_SHED_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_SHED_IN_FLIGHT", "256"))
+ADMISSION_MAX_EMERGENCY_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_EMERGENCY_IN_FLIGHT", "32"))
+ADMISSION_EMERGENCY_KEYWORDS = [k.strip() for k in os.getenv(
+    "ADMISSION_EMERGENCY_KEYWORDS",
+    "108,ambulance,emergency,unconscious,not breathing,chest pain,bleeding,seizure,convulsion,"
+    "snake bite,poison,suicide,एम्बुलेंस,इमरजेंसी,आपातकाल,बेहोश,ଆମ୍ବୁଲାନ୍ସ,ଜରୁରୀକାଳୀନ",
+).split(",") if k.strip()]
+
+# Per-sender message coalescing (off when COALESCE_WINDOW_MS is 0): fragments a sender
+# sends within the window of each other are answered as one query. The first fragment
+# is never held longer than COALESCE_MAX_WAIT_MS; a buffer is also answered once it has
+# COALESCE_MAX_FRAGMENTS, and with COALESCE_MAX_SENDERS senders buffering, new messages
+# are answered without waiting.
+COALESCE_WINDOW_MS = float(os.getenv("COALESCE_WINDOW_MS", "0"))
+COALESCE_MAX_WAIT_MS = float(os.getenv("COALESCE_MAX_WAIT_MS", "3000"))
+COALESCE_MAX_FRAGMENTS = int(os.getenv("COALESCE_MAX_FRAGMENTS", "5"))
+COALESCE_MAX_SENDERS = int(os.getenv("COALESCE_MAX_SENDERS", "10000"))
+
+# Hourly activity buckets behind /analytics/stats are kept this many hours
+ANALYTICS_ACTIVITY_RETENTION_HOURS = int(os.getenv("ANALYTICS_ACTIVITY_RETENTION_HOURS", "720"))
@@ -1,34 +1,241 @@
+import asyncio
+import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from sqlmodel import SQLModel, Field, Session, create_engine, select
-from typing import Optional, List
-from datetime import datetime
-from .config import SQLITE_DB
+from sqlalchemy import bindparam, event, insert, literal, update, delete, func, tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Any, Callable, Iterable, Iterator, Optional, List, Tuple
+from datetime import datetime, timedelta
+from .config import (
+    SQLITE_DB, SQLITE_WAL, SQLITE_SYNCHRONOUS, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE_KB,
+    DB_POOL_SIZE, DB_WORKERS,
+)
+from .metrics import timed_db
 
 # Ensure absolute path and folder exists
 db_path = os.path.abspath(SQLITE_DB)
 os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
 
-engine = create_engine(f"sqlite:///{db_path}", echo=False)
+# Helpers run on DB worker threads (see run_db), so connections are shared across threads
+engine = create_engine(
+    f"sqlite:///{db_path}",
+    echo=False,
+    connect_args={"check_same_thread": False},
+    pool_size=DB_POOL_SIZE,
+    max_overflow=0,
+)
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    if SQLITE_WAL:
+        # Readers no longer block on the writer; NORMAL sync is durable across app crashes in WAL mode
+        cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+_db_executor = ThreadPoolExecutor(max_workers=max(1, min(DB_WORKERS, DB_POOL_SIZE)), thread_name_prefix="db")
+
+async def run_db(fn: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking db helper on the DB executor instead of the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, partial(fn, *args, **kwargs))
 
 class Subscriber(SQLModel, table=True):
     phone: str = Field(primary_key=True)
-    language: str = Field(default="en")
+    language: str = Field(default="en", index=True)
+    region: Optional[str] = None
+    # Preferred delivery channel; telegram subscribers are keyed by chat id
+    channel: str = Field(default="whatsapp", index=True)
 
 class Broadcast(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     message: str
     channel: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+class OutboundMessage(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    idempotency_key: str = Field(index=True, unique=True)
+    channel: str
+    recipient: str
+    body: str
+    # pending -> sending -> sent | skipped | dead
+    status: str = Field(default="pending", index=True)
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class CachedAnswer(SQLModel, table=True):
+    key: str = Field(primary_key=True)
+    answer: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ProcessedMessage(SQLModel, table=True):
+    key: str = Field(primary_key=True)
+    seen_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+class SenderSession(SQLModel, table=True):
+    """Write-behind copy of a sender's conversation session, see sessions.py"""
+    sender: str = Field(primary_key=True)
+    language: Optional[str] = None
+    # "explicit" (user asked for it) or "detected" (from their messages)
+    language_source: Optional[str] = None
+    # JSON list of [question, answer] pairs, oldest first
+    turns: str = Field(default="[]")
+    last_source: Optional[str] = None
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+class PollingOffset(SQLModel, table=True):
+    name: str = Field(primary_key=True)
+    offset: int = Field(default=0)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class BroadcastRun(SQLModel, table=True):
+    id: str = Field(primary_key=True)
+    text: str
+    channel: str
+    resolved_channel: str
+    # running -> completed | paused | failed; a run left 'running' was interrupted
+    status: str = Field(default="running", index=True)
+    total: int = Field(default=0)
+    # JSON list of {"language", "region", "channel", "text", "recipients"}, see create_broadcast_run
+    segments: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class Delivery(SQLModel, table=True):
+    # One row per recipient per broadcast: pending -> sent | failed
+    broadcast_id: str = Field(primary_key=True)
+    recipient: str = Field(primary_key=True)
+    # Index into the run's segments: which text and channel this recipient gets
+    segment: int = Field(default=0)
+    status: str = Field(default="pending")
+    attempts: int = Field(default=0)
+    message_id: Optional[str] = None
+    error: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+class StatCounter(SQLModel, table=True):
+    # "subscribers", "subscribers:<language>", "broadcasts"; maintained by triggers
+    name: str = Field(primary_key=True)
+    value: int = Field(default=0)
+
+class ActivityCount(SQLModel, table=True):
+    # Events per kind per UTC hour ("YYYY-MM-DD HH"); maintained by triggers
+    kind: str = Field(primary_key=True)
+    hour: str = Field(primary_key=True)
+    count: int = Field(default=0)
+
+# Columns added after the tables were first created; create_all doesn't alter existing tables
+_ADDED_COLUMNS = {
+    "subscriber": [("region", "VARCHAR"), ("channel", "VARCHAR NOT NULL DEFAULT 'whatsapp'")],
+    "broadcastrun": [("segments", "VARCHAR")],
+    "delivery": [("segment", "INTEGER NOT NULL DEFAULT 0")],
+}
+
+# Triggers keep StatCounter/ActivityCount in step with every write path (merge, bulk
+# upsert, delete), so analytics read a handful of rows instead of scanning tables.
+# Indexes are repeated here because create_all doesn't add them to existing tables.
+_STATS_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_subscriber_language ON subscriber (language)",
+    "CREATE INDEX IF NOT EXISTS ix_subscriber_channel ON subscriber (channel)",
+    # Broadcast segments: district alerts select by region, optionally narrowed by language/channel
+    "CREATE INDEX IF NOT EXISTS ix_subscriber_region ON subscriber (region, language, channel)",
+    "CREATE INDEX IF NOT EXISTS ix_broadcast_timestamp ON broadcast (timestamp)",
+    "CREATE INDEX IF NOT EXISTS ix_broadcast_channel_timestamp ON broadcast (channel, timestamp)",
+    "DROP INDEX IF EXISTS ix_delivery_broadcast_status",
+    "CREATE INDEX IF NOT EXISTS ix_delivery_pending ON delivery (broadcast_id, status, recipient, segment)",
+    """CREATE TRIGGER IF NOT EXISTS stats_subscriber_insert AFTER INSERT ON subscriber BEGIN
+        INSERT INTO statcounter (name, value) VALUES ('subscribers', 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+        INSERT INTO statcounter (name, value) VALUES ('subscribers:' || NEW.language, 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_subscriber_delete AFTER DELETE ON subscriber BEGIN
+        UPDATE statcounter SET value = value - 1 WHERE name IN ('subscribers', 'subscribers:' || OLD.language);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_subscriber_language AFTER UPDATE OF language ON subscriber
+        WHEN OLD.language IS NOT NEW.language BEGIN
+        UPDATE statcounter SET value = value - 1 WHERE name = 'subscribers:' || OLD.language;
+        INSERT INTO statcounter (name, value) VALUES ('subscribers:' || NEW.language, 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_broadcast_insert AFTER INSERT ON broadcast BEGIN
+        INSERT INTO statcounter (name, value) VALUES ('broadcasts', 1)
+            ON CONFLICT(name) DO UPDATE SET value = value + 1;
+        INSERT INTO activitycount (kind, hour, count) VALUES ('broadcast', substr(NEW.timestamp, 1, 13), 1)
+            ON CONFLICT(kind, hour) DO UPDATE SET count = count + 1;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS stats_outbound_insert AFTER INSERT ON outboundmessage BEGIN
+        INSERT INTO activitycount (kind, hour, count) VALUES ('reply', substr(NEW.created_at, 1, 13), 1)
+            ON CONFLICT(kind, hour) DO UPDATE SET count = count + 1;
+    END""",
+]
 
 def init_db():
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for table, columns in _ADDED_COLUMNS.items():
+            existing = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({table})")}
+            for name, ddl in columns:
+                if name not in existing:
+                    conn.exec_driver_sql(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+        for statement in _STATS_DDL:
+            conn.exec_driver_sql(statement)
+        if conn.exec_driver_sql("SELECT 1 FROM statcounter WHERE name = 'subscribers'").first() is None:
+            _rebuild_stats(conn)
+
+def _rebuild_stats(conn):
+    """Recompute the summary tables from scratch (first start on an existing database)"""
+    conn.exec_driver_sql("DELETE FROM statcounter")
+    conn.exec_driver_sql("DELETE FROM activitycount")
+    conn.exec_driver_sql("INSERT INTO statcounter (name, value) SELECT 'subscribers', COUNT(*) FROM subscriber")
+    conn.exec_driver_sql(
+        "INSERT INTO statcounter (name, value) "
+        "SELECT 'subscribers:' || language, COUNT(*) FROM subscriber GROUP BY language"
+    )
+    conn.exec_driver_sql("INSERT INTO statcounter (name, value) SELECT 'broadcasts', COUNT(*) FROM broadcast")
+    conn.exec_driver_sql(
+        "INSERT INTO activitycount (kind, hour, count) "
+        "SELECT 'broadcast', substr(timestamp, 1, 13), COUNT(*) FROM broadcast GROUP BY 2"
+    )
+    conn.exec_driver_sql(
+        "INSERT INTO activitycount (kind, hour, count) "
+        "SELECT 'reply', substr(created_at, 1, 13), COUNT(*) FROM outboundmessage GROUP BY 2"
+    )
 
-def add_subscriber(phone: str, language: str = "en"):
+@timed_db
+def add_subscriber(phone: str, language: str = "en", region: Optional[str] = None, channel: str = "whatsapp"):
     with Session(engine) as session:
-        s = Subscriber(phone=phone, language=language or "en")
+        s = Subscriber(phone=phone, language=language or "en", region=region, channel=channel or "whatsapp")
         session.merge(s)
         session.commit()
 
+@timed_db
+def upsert_subscribers(rows: List[dict]) -> int:
+    """Insert or update many {"phone", "language", "region", "channel"} rows in one transaction"""
+    if not rows:
+        return 0
+    stmt = sqlite_insert(Subscriber)
+    stmt = stmt.on_conflict_do_update(index_elements=["phone"], set_={
+        "language": stmt.excluded.language,
+        "region": stmt.excluded.region,
+        "channel": stmt.excluded.channel,
+    })
+    with engine.begin() as conn:
+        conn.execute(stmt, rows)
+    return len(rows)
+
+@timed_db
 def remove_subscriber(phone: str):
     with Session(engine) as session:
         s = session.get(Subscriber, phone)
@@ -36,16 +243,440 @@ def remove_subscriber(phone: str):
             session.delete(s)
             session.commit()
 
+@timed_db
 def list_subscribers() -> List[Subscriber]:
     with Session(engine) as session:
         return list(session.exec(select(Subscriber)))
 
+def _segment_filter(query, language: Optional[str] = None, region: Optional[str] = None,
+                    channel: Optional[str] = None):
+    if language:
+        query = query.where(Subscriber.language == language)
+    if region:
+        query = query.where(Subscriber.region == region)
+    if channel:
+        query = query.where(Subscriber.channel == channel)
+    return query
+
+@timed_db
+def count_subscribers(language: Optional[str] = None, region: Optional[str] = None,
+                      channel: Optional[str] = None) -> int:
+    """Subscribers matching one broadcast segment (indexed count)"""
+    with Session(engine) as session:
+        return session.exec(_segment_filter(select(func.count()).select_from(Subscriber), language, region, channel)).one()
+
+@timed_db
+def page_subscribers(after: Optional[str] = None, limit: int = 100, language: Optional[str] = None,
+                     prefix: Optional[str] = None, region: Optional[str] = None,
+                     channel: Optional[str] = None) -> List[Tuple[str, str, Optional[str], str]]:
+    """Keyset page of (phone, language, region, channel) rows ordered by phone, starting after `after`"""
+    query = select(Subscriber.phone, Subscriber.language, Subscriber.region, Subscriber.channel)
+    if after is not None:
+        query = query.where(Subscriber.phone > after)
+    query = _segment_filter(query, language, region, channel)
+    if prefix:
+        # Range on the primary key instead of LIKE so the index is used
+        query = query.where(Subscriber.phone >= prefix, Subscriber.phone < prefix + "\uffff")
+    with Session(engine) as session:
+        return list(session.exec(query.order_by(Subscriber.phone).limit(limit)).all())
+
+def iter_subscribers(language: Optional[str] = None, prefix: Optional[str] = None,
+                     region: Optional[str] = None, channel: Optional[str] = None,
+                     batch_size: int = 1000) -> Iterator[List[Tuple[str, str, Optional[str], str]]]:
+    """All matching subscriber rows in phone order, one keyset batch at a time"""
+    after = None
+    while True:
+        batch = page_subscribers(after, batch_size, language, prefix, region, channel)
+        if not batch:
+            return
+        yield batch
+        if len(batch) < batch_size:
+            return
+        after = batch[-1][0]
+
+@timed_db
+def subscriber_counts() -> dict:
+    """Subscriber count per language (from the trigger-maintained StatCounter rows)"""
+    with Session(engine) as session:
+        rows = session.exec(
+            select(StatCounter.name, StatCounter.value).where(StatCounter.name.startswith("subscribers:"))
+        ).all()
+        return {name.split(":", 1)[1]: value for name, value in rows if value > 0}
+
+@timed_db
 def save_broadcast(message: str, channel: str):
     with Session(engine) as session:
         b = Broadcast(message=message, channel=channel)
         session.add(b)
         session.commit()
 
+@timed_db
 def get_broadcasts():
     with Session(engine) as session:
         return list(session.exec(select(Broadcast).order_by(Broadcast.timestamp.desc())))
+
+# History counts with filters stop at this many rows and are reported as estimates
+HISTORY_COUNT_CAP = 10000
+
+@timed_db
+def page_broadcasts(before: Optional[Tuple[datetime, int]] = None, limit: int = 50,
+                    since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    channel: Optional[str] = None) -> List[Broadcast]:
+    """Newest-first keyset page of broadcasts, starting after the (timestamp, id) `before`"""
+    query = select(Broadcast)
+    if before is not None:
+        query = query.where(tuple_(Broadcast.timestamp, Broadcast.id) < before)
+    if since is not None:
+        query = query.where(Broadcast.timestamp >= since)
+    if until is not None:
+        query = query.where(Broadcast.timestamp < until)
+    if channel:
+        query = query.where(Broadcast.channel == channel)
+    with Session(engine) as session:
+        return list(session.exec(
+            query.order_by(Broadcast.timestamp.desc(), Broadcast.id.desc()).limit(limit)
+        ))
+
+@timed_db
+def count_broadcasts(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                     channel: Optional[str] = None) -> Tuple[int, bool]:
+    """(count, exact). Unfiltered totals come from StatCounter; filtered ones are capped."""
+    with Session(engine) as session:
+        if since is None and until is None and not channel:
+            counter = session.get(StatCounter, "broadcasts")
+            return (counter.value if counter else 0), True
+        query = select(Broadcast.id)
+        if since is not None:
+            query = query.where(Broadcast.timestamp >= since)
+        if until is not None:
+            query = query.where(Broadcast.timestamp < until)
+        if channel:
+            query = query.where(Broadcast.channel == channel)
+        count = session.exec(select(func.count()).select_from(query.limit(HISTORY_COUNT_CAP + 1).subquery())).one()
+        return min(count, HISTORY_COUNT_CAP), count <= HISTORY_COUNT_CAP
+
+# --- Broadcast delivery ledger ---
+@timed_db
+def create_broadcast_run(run_id: str, text: str, channel: str, resolved_channel: str, segments: List[dict],
+                         recipients: Optional[Iterable[str]] = None, batch_size: int = 5000) -> List[int]:
+    """
+    Record a broadcast and one pending Delivery row per recipient, in a single
+    transaction so a crash while seeding leaves nothing behind.
+
+    Each segment's recipients are selected by one indexed INSERT ... SELECT over the
+    subscriber table, so SQLite streams the matching rows straight into the ledger
+    without them passing through Python. Segments are matched in order and a subscriber
+    gets at most one delivery. An explicit `recipients` iterable is seeded into
+    segment 0 in batches instead. Returns the delivery count per segment.
+    """
+    now = datetime.utcnow()
+    counts = []
+    with engine.begin() as conn:
+        conn.execute(sqlite_insert(BroadcastRun).values(
+            id=run_id, text=text, channel=channel, resolved_channel=resolved_channel,
+            status="running", created_at=now, updated_at=now,
+        ))
+        if recipients is not None:
+            insert_delivery = sqlite_insert(Delivery).on_conflict_do_nothing()
+            total, batch = 0, []
+            for recipient in recipients:
+                batch.append({"broadcast_id": run_id, "recipient": recipient, "segment": 0,
+                              "status": "pending", "attempts": 0})
+                if len(batch) >= batch_size:
+                    total += conn.execute(insert_delivery, batch).rowcount
+                    batch = []
+            if batch:
+                total += conn.execute(insert_delivery, batch).rowcount
+            counts.append(total)
+        else:
+            for index, segment in enumerate(segments):
+                source = _segment_filter(
+                    select(literal(run_id), Subscriber.phone, literal(index), literal("pending"), literal(0)),
+                    segment.get("language"), segment.get("region"), segment.get("channel"),
+                )
+                seed = insert(Delivery).prefix_with("OR IGNORE").from_select(
+                    ["broadcast_id", "recipient", "segment", "status", "attempts"], source
+                )
+                counts.append(conn.execute(seed).rowcount)
+        stored = [{**segment, "recipients": count} for segment, count in zip(segments, counts)]
+        conn.execute(
+            update(BroadcastRun).where(BroadcastRun.id == run_id).values(total=sum(counts), segments=json.dumps(stored))
+        )
+    return counts
+
+@timed_db
+def get_broadcast_run(run_id: str) -> Optional[BroadcastRun]:
+    with Session(engine) as session:
+        return session.get(BroadcastRun, run_id)
+
+@timed_db
+def list_broadcast_runs(statuses: List[str]) -> List[BroadcastRun]:
+    with Session(engine) as session:
+        return list(session.exec(select(BroadcastRun).where(BroadcastRun.status.in_(statuses))))
+
+@timed_db
+def set_broadcast_run_status(run_id: str, status: str, error: Optional[str] = None):
+    with Session(engine) as session:
+        session.exec(
+            update(BroadcastRun)
+            .where(BroadcastRun.id == run_id)
+            .values(status=status, error=error, updated_at=datetime.utcnow())
+        )
+        session.commit()
+
+@timed_db
+def pending_deliveries(run_id: str, after: Optional[str] = None, limit: int = 500) -> List[Tuple[str, int]]:
+    """Next `limit` pending (recipient, segment) rows of a run in recipient order, after `after`"""
+    query = select(Delivery.recipient, Delivery.segment).where(Delivery.broadcast_id == run_id, Delivery.status == "pending")
+    if after is not None:
+        query = query.where(Delivery.recipient > after)
+    with Session(engine) as session:
+        return list(session.exec(query.order_by(Delivery.recipient).limit(limit)).all())
+
+@timed_db
+def record_deliveries(run_id: str, results: List[dict]):
+    """Apply a batch of {"recipient", "status", "message_id", "error"} send outcomes"""
+    if not results:
+        return
+    now = datetime.utcnow()
+    stmt = (
+        update(Delivery.__table__)
+        .where(Delivery.broadcast_id == run_id, Delivery.recipient == bindparam("b_recipient"))
+        .values(
+            status=bindparam("b_status"),
+            message_id=bindparam("b_message_id"),
+            error=bindparam("b_error"),
+            attempts=Delivery.attempts + 1,
+            updated_at=now,
+        )
+    )
+    with engine.begin() as conn:
+        conn.execute(stmt, [
+            {"b_recipient": r["recipient"], "b_status": r["status"],
+             "b_message_id": r.get("message_id"), "b_error": r.get("error")}
+            for r in results
+        ])
+
+@timed_db
+def reset_failed_deliveries(run_id: str) -> int:
+    """Put failed deliveries of a run back to pending so a resume retries them"""
+    with Session(engine) as session:
+        result = session.exec(
+            update(Delivery)
+            .where(Delivery.broadcast_id == run_id, Delivery.status == "failed")
+            .values(status="pending")
+        )
+        session.commit()
+        return result.rowcount or 0
+
+@timed_db
+def delivery_stats(run_id: str) -> dict:
+    """Delivery count per status for one broadcast"""
+    with Session(engine) as session:
+        rows = session.exec(
+            select(Delivery.status, func.count())
+            .where(Delivery.broadcast_id == run_id)
+            .group_by(Delivery.status)
+        ).all()
+        return {status: count for status, count in rows}
+
+# --- Outbound message queue ---
+@timed_db
+def enqueue_outbound(channel: str, recipient: str, body: str, idempotency_key: str) -> bool:
+    """Queue a message for delivery. Returns False if the key was already queued."""
+    with Session(engine) as session:
+        existing = session.exec(
+            select(OutboundMessage).where(OutboundMessage.idempotency_key == idempotency_key)
+        ).first()
+        if existing:
+            return False
+        session.add(OutboundMessage(
+            idempotency_key=idempotency_key, channel=channel, recipient=recipient, body=body
+        ))
+        session.commit()
+        return True
+
+@timed_db
+def claim_outbound(limit: int) -> List[OutboundMessage]:
+    """Mark up to `limit` due messages as 'sending' and return them"""
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        due = list(session.exec(
+            select(OutboundMessage)
+            .where(OutboundMessage.status == "pending", OutboundMessage.next_attempt_at <= now)
+            .order_by(OutboundMessage.next_attempt_at)
+            .limit(limit)
+        ))
+        for m in due:
+            m.status = "sending"
+            m.attempts += 1
+            m.updated_at = now
+            session.add(m)
+        session.commit()
+        for m in due:
+            session.refresh(m)
+        return due
+
+@timed_db
+def finish_outbound(message_id: int, status: str, error: Optional[str] = None,
+                    next_attempt_at: Optional[datetime] = None):
+    """Record the outcome of a send attempt ('sent', 'skipped', 'pending' for retry, or 'dead')"""
+    with Session(engine) as session:
+        m = session.get(OutboundMessage, message_id)
+        if not m:
+            return
+        m.status = status
+        m.last_error = error
+        if next_attempt_at:
+            m.next_attempt_at = next_attempt_at
+        m.updated_at = datetime.utcnow()
+        session.add(m)
+        session.commit()
+
+@timed_db
+def requeue_stale_outbound() -> int:
+    """Return messages left in 'sending' by a crashed or restarted process to the queue"""
+    with Session(engine) as session:
+        result = session.exec(
+            update(OutboundMessage)
+            .where(OutboundMessage.status == "sending")
+            .values(status="pending", updated_at=datetime.utcnow())
+        )
+        session.commit()
+        return result.rowcount or 0
+
+@timed_db
+def outbound_counts() -> dict:
+    with Session(engine) as session:
+        rows = session.exec(
+            select(OutboundMessage.status, func.count()).group_by(OutboundMessage.status)
+        ).all()
+        return {status: count for status, count in rows}
+
+# --- Answer cache ---
+@timed_db
+def get_cached_answer(key: str, max_age_seconds: float) -> Optional[CachedAnswer]:
+    with Session(engine) as session:
+        entry = session.get(CachedAnswer, key)
+        if entry and (datetime.utcnow() - entry.created_at).total_seconds() <= max_age_seconds:
+            return entry
+        return None
+
+@timed_db
+def put_cached_answer(key: str, answer: str):
+    with Session(engine) as session:
+        session.merge(CachedAnswer(key=key, answer=answer))
+        session.commit()
+
+@timed_db
+def purge_cached_answers(max_age_seconds: float) -> int:
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    with Session(engine) as session:
+        result = session.exec(delete(CachedAnswer).where(CachedAnswer.created_at < cutoff))
+        session.commit()
+        return result.rowcount or 0
+
+# --- Inbound message de-duplication ---
+@timed_db
+def claim_message_keys(keys: List[str]) -> List[str]:
+    """Record inbound message keys; returns the ones not seen before, in input order"""
+    if not keys:
+        return []
+    with Session(engine) as session:
+        seen = set(session.exec(select(ProcessedMessage.key).where(ProcessedMessage.key.in_(keys))).all())
+        fresh = [k for k in dict.fromkeys(keys) if k not in seen]
+        if fresh:
+            now = datetime.utcnow()
+            session.exec(
+                sqlite_insert(ProcessedMessage)
+                .values([{"key": k, "seen_at": now} for k in fresh])
+                .on_conflict_do_nothing()
+            )
+            session.commit()
+        return fresh
+
+@timed_db
+def purge_processed_messages(max_age_seconds: float) -> int:
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    with Session(engine) as session:
+        result = session.exec(delete(ProcessedMessage).where(ProcessedMessage.seen_at < cutoff))
+        session.commit()
+        return result.rowcount or 0
+
+# --- Sender sessions ---
+@timed_db
+def get_sender_session(sender: str) -> Optional[SenderSession]:
+    with Session(engine) as session:
+        return session.get(SenderSession, sender)
+
+@timed_db
+def save_sender_sessions(rows: List[dict]) -> int:
+    """Upsert session rows (dicts of SenderSession fields) in one transaction"""
+    if not rows:
+        return 0
+    stmt = sqlite_insert(SenderSession)
+    stmt = stmt.on_conflict_do_update(index_elements=["sender"], set_={
+        "language": stmt.excluded.language,
+        "language_source": stmt.excluded.language_source,
+        "turns": stmt.excluded.turns,
+        "last_source": stmt.excluded.last_source,
+        "updated_at": stmt.excluded.updated_at,
+    })
+    with engine.begin() as conn:
+        conn.execute(stmt, rows)
+    return len(rows)
+
+@timed_db
+def purge_sender_sessions(max_age_seconds: float) -> int:
+    cutoff = datetime.utcnow() - timedelta(seconds=max_age_seconds)
+    with Session(engine) as session:
+        result = session.exec(delete(SenderSession).where(SenderSession.updated_at < cutoff))
+        session.commit()
+        return result.rowcount or 0
+
+# --- Polling offsets ---
+@timed_db
+def get_polling_offset(name: str) -> Optional[int]:
+    with Session(engine) as session:
+        row = session.get(PollingOffset, name)
+        return row.offset if row else None
+
+@timed_db
+def set_polling_offset(name: str, offset: int):
+    with Session(engine) as session:
+        session.merge(PollingOffset(name=name, offset=offset, updated_at=datetime.utcnow()))
+        session.commit()
+
+# --- Analytics ---
+def _hour_key(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%d %H")
+
+@timed_db
+def analytics_summary(windows_hours=(24, 168)) -> dict:
+    """Totals from StatCounter and per-window activity sums from ActivityCount"""
+    now = datetime.utcnow()
+    with Session(engine) as session:
+        counters = dict(session.exec(select(StatCounter.name, StatCounter.value)).all())
+        activity = {}
+        for hours in windows_hours:
+            # Hour buckets are inclusive of the current partial hour
+            since = _hour_key(now - timedelta(hours=hours - 1))
+            rows = session.exec(
+                select(ActivityCount.kind, func.sum(ActivityCount.count))
+                .where(ActivityCount.hour >= since)
+                .group_by(ActivityCount.kind)
+            ).all()
+            activity[hours] = {kind: total for kind, total in rows}
+        last_broadcast = session.exec(
+            select(Broadcast.timestamp).order_by(Broadcast.timestamp.desc()).limit(1)
+        ).first()
+    return {"counters": counters, "activity": activity, "last_broadcast_at": last_broadcast}
+
+@timed_db
+def purge_activity(max_age_hours: int) -> int:
+    """Drop hourly activity buckets older than `max_age_hours`"""
+    cutoff = _hour_key(datetime.utcnow() - timedelta(hours=max_age_hours))
+    with Session(engine) as session:
+        result = session.exec(delete(ActivityCount).where(ActivityCount.hour < cutoff))
+        session.commit()
+        return result.rowcount or 0
@@ -0,0 +1,177 @@
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .config import FAQ_RETRIEVAL_THRESHOLD, FAQ_RETRIEVAL_MARGIN
+from .keyword_matcher import WORD_CHARS
+
+logger = logging.getLogger(__name__)
+
+# NumPy is optional: without it the retrieval tier is simply skipped
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+    logger.warning("NumPy not available, FAQ retrieval tier disabled. Install with: pip install numpy")
+
+NGRAM_SIZES = (3, 4)
+_SPACES_RE = re.compile(f"(?:[^{WORD_CHARS}]|_)+")
+
+
+def char_ngrams(text: str, sizes: Tuple[int, ...] = NGRAM_SIZES) -> List[str]:
+    """Character n-grams of each word, padded with spaces so word starts/ends are distinct"""
+    grams: List[str] = []
+    for word in _SPACES_RE.sub(" ", text.casefold()).split():
+        padded = f" {word} "
+        for n in sizes:
+            if len(padded) < n:
+                continue
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+class FaqRetriever:
+    """
+    Character n-gram TF-IDF index over FAQ questions and paraphrases.
+
+    The corpus is vectorized once into an L2-normalized NumPy matrix; a query is one
+    sparse column gather and matrix-vector product, then a per-topic max. Works offline
+    and tolerates misspellings and transliterations ("dengu ke lakshan", "maleria").
+
+    A match needs `threshold` similarity, of which at least `margin` must come from
+    n-grams the runner-up topic lacks: "fever" or "typhoid symptoms" are as close to
+    malaria as to dengue, so neither is answered.
+    """
+
+    def __init__(self, corpus: Dict[str, Iterable[str]], threshold: float = FAQ_RETRIEVAL_THRESHOLD,
+                 margin: float = FAQ_RETRIEVAL_MARGIN):
+        self.threshold = threshold
+        self.margin = margin
+        self.queries = 0
+        self.hits = 0
+
+        docs: List[List[str]] = []
+        doc_topics: List[int] = []
+        self.topics: List[str] = list(corpus)
+        for t, texts in enumerate(corpus.values()):
+            for text in texts:
+                grams = char_ngrams(text)
+                if grams:
+                    docs.append(grams)
+                    doc_topics.append(t)
+
+        df: Counter = Counter()
+        for grams in docs:
+            df.update(set(grams))
+        self.vocab: Dict[str, int] = {g: i for i, g in enumerate(sorted(df))}
+        n_docs = len(docs)
+        self.idf = np.array(
+            [math.log((1 + n_docs) / (1 + df[g])) + 1.0 for g in sorted(df)], dtype=np.float32
+        )
+        # Query n-grams missing from the corpus still count towards the query's norm
+        self.unseen_idf = math.log(1 + n_docs) + 1.0
+
+        matrix = np.zeros((n_docs, len(self.vocab)), dtype=np.float32)
+        for row, grams in enumerate(docs):
+            for g, count in Counter(grams).items():
+                matrix[row, self.vocab[g]] = count
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self.matrix = matrix / norms
+        self.doc_topics = np.array(doc_topics, dtype=np.intp)
+        # Which n-grams occur anywhere in each topic
+        self.topic_grams = np.zeros((len(self.topics), len(self.vocab)), dtype=bool)
+        np.logical_or.at(self.topic_grams, self.doc_topics, matrix > 0)
+
+    def _score(self, query: str) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """(per-document similarity, query vocabulary columns, their normalized weights)"""
+        counts = Counter(char_ngrams(query))
+        known = [g for g in counts if g in self.vocab]
+        if not known:
+            return None
+        cols = np.fromiter((self.vocab[g] for g in known), dtype=np.intp, count=len(known))
+        weights = np.fromiter((counts[g] for g in known), dtype=np.float32, count=len(known)) * self.idf[cols]
+        unseen = sum(counts[g] ** 2 for g in counts if g not in self.vocab) * self.unseen_idf ** 2
+        norm = math.sqrt(float(weights @ weights) + unseen)
+        weights /= norm
+        return self.matrix[:, cols] @ weights, cols, weights
+
+    def _topic_scores(self, sims: np.ndarray) -> np.ndarray:
+        best = np.zeros(len(self.topics), dtype=np.float32)
+        np.maximum.at(best, self.doc_topics, sims)
+        return best
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[str, float]]:
+        """Top-k (topic, cosine similarity) pairs, best first"""
+        scored = self._score(query)
+        if scored is None:
+            return []
+        best = self._topic_scores(scored[0])
+        order = np.argsort(-best)[:k]
+        return [(self.topics[i], float(best[i])) for i in order if best[i] > 0]
+
+    def match(self, query: str) -> Optional[Tuple[str, float]]:
+        """Best topic if it clears the confidence threshold and beats the runner-up by the margin"""
+        self.queries += 1
+        scored = self._score(query)
+        if scored is None:
+            return None
+        sims, cols, weights = scored
+        best = self._topic_scores(sims)
+        order = np.argsort(-best)[:2]
+        top = order[0]
+        if best[top] < self.threshold:
+            return None
+        if len(order) > 1 and best[order[1]] > 0:
+            # Similarity to the top topic's closest document from n-grams the runner-up lacks
+            row = int(np.argmax(np.where(self.doc_topics == top, sims, -1.0)))
+            distinct = float(self.matrix[row, cols] @ (weights * ~self.topic_grams[order[1], cols]))
+            if distinct < self.margin:
+                return None
+        self.hits += 1
+        return self.topics[top], float(best[top])
+
+    def stats(self) -> dict:
+        return {
+            "queries": self.queries,
+            "hits": self.hits,
+            "gemini_calls_avoided": self.hits,
+            "hit_rate": round(self.hits / self.queries, 4) if self.queries else 0.0,
+            "threshold": self.threshold,
+            "margin": self.margin,
+            "documents": int(self.matrix.shape[0]),
+            "vocabulary": len(self.vocab),
+        }
+
+
+_retriever: Optional[FaqRetriever] = None
+
+
+def get_retriever() -> Optional[FaqRetriever]:
+    """Build the FAQ index on first use (called at startup to precompute it)"""
+    global _retriever
+    if _retriever is None and HAS_NUMPY:
+        from .faqs import FAQS, FAQ_PARAPHRASES
+        # Whole questions only: bare keywords ("schedule", "tips") would make any query
+        # sharing one word look like a close match
+        corpus = {topic: [topic, *FAQ_PARAPHRASES.get(topic, [])] for topic in FAQS}
+        _retriever = FaqRetriever(corpus)
+        logger.info(f"📚 FAQ retrieval index built: {_retriever.stats()['documents']} documents")
+    return _retriever
+
+
+def retrieve_faq_answer(query: str, language: str = "en") -> Optional[str]:
+    """Answer from the most similar FAQ topic, or None below the confidence threshold"""
+    retriever = get_retriever()
+    if retriever is None or not query:
+        return None
+    match = retriever.match(query)
+    if match is None:
+        return None
+    from .faqs import FAQS
+    faq_data = FAQS.get(match[0], {})
+    return faq_data.get(language, faq_data.get("en", ""))
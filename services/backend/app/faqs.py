@@ -1,5 +1,9 @@
 import os
-from typing import Optional
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import AsyncIterator, Optional, Sequence, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,7 +16,11 @@ except ImportError:
     HAS_GENAI = False
     logger.warning("Google Generative AI not available. Install with: pip install google-generativeai")
 
-from .config import GEMINI_API_KEY
+from .config import GEMINI_API_KEY, GEMINI_MODEL, GEMINI_MAX_CONCURRENCY
+from .http_clients import upstreams
+from .keyword_matcher import KeywordMatcher
+from .language import detect
+from .answer_cache import answer_cache, cache_key
 
 # Configure Gemini if available
 if HAS_GENAI and GEMINI_API_KEY:
@@ -61,45 +69,105 @@ FAQS = {
     }
 }
 
+# Keywords for different topics, compiled once into a single matcher
+FAQ_KEYWORDS = {
+    "dengue symptoms": ["dengue", "डेंगू", "ଡେଙ୍ଗୁ", "lakshan", "लक्षण", "ଲକ୍ଷଣ", "symptoms"],
+    "malaria symptoms": ["malaria", "मलेरिया", "ମ୍ୟାଲେରିଆ", "lakshan", "लक्षण", "ଲକ୍ଷଣ", "symptoms"],
+    "prevention tips": ["prevention", "bachav", "बचाव", "ପ୍ରତିରୋଧ", "tips", "उपाय", "ଉପାୟ", "protect"],
+    "vaccine schedule": ["vaccine", "vaccination", "टीका", "ଟୀକା", "schedule", "समय", "ସମୟ", "immunization"],
+    "emergency": ["emergency", "ambulance", "108", "hospital", "इमरजेंसी", "ଜରୁରୀକାଳୀନ", "urgent"]
+}
+
+faq_matcher = KeywordMatcher(FAQ_KEYWORDS)
+
+# Example questions per topic (including transliterated/misspelled forms) for the
+# similarity retrieval tier in faq_retrieval.py
+FAQ_PARAPHRASES = {
+    "dengue symptoms": [
+        "symptoms of dengue", "dengue fever signs", "dengue ke lakshan",
+        "dengue ke lakshan kya hai", "dengu bukhar", "dengue fever", "dengue ke symptoms",
+        "डेंगू के लक्षण क्या हैं", "डेंगू बुखार", "ଡେଙ୍ଗୁର ଲକ୍ଷଣ କଣ", "dengue ra lakhyana",
+    ],
+    "malaria symptoms": [
+        "symptoms of malaria", "malaria fever with chills", "malaria ke lakshan",
+        "maleria", "malariya bukhar", "fever with shivering", "मलेरिया के लक्षण क्या हैं",
+        "ठंड लगकर बुखार", "ମ୍ୟାଲେରିଆର ଲକ୍ଷଣ", "malaria ra lakhyana",
+    ],
+    "prevention tips": [
+        "prevent mosquito bites", "stay safe from disease", "machhar se bachav",
+        "bimari se kaise bache", "prevention of dengue and malaria", "mosquito net use",
+        "बीमारी से कैसे बचें", "मच्छर से बचाव", "ରୋଗରୁ କିପରି ବଞ୍ଚିବା", "masa ru bachiba",
+    ],
+    "vaccine schedule": [
+        "baby vaccines", "child vaccination schedule", "tika kab lagwana hai",
+        "teeka schedule", "vaccine chart for infants", "bachche ka tikakaran",
+        "बच्चों का टीकाकरण कब", "टीका कब लगवाएं", "ଶିଶୁ ଟୀକାକରଣ", "tika kebe deba",
+    ],
+    "emergency": [
+        "call an ambulance", "unconscious patient", "need urgent medical help",
+        "ambulance number", "chest pain and breathing problem", "emergency help",
+        "एम्बुलेंस बुलाओ", "तुरंत डॉक्टर चाहिए", "ଆମ୍ବୁଲାନ୍ସ ଡାକନ୍ତୁ", "ambulance bulao",
+    ],
+}
+
 def find_faq_answer(query: str, language: str = "en") -> Optional[str]:
     """
-    Enhanced FAQ matching with multilingual support and fuzzy matching
+    Multilingual FAQ matching: scores every topic whose keywords appear in the query
+    (word-boundary aware) and answers with the best one
     """
     if not query:
         return None
-    
-    query_lower = query.lower().strip()
-    
-    # Keywords for different topics
-    keywords_map = {
-        "dengue symptoms": ["dengue", "डेंगू", "ଡେଙ୍ଗୁ", "lakshan", "लक्षण", "ଲକ୍ଷଣ", "symptoms"],
-        "malaria symptoms": ["malaria", "मलेरिया", "ମ୍ୟାଲେରିଆ", "lakshan", "लक्षण", "ଲକ୍ଷଣ", "symptoms"],
-        "prevention tips": ["prevention", "bachav", "बचाव", "ପ୍ରତିରୋଧ", "tips", "उपाय", "ଉପାୟ", "protect"],
-        "vaccine schedule": ["vaccine", "vaccination", "टीका", "ଟୀକା", "schedule", "समय", "ସମୟ", "immunization"],
-        "emergency": ["emergency", "ambulance", "108", "hospital", "इमरजेंसी", "ଜରୁରୀକାଳୀନ", "urgent"]
-    }
-    
-    # Find matching FAQ
-    for faq_key, keywords in keywords_map.items():
-        if any(keyword in query_lower for keyword in keywords):
-            faq_data = FAQS.get(faq_key, {})
-            if isinstance(faq_data, dict):
-                return faq_data.get(language, faq_data.get("en", ""))
-            return faq_data
-    
-    return None
 
-async def ask_gemini(prompt: str, language: str = "en") -> Optional[str]:
-    """
-    Enhanced Gemini AI integration with health-focused prompting
-    """
-    if not HAS_GENAI or not GEMINI_API_KEY:
-        logger.warning("Gemini AI not available")
+    faq_key = faq_matcher.best(query)
+    if faq_key is None:
         return None
-    
+
+    faq_data = FAQS.get(faq_key, {})
+    if isinstance(faq_data, dict):
+        return faq_data.get(language, faq_data.get("en", ""))
+    return faq_data
+
+# Gemini calls are blocking SDK calls: run them on a dedicated thread pool so a slow
+# response never stalls the event loop, with a global cap on concurrent calls
+_gemini_model = None
+_gemini_executor = ThreadPoolExecutor(max_workers=GEMINI_MAX_CONCURRENCY, thread_name_prefix="gemini")
+_gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+_STREAM_END = object()
+
+def _get_gemini_model():
+    """The GenerativeModel is created once and reused across requests"""
+    global _gemini_model
+    if _gemini_model is None:
+        _gemini_model = genai.GenerativeModel(GEMINI_MODEL)
+    return _gemini_model
+
+def _release_gemini_permit(loop: asyncio.AbstractEventLoop):
     try:
-        # Create health-focused prompt
-        health_prompt = f"""
+        loop.call_soon_threadsafe(_gemini_semaphore.release)
+    except RuntimeError:
+        pass  # loop already closed
+
+def _run_on_gemini_worker(loop: asyncio.AbstractEventLoop, fn) -> asyncio.Future:
+    """
+    Run `fn` on the Gemini pool while holding an already acquired semaphore permit. The
+    permit is given back when the worker thread returns, not when the caller stops
+    waiting, so abandoned calls still count against GEMINI_MAX_CONCURRENCY.
+    """
+    future = _gemini_executor.submit(fn)
+    future.add_done_callback(lambda _f: _release_gemini_permit(loop))
+    return asyncio.wrap_future(future, loop=loop)
+
+def _format_context(context: Sequence[Tuple[str, str]]) -> str:
+    if not context:
+        return ""
+    lines = "\n".join(f"User: {question}\nAssistant: {answer}" for question, answer in context)
+    return f"""
+Recent conversation with this user (oldest first), for resolving follow-up questions:
+{lines}
+"""
+
+def _build_health_prompt(prompt: str, language: str, context: Sequence[Tuple[str, str]] = ()) -> str:
+    return f"""
 You are a helpful health information assistant for a public health chatbot in India. 
 Please provide accurate, safe health information in response to: "{prompt}"
 
@@ -110,24 +178,163 @@ Guidelines:
 4. Be culturally sensitive to Indian context
 5. Keep responses concise but informative
 6. If asked about serious symptoms, emphasize seeking immediate medical care
-
+{_format_context(context)}
 Language preference: {language}
 """
-        
-        # Use the generative model
-        model = genai.GenerativeModel('gemini-1.5-flash')
-        response = model.generate_content(health_prompt)
-        
+
+def gemini_available() -> bool:
+    return HAS_GENAI and bool(GEMINI_API_KEY)
+
+async def ask_gemini(prompt: str, language: str = "en", context: Sequence[Tuple[str, str]] = ()) -> Optional[str]:
+    """
+    Gemini answer for `prompt`, served from the answer cache when the same normalized
+    question was asked recently; identical concurrent questions share one Gemini call.
+    With conversation `context` a cached answer is still used, but a fresh answer is
+    generated with the context and not cached, since it is specific to this sender.
+    """
+    if not gemini_available():
+        logger.warning("Gemini AI not available")
+        return None
+
+    if context:
+        cached = await answer_cache.get(cache_key(prompt, language))
+        if cached is not None:
+            return cached
+        return await _generate_gemini_answer(prompt, language, context)
+
+    return await answer_cache.get_or_compute(
+        cache_key(prompt, language), lambda: _generate_gemini_answer(prompt, language)
+    )
+
+async def _generate_gemini_answer(prompt: str, language: str = "en",
+                                  context: Sequence[Tuple[str, str]] = ()) -> Optional[str]:
+    """
+    Enhanced Gemini AI integration with health-focused prompting.
+    Runs off the event loop, bounded by the Gemini semaphore and a per-call deadline.
+    """
+    gemini = upstreams.get("gemini")
+    permit = gemini.breaker.allow()
+    if permit is None:
+        logger.warning("Gemini circuit open, skipping")
+        return None
+
+    health_prompt = _build_health_prompt(prompt, language, context)
+    loop = asyncio.get_running_loop()
+
+    async def call():
+        await _gemini_semaphore.acquire()
+        return await _run_on_gemini_worker(
+            loop,
+            partial(
+                _get_gemini_model().generate_content,
+                health_prompt,
+                request_options={"timeout": gemini.timeout},
+            ),
+        )
+
+    try:
+        response = await asyncio.wait_for(call(), timeout=gemini.timeout)
+        gemini.breaker.record_success(permit)
+
         if response and response.text:
             return response.text.strip()
         else:
             logger.warning("Empty response from Gemini")
             return None
-            
+
+    except asyncio.TimeoutError:
+        gemini.breaker.record_failure(permit)
+        logger.error(f"Gemini call exceeded {gemini.timeout}s deadline")
+        return None
+    except asyncio.CancelledError:
+        # The caller gave up (hedge lost, budget spent): no outcome, but free a half-open trial
+        gemini.breaker.release(permit)
+        raise
     except Exception as e:
+        gemini.breaker.record_failure(permit)
         logger.error(f"Gemini API error: {e}")
         return None
 
+async def stream_gemini(prompt: str, language: str = "en",
+                        context: Sequence[Tuple[str, str]] = ()) -> AsyncIterator[str]:
+    """
+    Stream a Gemini answer chunk by chunk as the SDK produces it. Cached answers are
+    yielded whole; a completed stream is cached for later callers unless it was generated
+    with conversation `context` (see ask_gemini). Yields nothing if
+    Gemini is unavailable, the circuit is open, or the deadline passes before any text.
+    If the consumer stops early (client disconnect), the worker thread stops at the next
+    chunk and no outcome is recorded on the circuit breaker.
+    """
+    if not gemini_available():
+        return
+
+    key = cache_key(prompt, language)
+    cached = await answer_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    gemini = upstreams.get("gemini")
+    permit = gemini.breaker.allow()
+    if permit is None:
+        logger.warning("Gemini circuit open, skipping")
+        return
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + gemini.timeout
+    chunks: asyncio.Queue = asyncio.Queue()
+    cancelled = threading.Event()
+    health_prompt = _build_health_prompt(prompt, language, context)
+
+    def produce():
+        # Runs on a Gemini worker thread and hands chunks back to the loop
+        try:
+            response = _get_gemini_model().generate_content(
+                health_prompt, stream=True, request_options={"timeout": gemini.timeout}
+            )
+            for chunk in response:
+                if cancelled.is_set():
+                    break
+                text = getattr(chunk, "text", "")
+                if text:
+                    loop.call_soon_threadsafe(chunks.put_nowait, text)
+            loop.call_soon_threadsafe(chunks.put_nowait, _STREAM_END)
+        except Exception as e:
+            loop.call_soon_threadsafe(chunks.put_nowait, e)
+
+    parts = []
+    recorded = False
+    try:
+        await asyncio.wait_for(_gemini_semaphore.acquire(), timeout=gemini.timeout)
+        _run_on_gemini_worker(loop, produce)
+        while True:
+            item = await asyncio.wait_for(chunks.get(), timeout=max(deadline - loop.time(), 0))
+            if item is _STREAM_END:
+                break
+            if isinstance(item, Exception):
+                raise item
+            parts.append(item)
+            yield item
+        gemini.breaker.record_success(permit)
+        recorded = True
+        if parts and not context:
+            await answer_cache.put(key, "".join(parts).strip())
+    except asyncio.TimeoutError:
+        if not recorded:
+            gemini.breaker.record_failure(permit)
+            recorded = True
+        logger.error(f"Gemini stream exceeded {gemini.timeout}s deadline")
+    except Exception as e:
+        if not recorded:
+            gemini.breaker.record_failure(permit)
+            recorded = True
+        logger.error(f"Gemini API error: {e}")
+    finally:
+        cancelled.set()
+        if not recorded:
+            # Consumer went away (disconnect or cancellation): free a half-open trial
+            gemini.breaker.release(permit)
+
 def get_health_disclaimer(language: str = "en") -> str:
     """Get appropriate health disclaimer based on language"""
     disclaimers = {
@@ -138,27 +345,5 @@ def get_health_disclaimer(language: str = "en") -> str:
     return disclaimers.get(language, disclaimers["en"])
 
 def detect_language(text: str) -> str:
-    """Simple language detection based on script and keywords"""
-    if not text:
-        return "en"
-    
-    # Check for Devanagari script (Hindi)
-    if any('\u0900' <= char <= '\u097F' for char in text):
-        return "hi"
-    
-    # Check for Odia script
-    if any('\u0B00' <= char <= '\u0B7F' for char in text):
-        return "or"
-    
-    # Check for common Hindi/Odia keywords in Latin script
-    hindi_keywords = ["kya", "hai", "ke", "ka", "ki", "mein", "aur", "se", "ko"]
-    odia_keywords = ["kana", "kaha", "kemiti", "kouthi", "kahaku"]
-    
-    text_lower = text.lower()
-    
-    if any(keyword in text_lower for keyword in hindi_keywords):
-        return "hi"
-    elif any(keyword in text_lower for keyword in odia_keywords):
-        return "or"
-    
-    return "en"  # Default to English
\ No newline at end of file
+    """Language code of `text` (see language.detect for the confidence as well)"""
+    return detect(text).language
@@ -0,0 +1,247 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from .config import (
+    RASA_BASE_URL,
+    GRAPH_API_TIMEOUT,
+    TELEGRAM_API_TIMEOUT,
+    TELEGRAM_API_BASE_URL,
+    RASA_TIMEOUT,
+    GEMINI_TIMEOUT,
+    UPSTREAM_MAX_CONNECTIONS,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional 'h2' package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open"""
+
+
+class CircuitPermit:
+    """Returned by CircuitBreaker.allow(); pass it back with the call's outcome"""
+
+    __slots__ = ("trial", "epoch")
+
+    def __init__(self, trial: bool, epoch: int):
+        self.trial = trial
+        self.epoch = epoch
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+    closed -> open after `failure_threshold` failures; open -> half_open after `reset_timeout`;
+    one successful trial call closes it again, a failed one re-opens it. A trial that ends
+    without an outcome (e.g. its caller was cancelled) is released, so the next call can try.
+
+    Outcomes are reported with the permit `allow` handed out. Only the half-open trial's
+    permit can close the circuit or free the trial; calls admitted before the circuit last
+    opened report too late to count and are ignored.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._trial_in_flight = False
+        # Bumped whenever the circuit opens, so permits from before that are recognized
+        self._epoch = 0
+
+    def allow(self) -> Optional[CircuitPermit]:
+        """A permit for one call, or None while the circuit is open or its trial is taken"""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                self.rejected += 1
+                return None
+            self.state = "half_open"
+            self._trial_in_flight = False
+        if self.state == "half_open":
+            if self._trial_in_flight:
+                self.rejected += 1
+                return None
+            self._trial_in_flight = True
+            return CircuitPermit(True, self._epoch)
+        return CircuitPermit(False, self._epoch)
+
+    def check(self) -> CircuitPermit:
+        permit = self.allow()
+        if permit is None:
+            raise CircuitOpenError(f"{self.name} circuit is open")
+        return permit
+
+    def _current(self, permit: CircuitPermit) -> bool:
+        return permit.epoch == self._epoch and permit.trial == (self.state == "half_open")
+
+    def release(self, permit: CircuitPermit):
+        """Give up a half-open trial without recording an outcome"""
+        if permit.trial and self._current(permit):
+            self._trial_in_flight = False
+
+    def record_success(self, permit: CircuitPermit):
+        if not self._current(permit):
+            return
+        self.failures = 0
+        if permit.trial:
+            self._trial_in_flight = False
+            self.state = "closed"
+            logger.info(f"Circuit for {self.name} closed")
+
+    def record_failure(self, permit: CircuitPermit):
+        if not self._current(permit):
+            return
+        self.failures += 1
+        if permit.trial or self.failures >= self.failure_threshold:
+            self._trial_in_flight = False
+            self.times_opened += 1
+            self._epoch += 1
+            logger.warning(f"Circuit for {self.name} opened after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class UpstreamClient:
+    """A keep-alive httpx pool for one upstream, guarded by a circuit breaker"""
+
+    def __init__(self, name: str, base_url: str = "", timeout: float = 10.0,
+                 max_connections: int = UPSTREAM_MAX_CONNECTIONS, http2: bool = True):
+        self.name = name
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.http2 = http2 and HAS_HTTP2
+        self.breaker = CircuitBreaker(name)
+        self.requests = 0
+        self.failures = 0
+        self.in_flight = 0
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self.open()
+        return self._client
+
+    def open(self):
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self.timeout,
+            http2=self.http2,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """
+        Send a request through the pool. Raises CircuitOpenError without touching the network
+        while the upstream is considered down. Transport errors and 5xx responses count as failures.
+        """
+        permit = self.breaker.check()
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except asyncio.CancelledError:
+            # Hedge losers and budget timeouts cancel calls routinely; that says nothing
+            # about the upstream, but a half-open trial must not stay claimed forever
+            self.breaker.release(permit)
+            raise
+        except Exception:
+            self.failures += 1
+            self.breaker.record_failure(permit)
+            raise
+        finally:
+            self.in_flight -= 1
+        if response.status_code >= 500:
+            self.failures += 1
+            self.breaker.record_failure(permit)
+        else:
+            self.breaker.record_success(permit)
+        return response
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    def stats(self) -> dict:
+        return {
+            "base_url": self.base_url,
+            "open": self._client is not None and not self._client.is_closed,
+            "http2": self.http2,
+            "timeout": self.timeout,
+            "max_connections": self.max_connections,
+            "requests": self.requests,
+            "failures": self.failures,
+            "in_flight": self.in_flight,
+            "circuit": self.breaker.stats(),
+        }
+
+
+class UpstreamRegistry:
+    """App-lifetime registry of upstream pools; opened on startup and closed on shutdown"""
+
+    def __init__(self):
+        self.upstreams: Dict[str, UpstreamClient] = {}
+
+    def register(self, upstream: UpstreamClient) -> UpstreamClient:
+        self.upstreams[upstream.name] = upstream
+        return upstream
+
+    def get(self, name: str) -> UpstreamClient:
+        return self.upstreams[name]
+
+    async def start(self):
+        for upstream in self.upstreams.values():
+            upstream.open()
+        logger.info(f"🔌 Opened upstream pools: {', '.join(self.upstreams)}")
+
+    async def stop(self):
+        for upstream in self.upstreams.values():
+            await upstream.close()
+
+    def stats(self) -> dict:
+        return {name: upstream.stats() for name, upstream in self.upstreams.items()}
+
+
+upstreams = UpstreamRegistry()
+upstreams.register(UpstreamClient("graph", "https://graph.facebook.com", timeout=GRAPH_API_TIMEOUT))
+upstreams.register(UpstreamClient("telegram", TELEGRAM_API_BASE_URL, timeout=TELEGRAM_API_TIMEOUT))
+upstreams.register(UpstreamClient("rasa", RASA_BASE_URL, timeout=RASA_TIMEOUT, http2=False))
+# The Gemini SDK manages its own transport; this entry only contributes the breaker and timeout
+upstreams.register(UpstreamClient("gemini", timeout=GEMINI_TIMEOUT))
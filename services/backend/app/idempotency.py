@@ -0,0 +1,80 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Iterable, List
+
+from .config import WEBHOOK_DEDUP_TTL, WEBHOOK_DEDUP_SIZE, WEBHOOK_DEDUP_PERSIST
+from .db import claim_message_keys, purge_processed_messages, run_db
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyStore:
+    """
+    Remembers inbound message ids so provider redeliveries are processed once.
+
+    Memory is bounded: keys expire after `ttl` seconds and the oldest are dropped past
+    `max_entries`. With `persist` enabled, keys missed in memory are checked against the
+    ProcessedMessage table, so redeliveries across a restart are still caught.
+    """
+
+    def __init__(self, ttl: float = WEBHOOK_DEDUP_TTL, max_entries: int = WEBHOOK_DEDUP_SIZE,
+                 persist: bool = WEBHOOK_DEDUP_PERSIST):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.persist = persist
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self.accepted = 0
+        self.duplicates = 0
+
+    async def claim(self, keys: Iterable[str]) -> List[str]:
+        """Returns the keys not seen within the TTL (in order) and marks them as seen"""
+        now = time.monotonic()
+        self._expire(now)
+        requested = list(dict.fromkeys(keys))
+        fresh = [k for k in requested if k not in self._seen]
+
+        # Mark in memory before the database round trip so a concurrent redelivery
+        # of the same ids is rejected while this one is still being checked
+        for key in fresh:
+            self._seen[key] = now + self.ttl
+        while len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+
+        if fresh and self.persist:
+            try:
+                fresh = await run_db(claim_message_keys, fresh)
+            except Exception as e:
+                # Fail open: a rare double reply beats dropping messages
+                logger.warning(f"Idempotency store write failed: {e}")
+
+        self.accepted += len(fresh)
+        self.duplicates += len(requested) - len(fresh)
+        return fresh
+
+    def _expire(self, now: float):
+        # Entries are inserted in expiry order, so expired keys sit at the front
+        while self._seen:
+            key, expires_at = next(iter(self._seen.items()))
+            if expires_at > now:
+                break
+            del self._seen[key]
+
+    def purge(self) -> int:
+        """Drop persisted keys older than the TTL"""
+        if not self.persist:
+            return 0
+        return purge_processed_messages(self.ttl)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._seen),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "persist": self.persist,
+            "accepted": self.accepted,
+            "duplicates": self.duplicates,
+        }
+
+
+whatsapp_dedup = IdempotencyStore()
@@ -0,0 +1,94 @@
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Characters that continue a word. Python's \w misses Indic vowel signs and viramas,
+# so whole Devanagari/Odia blocks count as word characters (except the danda marks).
+WORD_CHARS = r"\w" + "\u0900-\u0963\u0966-\u097F\u0B00-\u0B63\u0B66-\u0B7F"
+
+# Weight multiplier when a keyword only matches the start of a longer word ("vaccines")
+PREFIX_MATCH_WEIGHT = 0.5
+
+
+def _normalize(text: str) -> str:
+    return text.casefold()
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    Compile words into a prefix-trie shaped regex, e.g. {"vaccine", "vaccination"} ->
+    vaccin(?:ation|e). The regex engine then walks the trie once per start position
+    instead of trying every keyword, and greedy optionals prefer the longest keyword.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        terminal = "" in node
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch != ""]
+        if not alts:
+            return ""
+        if len(alts) == 1 and not terminal:
+            return alts[0]
+        body = "(?:" + "|".join(alts) + ")"
+        return body + "?" if terminal else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Single-pass multi-keyword matcher that scores every topic.
+
+    Keywords are case-folded and compiled once into one trie-shaped regex; only hits at
+    the start of a word count. A keyword shared by several topics ("symptoms") is worth
+    1/n to each, so a topic-specific keyword ("dengue") decides between them; prefix hits
+    count half. Ties go to the topic declared first.
+    """
+
+    def __init__(self, keyword_map: Dict[str, Iterable[str]]):
+        self.topics: List[str] = list(keyword_map)
+        owners: Dict[str, List[str]] = defaultdict(list)
+        for topic, keywords in keyword_map.items():
+            for keyword in keywords:
+                kw = _normalize(keyword).strip()
+                if kw and topic not in owners[kw]:
+                    owners[kw].append(topic)
+
+        self._keywords: Dict[str, Tuple[Tuple[str, float], ...]] = {
+            kw: tuple((topic, 1.0 / len(topics)) for topic in topics)
+            for kw, topics in owners.items()
+        }
+        self._order = {topic: i for i, topic in enumerate(self.topics)}
+        # Matches need a non-word character before the keyword (the text is padded with a
+        # space) and capture one trailing word character, if any, to tell prefix hits apart
+        self._pattern = (
+            re.compile(f"[^{WORD_CHARS}]({_trie_regex(self._keywords)})([{WORD_CHARS}])?")
+            if self._keywords else None
+        )
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Score of every topic with at least one keyword in `text`"""
+        if not text or self._pattern is None:
+            return {}
+        hits: Dict[str, float] = {}
+        for kw, trailing in self._pattern.findall(" " + _normalize(text)):
+            factor = PREFIX_MATCH_WEIGHT if trailing else 1.0
+            if factor > hits.get(kw, 0.0):
+                hits[kw] = factor
+        scores: Dict[str, float] = {}
+        for kw, factor in hits.items():
+            for topic, weight in self._keywords[kw]:
+                scores[topic] = scores.get(topic, 0.0) + weight * factor
+        return scores
+
+    def best(self, text: str) -> Optional[str]:
+        """Highest scoring topic, or None if nothing matched"""
+        scores = self.scores(text)
+        if not scores:
+            return None
+        return max(scores, key=lambda t: (scores[t], -self._order[t]))
@@ -0,0 +1,113 @@
+import re
+from typing import NamedTuple, Optional
+
+# One regex pass splits the text into runs of Devanagari, Odia and Latin letters;
+# everything else (digits, punctuation, emoji) is skipped.
+_TOKEN_RE = re.compile(r"([\u0900-\u097F]+)|([\u0B00-\u0B7F]+)|([A-Za-z]+)")
+_LATIN_RE = re.compile(r"[a-z]+")
+
+# Romanized Hindi/Odia words, matched as whole tokens only (substring matching made
+# "ke" in "like" look Hindi). Words common to both languages count for both.
+HINDI_WORDS = frozenset("""
+    kya hai hain tha thi ke ka ki ko se mein aur nahi nahin kaise kaisa kaisi kab kahan kyun kyon
+    mujhe mera meri mere hum humein aap aapka aapki tum bhi liye chahiye karna karein karen kare karu
+    hota hoti hote raha rahi rahe gaya gayi wala wale batao bataiye bataye sakta sakti sakte koi kuch
+    bukhar lakshan ilaj dawai dawa bimari bachav bachao teeka tika jaankari jankari dard sardi khansi
+    machhar haath pani
+""".split())
+ODIA_WORDS = frozenset("""
+    kana kahin kemiti kouthi kahaku kouthire achhi achi nahi nahin mora mote mo tume tumara apana apananka
+    kebe kiye heba hebe hela karibe kariba karantu kahantu diantu dia bhala katha jani janibaku paribe
+    ebe sabu au ama amara jwara lakhyana lakshyana chikitsa tika osudha beramari rogara hauchi
+    haucha kaniki
+""".split())
+ENGLISH_WORDS = frozenset("""
+    the a an is are was were be what how when where why which who do does did can could should would
+    i my me you your we our it its this that these those of to in on for with and or not no yes
+    have has had get about from at by symptoms symptom prevention vaccine vaccines fever please help
+    there any tell need near
+""".split())
+
+# Whole messages that switch the reply language (the same phrases Rasa's
+# action_set_language understands), e.g. "lang hi", "Hindi", "ଓଡ଼ିଆ"
+_COMMAND_RE = re.compile(
+    r"^\s*(?P<prefix>(?:set\s+)?(?:lang|language)\s*:?\s*)?"
+    r"(?P<word>en|english|hi|hindi|हिंदी|हिन्दी|or|odia|oriya|ଓଡ଼ିଆ|ଓଡିଆ)\s*[.!?]*\s*$",
+    re.IGNORECASE,
+)
+_COMMAND_LANGUAGES = {
+    "en": "en", "english": "en",
+    "hi": "hi", "hindi": "hi", "हिंदी": "hi", "हिन्दी": "hi",
+    "or": "or", "odia": "or", "oriya": "or", "ଓଡ଼ିଆ": "or", "ଓଡିଆ": "or",
+}
+LANGUAGE_SET_REPLIES = {
+    "en": "Language set to English.",
+    "hi": "भाषा हिंदी पर सेट की गई।",
+    "or": "ଭାଷା ଓଡ଼ିଆକୁ ସେଟ୍ କରାଗଲା।",
+}
+
+# Confidence reported for Latin text with no keyword evidence either way
+DEFAULT_CONFIDENCE = 0.5
+
+
+class LanguageGuess(NamedTuple):
+    language: str
+    confidence: float
+
+
+def detect(text: str) -> LanguageGuess:
+    """
+    Language of a message ("en", "hi" or "or") with a 0..1 confidence.
+
+    Indic script decides when present: the script with more letters wins, with
+    confidence lowered by the share of Latin letters mixed in. Latin-only text is
+    scored by whole-word hits in the romanized Hindi/Odia and English word sets.
+    """
+    if not text:
+        return LanguageGuess("en", DEFAULT_CONFIDENCE)
+
+    if text.isascii():
+        # Common case: no Indic letters possible, only whole-word evidence matters
+        return _score_words(_LATIN_RE.findall(text.lower()))
+
+    devanagari = odia = latin = 0
+    words = []
+    for deva_run, odia_run, word in _TOKEN_RE.findall(text):
+        if word:
+            latin += len(word)
+            words.append(word.lower())
+        elif deva_run:
+            devanagari += len(deva_run)
+        else:
+            odia += len(odia_run)
+
+    indic = devanagari + odia
+    if not indic:
+        return _score_words(words)
+    language, letters = ("hi", devanagari) if devanagari >= odia else ("or", odia)
+    share = indic / (indic + latin)
+    return LanguageGuess(language, round(letters / indic * (0.5 + 0.5 * share), 3))
+
+
+def _score_words(words) -> LanguageGuess:
+    hi_hits = sum(map(HINDI_WORDS.__contains__, words))
+    or_hits = sum(map(ODIA_WORDS.__contains__, words))
+    en_hits = sum(map(ENGLISH_WORDS.__contains__, words))
+    total = hi_hits + or_hits + en_hits
+    if not total or en_hits >= max(hi_hits, or_hits):
+        confidence = en_hits / total if total else DEFAULT_CONFIDENCE
+        return LanguageGuess("en", round(confidence, 3))
+    language, hits = ("hi", hi_hits) if hi_hits >= or_hits else ("or", or_hits)
+    return LanguageGuess(language, round(hits / total, 3))
+
+
+def parse_language_command(text: str) -> Optional[str]:
+    """Language code if the whole message asks to switch language, else None"""
+    match = _COMMAND_RE.match(text or "")
+    if match is None:
+        return None
+    word = match.group("word").lower()
+    # Bare "en"/"hi"/"or" are ordinary words ("Hi!" is a greeting); only accept them after "lang"
+    if len(word) == 2 and word.isascii() and not match.group("prefix"):
+        return None
+    return _COMMAND_LANGUAGES[word]
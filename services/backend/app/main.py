@@ -1,15 +1,48 @@
-from fastapi import FastAPI, Request, BackgroundTasks, Body, HTTPException
-from fastapi.responses import PlainTextResponse
+from fastapi import FastAPI, Request, BackgroundTasks, Body, HTTPException, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import json
 import logging
-import httpx
 import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
 
-from app.config import RASA_BASE_URL
-from app.db import init_db, add_subscriber, remove_subscriber, list_subscribers, save_broadcast, get_broadcasts
-from app.faqs import find_faq_answer, ask_gemini
+from app.db import (
+    init_db, add_subscriber, remove_subscriber, save_broadcast,
+    page_subscribers, iter_subscribers, subscriber_counts, analytics_summary, purge_activity,
+    page_broadcasts, count_broadcasts, count_subscribers,
+    outbound_counts, purge_cached_answers, run_db,
+)
+from app.faqs import find_faq_answer, stream_gemini
+from app.faq_retrieval import get_retriever, retrieve_faq_answer
+from app.answer_cache import answer_cache
 from app.models import OutboundAlert, SubscriberIn
-from app.messaging_utils import send_whatsapp_cloud, send_telegram
+from app.broadcast import BroadcastEngine, CHANNEL_ALIASES
+from app.outbound_queue import OutboundQueue
+from app.http_clients import upstreams
+from app.resolver import resolver, ask_rasa
+from app.idempotency import whatsapp_dedup
+from app.subscriber_import import SubscriberImporter, normalize_phone, normalize_region
+from app.telegram_poller import TelegramPoller
+from app.coalescer import MessageCoalescer
+from app.config import (
+    TELEGRAM_INGESTION_MODE, ANALYTICS_ACTIVITY_RETENTION_HOURS, BROADCAST_AUTO_RESUME, SUPPORTED_LANGUAGES,
+    LANGUAGE_MIN_CONFIDENCE,
+)
+from app.metrics import (
+    registry, CONTENT_TYPE, WEBHOOK_REQUESTS, WEBHOOK_EVENTS, WEBHOOK_ACK_SECONDS, REPLY_SECONDS,
+    ADMISSION_DECISIONS,
+)
+from app.admission import (
+    admission, ADMITTED, EMERGENCY, EMERGENCY_SHED, SHED, THROTTLED,
+    BUSY_REPLIES, THROTTLED_REPLIES, EMERGENCY_REPLIES,
+)
+from app.language import detect
+from app.pipeline import answer_pipeline, AnswerRequest, DISCLAIMER_KEYWORDS, health_disclaimer
+from app.sessions import sessions
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -30,12 +63,37 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+outbound_queue = OutboundQueue()
+
 @app.on_event("startup")
 async def startup():
     """Initialize database and services on startup"""
     init_db()
+    purge_cached_answers(answer_cache.ttl)
+    whatsapp_dedup.purge()
+    purge_activity(ANALYTICS_ACTIVITY_RETENTION_HOURS)
+    get_retriever()
+    await upstreams.start()
+    await sessions.start()
+    await outbound_queue.start()
+    if TELEGRAM_INGESTION_MODE == "polling":
+        await telegram_poller.start()
+    if BROADCAST_AUTO_RESUME:
+        resumed = await broadcast_engine.resume_interrupted()
+        if resumed:
+            logger.info(f"📣 Resumed {resumed} interrupted broadcast(s)")
     logger.info("🚀 Public Health Chatbot Backend started successfully")
 
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background workers; unsent replies stay queued in the database"""
+    await telegram_poller.stop()
+    await coalescer.stop()
+    await broadcast_engine.stop()
+    await outbound_queue.stop()
+    await sessions.stop()
+    await upstreams.stop()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint for monitoring"""
@@ -45,212 +103,471 @@ async def health_check():
         "version": "1.0.0"
     }
 
+async def _record_broadcast(job):
+    """Persist finished broadcasts to history (once, not again when failures are retried)"""
+    if job.status == "completed" and not job.retry:
+        await run_db(save_broadcast, job.text, job.channel)
+
+broadcast_engine = BroadcastEngine(on_complete=_record_broadcast)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics"""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+@app.get("/health/upstreams")
+async def upstream_health():
+    """Connection pool and circuit breaker stats per upstream"""
+    return upstreams.stats()
+
 # --- Core Message Processing ---
-async def _handle_message_and_reply(sender: str, message: str, channel: str):
+def _reply_key(channel: str, sender: str, message_id: Optional[str]) -> str:
+    """Idempotency key for the reply to an inbound message"""
+    return f"reply:{channel}:{sender}:{message_id or uuid.uuid4().hex}"
+
+async def _handle_message_and_reply(sender: str, message: str, channel: str, message_id: Optional[str] = None):
     """
-    Hybrid message processing: FAQ → Gemini → Rasa fallback
+    Hybrid message processing through the answer pipeline: FAQ → Gemini → Rasa fallback.
+    The reply is handed to the durable outbound queue rather than sent inline.
     """
+    if channel not in ("whatsapp", "telegram"):
+        logger.warning(f"Unknown channel: {channel}")
+        return
+    key = _reply_key(channel, sender, message_id)
+    started = time.perf_counter()
     try:
-        # Step 1: Try FAQ first (fastest)
-        answer = find_faq_answer(message)
-        source = "FAQ"
-        
-        if not answer:
-            # Step 2: Try Gemini AI (if available)
-            try:
-                answer = await ask_gemini(message)
-                source = "Gemini"
-            except Exception as e:
-                logger.warning(f"Gemini not available: {e}")
-                answer = None
+        request = AnswerRequest(sender, message, channel, session=await sessions.get(sender))
+        result = await answer_pipeline.run(
+            request,
+            fallback="Sorry, I couldn't process your request right now. Please try again later.",
+        )
 
-        if not answer:
-            # Step 3: Fallback to Rasa NLP
-            try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.post(
-                        f"{RASA_BASE_URL}/webhooks/rest/webhook",
-                        json={"sender": sender, "message": message},
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-                
-                answer = "\n".join([msg.get("text", "") for msg in data if msg.get("text")])
-                source = "Rasa"
-            except Exception as e:
-                logger.error(f"Rasa call failed: {e}")
-                answer = "Sorry, I couldn't process your request right now. Please try again later."
-                source = "Error"
-
-        # Add safety disclaimer for health-related responses
-        if answer and any(keyword in message.lower() for keyword in ['symptom', 'disease', 'medicine', 'treatment']):
-            answer += "\n\n⚠️ This is for information only. Please consult a healthcare professional for medical advice."
-
-        # Send response via appropriate channel
-        if channel == "whatsapp":
-            result = await send_whatsapp_cloud(sender, answer)
-        elif channel == "telegram":
-            result = await send_telegram(sender, answer)
-        else:
-            logger.warning(f"Unknown channel: {channel}")
-            return
+        queued = await outbound_queue.enqueue(channel, sender, result.answer, key)
+        REPLY_SECONDS.labels(channel, result.source).observe(time.perf_counter() - started)
 
-        logger.info(f"Message processed - Channel: {channel}, Source: {source}, Status: {result.get('status', 'unknown')}")
+        logger.info(
+            f"Message processed - Channel: {channel}, Language: {request.language}, Source: {result.source}, "
+            f"Status: {'queued' if queued else 'duplicate'}, Time: {result.total_ms:.1f}ms"
+        )
 
     except Exception as e:
         logger.error(f"Error processing message: {e}")
+        REPLY_SECONDS.labels(channel, "Error").observe(time.perf_counter() - started)
         # Send error message to user
         error_msg = "Sorry, there was a technical issue. Please try again."
-        if channel == "whatsapp":
-            await send_whatsapp_cloud(sender, error_msg)
-        elif channel == "telegram":
-            await send_telegram(sender, error_msg)
+        try:
+            await outbound_queue.enqueue(channel, sender, error_msg, key)
+        except Exception as qe:
+            logger.error(f"Failed to queue error reply: {qe}")
+
+@app.get("/outbound/stats")
+async def outbound_stats():
+    """Outbound queue depth by status (pending, sending, sent, skipped, dead)"""
+    return await run_db(outbound_counts)
 
 # --- Webhook Endpoints ---
+def _whatsapp_text_messages(payload: dict) -> List[Tuple[str, str, Optional[str]]]:
+    """(sender, text, message id) for every text message in every entry/change of a payload"""
+    found = []
+    for entry in payload.get("entry") or []:
+        for change in entry.get("changes") or []:
+            for message in (change.get("value") or {}).get("messages") or []:
+                from_number = message.get("from")
+                text_body = (message.get("text") or {}).get("body", "")
+                if from_number and text_body:
+                    found.append((from_number, text_body, message.get("id")))
+    return found
+
+async def _handle_message_batch(messages: List[Tuple[str, str, Optional[str]]], channel: str):
+    """
+    Admit and answer every message from one webhook delivery or polling batch concurrently.
+    Admission runs before any reply work is created, so a flood costs no more than the caps
+    in admission.py allow. With coalescing on, messages are buffered per sender first and
+    admitted as one combined query when the sender's window closes.
+    """
+    replies = []
+    for sender, text, message_id in messages:
+        if coalescer.enabled:
+            coalescer.add(channel, sender, text, message_id, urgent=admission.is_emergency(text))
+            continue
+        reply = _admit(sender, text, channel, message_id)
+        if reply is not None:
+            replies.append(reply)
+    await asyncio.gather(*replies)
+
+def _admit(sender: str, text: str, channel: str, message_id: Optional[str]):
+    """The reply coroutine admission allows for a message, or None if it is dropped"""
+    decision = admission.admit(sender, text)
+    ADMISSION_DECISIONS.labels(channel, decision).inc()
+    if decision in (ADMITTED, EMERGENCY):
+        return _answer_admitted(sender, text, channel, message_id, decision)
+    if decision in (SHED, THROTTLED, EMERGENCY_SHED):
+        return _reply_cheaply(sender, text, channel, message_id, decision)
+    return None
+
+coalescer = MessageCoalescer(_admit)
+
+async def _answer_admitted(sender: str, text: str, channel: str, message_id: Optional[str], decision: str):
+    try:
+        await _handle_message_and_reply(sender, text, channel, message_id)
+    finally:
+        admission.release(decision)
+
+async def _reply_cheaply(sender: str, text: str, channel: str, message_id: Optional[str], decision: str):
+    """Saturated, throttled or over the emergency cap: a local FAQ match or a canned reply, no upstream calls"""
+    started = time.perf_counter()
+    try:
+        guess = detect(text)
+        language = guess.language if guess.confidence >= LANGUAGE_MIN_CONFIDENCE else "en"
+        if decision == SHED:
+            answer = find_faq_answer(text, language) or BUSY_REPLIES.get(language, BUSY_REPLIES["en"])
+        elif decision == EMERGENCY_SHED:
+            answer = EMERGENCY_REPLIES.get(language, EMERGENCY_REPLIES["en"])
+        else:
+            answer = THROTTLED_REPLIES.get(language, THROTTLED_REPLIES["en"])
+        await outbound_queue.enqueue(channel, sender, answer, _reply_key(channel, sender, message_id))
+        REPLY_SECONDS.labels(channel, decision.capitalize()).observe(time.perf_counter() - started)
+    except Exception as e:
+        logger.error(f"Failed to queue {decision} reply: {e}")
+    finally:
+        admission.release(decision)
+
 @app.post("/webhook/whatsapp", response_class=PlainTextResponse)
 async def webhook_whatsapp(request: Request, background_tasks: BackgroundTasks):
     """WhatsApp Cloud API webhook handler"""
+    started = time.perf_counter()
+    WEBHOOK_REQUESTS.labels("whatsapp").inc()
     try:
-        payload = await request.json()
-        
-        # Parse WhatsApp webhook payload
-        entry = payload.get("entry", [])
-        if not entry:
-            return "OK"
-            
-        changes = entry[0].get("changes", [])
-        if not changes:
+        body = await request.body()
+
+        # Delivery/read status callbacks carry no "messages" key; ack them without parsing
+        if b'"messages"' not in body:
+            WEBHOOK_EVENTS.labels("whatsapp", "status").inc()
             return "OK"
-            
-        value = changes[0].get("value", {})
-        messages = value.get("messages", [])
-        
+
+        messages = _whatsapp_text_messages(json.loads(body))
         if not messages:
             return "OK"
-            
-        message = messages[0]
-        from_number = message.get("from")
-        text_body = message.get("text", {}).get("body", "") if message.get("text") else ""
-        
-        if from_number and text_body:
-            background_tasks.add_task(_handle_message_and_reply, from_number, text_body, "whatsapp")
-            
+
+        # Meta redelivers on slow acks; only message ids not seen before are processed
+        fresh = set(await whatsapp_dedup.claim(m[2] for m in messages if m[2]))
+        batch = []
+        for message in messages:
+            if message[2] is None or message[2] in fresh:
+                fresh.discard(message[2])
+                batch.append(message)
+        WEBHOOK_EVENTS.labels("whatsapp", "message").inc(len(batch))
+        if len(batch) < len(messages):
+            WEBHOOK_EVENTS.labels("whatsapp", "duplicate").inc(len(messages) - len(batch))
+
+        if batch:
+            background_tasks.add_task(_handle_message_batch, batch, "whatsapp")
+
     except Exception as e:
         logger.error(f"WhatsApp webhook error: {e}")
-    
+    finally:
+        WEBHOOK_ACK_SECONDS.labels("whatsapp").observe(time.perf_counter() - started)
+
     return "OK"
 
+def _telegram_text_message(update: dict) -> Optional[Tuple[str, str, Optional[str]]]:
+    """(chat id, text, message id) for a Telegram text message update, else None"""
+    message = update.get("message") or {}
+    chat_id = (message.get("chat") or {}).get("id")
+    text = message.get("text", "")
+    if not (chat_id and text):
+        return None
+    message_id = message.get("message_id")
+    return str(chat_id), text, str(message_id) if message_id is not None else None
+
 @app.post("/webhook/telegram", response_class=PlainTextResponse)
 async def webhook_telegram(request: Request, background_tasks: BackgroundTasks):
     """Telegram Bot API webhook handler"""
+    started = time.perf_counter()
+    WEBHOOK_REQUESTS.labels("telegram").inc()
     try:
         payload = await request.json()
-        
-        # Parse Telegram webhook payload
-        message = payload.get("message", {})
-        if not message:
-            return "OK"
-            
-        chat = message.get("chat", {})
-        chat_id = chat.get("id")
-        text = message.get("text", "")
-        
-        if chat_id and text:
-            background_tasks.add_task(_handle_message_and_reply, str(chat_id), text, "telegram")
-            
+
+        message = _telegram_text_message(payload)
+        if message:
+            WEBHOOK_EVENTS.labels("telegram", "message").inc()
+            background_tasks.add_task(_handle_message_batch, [message], "telegram")
+
     except Exception as e:
         logger.error(f"Telegram webhook error: {e}")
-    
+    finally:
+        WEBHOOK_ACK_SECONDS.labels("telegram").observe(time.perf_counter() - started)
+
     return "OK"
 
+async def _handle_telegram_updates(updates: List[dict]):
+    """Long-polling counterpart of webhook_telegram: answer a getUpdates batch concurrently"""
+    batch = [m for m in map(_telegram_text_message, updates) if m]
+    WEBHOOK_EVENTS.labels("telegram", "message").inc(len(batch))
+    await _handle_message_batch(batch, "telegram")
+
+telegram_poller = TelegramPoller(_handle_telegram_updates)
+
 # --- Subscriber Management ---
 @app.post("/subscribers")
 async def add_subscriber_endpoint(subscriber: SubscriberIn):
     """Add new subscriber for alerts"""
+    channel = CHANNEL_ALIASES.get(subscriber.channel.lower())
+    if channel is None:
+        raise HTTPException(status_code=400, detail=f"Unknown channel: {subscriber.channel}")
     try:
-        add_subscriber(subscriber.phone, subscriber.language)
+        await run_db(add_subscriber, subscriber.phone, subscriber.language,
+                     normalize_region(subscriber.region), channel)
         return {"success": True, "message": "Subscriber added successfully"}
     except Exception as e:
         logger.error(f"Error adding subscriber: {e}")
         raise HTTPException(status_code=500, detail="Failed to add subscriber")
 
+def _subscriber_item(row) -> dict:
+    phone, language, region, channel = row
+    return {"phone": phone, "language": language, "region": region, "channel": channel}
+
 @app.get("/subscribers")
-async def get_subscribers_endpoint():
-    """Get all subscribers"""
+async def get_subscribers_endpoint(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    language: Optional[str] = None,
+    prefix: Optional[str] = None,
+    region: Optional[str] = None,
+    channel: Optional[str] = None,
+):
+    """
+    One page of subscribers ordered by phone. Pass the returned `next_cursor` as
+    `cursor` to get the next page; it is null on the last page.
+    """
     try:
-        subscribers = list_subscribers()
-        return [{"phone": s.phone, "language": s.language} for s in subscribers]
+        rows = await run_db(page_subscribers, cursor, limit + 1, language, prefix,
+                            normalize_region(region), channel)
+        page = rows[:limit]
+        return {
+            "items": [_subscriber_item(row) for row in page],
+            "next_cursor": page[-1][0] if len(rows) > limit else None,
+        }
     except Exception as e:
         logger.error(f"Error fetching subscribers: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch subscribers")
 
+@app.get("/subscribers/stats")
+async def subscriber_stats_endpoint():
+    """Subscriber totals per language"""
+    try:
+        counts = await run_db(subscriber_counts)
+        return {"total": sum(counts.values()), "by_language": counts}
+    except Exception as e:
+        logger.error(f"Error fetching subscriber stats: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch subscriber stats")
+
+@app.post("/subscribers/import")
+async def import_subscribers_endpoint(request: Request, format: Optional[str] = None):
+    """
+    Bulk add/update subscribers from a CSV or NDJSON request body (format from the
+    `format` parameter or Content-Type). Returns counts and per-row errors.
+    """
+    fmt = format or ("ndjson" if "json" in request.headers.get("content-type", "") else "csv")
+    try:
+        importer = SubscriberImporter(fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    try:
+        report = await importer.run(request.stream())
+        logger.info(f"Subscriber import: {report.imported} imported, {report.rejected} rejected")
+        return {"success": True, **report.to_dict()}
+    except Exception as e:
+        logger.error(f"Subscriber import error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to import subscribers")
+
+def _csv_quote(value: Optional[str]) -> str:
+    return '"' + (value or "").replace('"', '""') + '"'
+
+def _subscriber_export(fmt: str, language: Optional[str], prefix: Optional[str],
+                       region: Optional[str], channel: Optional[str]):
+    if fmt == "csv":
+        yield "phone,language,region,channel\n"
+    for batch in iter_subscribers(language, prefix, region, channel):
+        if fmt == "csv":
+            yield "".join(f"{phone},{lang},{_csv_quote(region)},{chan}\n" for phone, lang, region, chan in batch)
+        else:
+            yield "".join(json.dumps(_subscriber_item(row)) + "\n" for row in batch)
+
+@app.get("/subscribers/export")
+async def export_subscribers_endpoint(format: str = "ndjson", language: Optional[str] = None,
+                                      prefix: Optional[str] = None, region: Optional[str] = None,
+                                      channel: Optional[str] = None):
+    """All matching subscribers as NDJSON or CSV, streamed batch by batch"""
+    if format not in ("csv", "ndjson"):
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    return StreamingResponse(
+        _subscriber_export(format, language, prefix, normalize_region(region), channel),
+        media_type="text/csv" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="subscribers.{format}"'},
+    )
+
 @app.delete("/subscribers/{phone}")
 async def delete_subscriber_endpoint(phone: str):
-    """Remove subscriber"""
+    """Remove subscriber (given as stored, or in any form the importer normalizes)"""
     try:
-        remove_subscriber(phone)
+        for key in {phone, normalize_phone(phone) or phone}:
+            await run_db(remove_subscriber, key)
         return {"success": True, "message": "Subscriber removed successfully"}
     except Exception as e:
         logger.error(f"Error removing subscriber: {e}")
         raise HTTPException(status_code=500, detail="Failed to remove subscriber")
 
+# --- Sender Sessions ---
+@app.get("/sessions/{sender}")
+async def get_session(sender: str):
+    """A sender's remembered language, recent turns and last answer source"""
+    try:
+        return (await sessions.get(sender)).to_dict()
+    except Exception as e:
+        logger.error(f"Error loading session: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load session")
+
+@app.put("/sessions/{sender}/language")
+async def set_session_language(sender: str, payload: dict = Body(...)):
+    """Set a sender's reply language (used by Rasa's action_set_language)"""
+    language = (payload.get("language") or "").strip().lower()
+    if language not in SUPPORTED_LANGUAGES:
+        raise HTTPException(status_code=400, detail=f"Unsupported language: {language or '(empty)'}")
+    try:
+        session = await sessions.get(sender)
+        sessions.set_language(session, language, "explicit")
+        return {"success": True, "sender": sender, "language": language}
+    except Exception as e:
+        logger.error(f"Error setting session language: {e}")
+        raise HTTPException(status_code=500, detail="Failed to set language")
+
 # --- Broadcast System ---
+async def _estimate_recipients(channel: str, segments: Optional[List[dict]]) -> int:
+    """
+    Progress total until the job seeds its ledger: subscribers per segment on the segment's
+    channel, defaulting to the broadcast channel (an upper bound if segments overlap)
+    """
+    default = CHANNEL_ALIASES[channel.lower()]
+    total = 0
+    for segment in segments or [{}]:
+        segment_channel = CHANNEL_ALIASES.get((segment.get("channel") or "").lower(), default)
+        total += await run_db(count_subscribers, segment.get("language"), segment.get("region"), segment_channel)
+    return total
+
+
 @app.post("/alerts/broadcast")
 async def broadcast_alert(alert: OutboundAlert):
-    """Broadcast alert to all subscribers"""
+    """
+    Start a broadcast; returns a job id to poll for progress. Without `segments` it goes to
+    every subscriber on `channel`, otherwise each segment (language/region/channel) gets its own text.
+    """
+    if alert.channel.lower() not in CHANNEL_ALIASES:
+        raise HTTPException(status_code=400, detail=f"Unknown channel: {alert.channel}")
+    segments = None
+    if alert.segments:
+        segments = [
+            {**segment.model_dump(), "language": (segment.language or "").lower() or None,
+             "region": normalize_region(segment.region)}
+            for segment in alert.segments
+        ]
     try:
-        subscribers = list_subscribers()
-        sent_count = 0
-        failed_count = 0
-        
-        for subscriber in subscribers:
-            try:
-                if alert.channel in ["whatsapp", "sms"]:
-                    result = await send_whatsapp_cloud(subscriber.phone, alert.text)
-                elif alert.channel in ["telegram", "tg"]:
-                    result = await send_telegram(subscriber.phone, alert.text)
-                else:
-                    logger.warning(f"Unknown channel: {alert.channel}")
-                    continue
-                
-                if result.get("status") == "sent":
-                    sent_count += 1
-                else:
-                    failed_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Failed to send to {subscriber.phone}: {e}")
-                failed_count += 1
-        
-        # Save broadcast to history
-        save_broadcast(alert.text, alert.channel)
-        
-        return {
-            "success": True,
-            "sent": sent_count,
-            "failed": failed_count,
-            "total": len(subscribers)
-        }
-        
+        # Recipients are selected into the delivery ledger when the job starts
+        total = await _estimate_recipients(alert.channel, segments)
+        job = broadcast_engine.start(alert.text, alert.channel, total=total, segments=segments)
+        return {"success": True, **job.to_dict()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     except Exception as e:
         logger.error(f"Broadcast error: {e}")
         raise HTTPException(status_code=500, detail="Failed to send broadcast")
 
+@app.get("/alerts/broadcast/{job_id}")
+async def broadcast_status(job_id: str):
+    """Live progress of a broadcast job; finished jobs are read back from the delivery ledger"""
+    try:
+        job = await broadcast_engine.load_job(job_id)
+    except Exception as e:
+        logger.error(f"Error loading broadcast {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load broadcast")
+    if not job:
+        raise HTTPException(status_code=404, detail="Broadcast job not found")
+    return job.to_dict()
+
+@app.post("/alerts/broadcast/{job_id}/pause")
+async def pause_broadcast(job_id: str):
+    """Stop a running broadcast after its in-flight sends; it can be resumed later"""
+    job = broadcast_engine.pause(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Broadcast job not found")
+    return {"success": True, **job.to_dict()}
+
+@app.post("/alerts/broadcast/{job_id}/resume")
+async def resume_broadcast(job_id: str, retry_failed: bool = False):
+    """Continue a paused or interrupted broadcast from its first undelivered recipient"""
+    try:
+        job = await broadcast_engine.resume(job_id, retry_failed=retry_failed)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error resuming broadcast {job_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to resume broadcast")
+    if not job:
+        raise HTTPException(status_code=404, detail="Broadcast job not found")
+    return {"success": True, **job.to_dict()}
+
 # --- History & Analytics ---
+def _utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Timestamps are stored as naive UTC"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _history_cursor(broadcast) -> str:
+    return f"{broadcast.timestamp.isoformat()}~{broadcast.id}"
+
+def _parse_history_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, broadcast_id = cursor.rsplit("~", 1)
+        return datetime.fromisoformat(timestamp), int(broadcast_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @app.get("/history")
-async def get_broadcast_history():
-    """Get broadcast history"""
+async def get_broadcast_history(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    channel: Optional[str] = None,
+):
+    """
+    Broadcast history, newest first, one page at a time. `since`/`until` bound the
+    timestamp (ISO 8601, UTC if no offset); pass `next_cursor` back as `cursor` for
+    the next page. `total` comes with the first page: exact without filters, capped at
+    10000 (`total_exact` false) with them.
+    """
+    before = _parse_history_cursor(cursor) if cursor else None
+    since, until = _utc_naive(since), _utc_naive(until)
     try:
-        broadcasts = get_broadcasts()
-        return [
-            {
-                "id": b.id,
-                "message": b.message,
-                "channel": b.channel,
-                "timestamp": b.timestamp.isoformat(),
-            }
-            for b in broadcasts
-        ]
+        rows = await run_db(page_broadcasts, before, limit + 1, since, until, channel)
+        page = rows[:limit]
+        total, exact = await run_db(count_broadcasts, since, until, channel) if not cursor else (None, None)
+        return {
+            "items": [
+                {
+                    "id": b.id,
+                    "message": b.message,
+                    "channel": b.channel,
+                    "timestamp": b.timestamp.isoformat(),
+                }
+                for b in page
+            ],
+            "next_cursor": _history_cursor(page[-1]) if len(rows) > limit else None,
+            "total": total,
+            "total_exact": exact,
+        }
     except Exception as e:
         logger.error(f"Error fetching history: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch history")
@@ -264,44 +581,33 @@ async def ask_endpoint(payload: dict = Body(...)):
         
         if not question.strip():
             return {"answer": "⚠️ Please provide a question"}
-        
+
+        # Clients that send a session_id get conversation context and a remembered language
+        session_id = payload.get("session_id")
+        session = await sessions.get(f"web:{session_id}") if session_id else None
+
+        # Explicit language if the client sends one, otherwise from the session or the question
+        request = AnswerRequest(session.sender if session else "web_user", question, "web",
+                                payload.get("language"), session)
+
+        if payload.get("stream"):
+            return StreamingResponse(_stream_answer(request), media_type="text/plain; charset=utf-8")
+
         # Use same processing logic as webhooks
-        answer = find_faq_answer(question)
-        source = "FAQ"
-        
-        if not answer:
-            try:
-                answer = await ask_gemini(question)
-                source = "Gemini"
-            except Exception:
-                answer = None
-        
-        if not answer:
-            try:
-                async with httpx.AsyncClient(timeout=10.0) as client:
-                    response = await client.post(
-                        f"{RASA_BASE_URL}/webhooks/rest/webhook",
-                        json={"sender": "web_user", "message": question},
-                    )
-                    response.raise_for_status()
-                    data = response.json()
-                
-                answer = "\n".join([msg.get("text", "") for msg in data if msg.get("text")])
-                source = "Rasa"
-            except Exception as e:
-                logger.error(f"Rasa error in /ask: {e}")
-                answer = "Sorry, I couldn't process your question right now."
-                source = "Error"
-        
-        # Add disclaimer for health queries
-        if answer and any(keyword in question.lower() for keyword in ['symptom', 'disease', 'medicine', 'treatment']):
-            answer += "\n\n⚠️ This is for information only. Please consult a healthcare professional for medical advice."
-        
-        return {
-            "answer": answer,
-            "source": source,
+        result = await answer_pipeline.run(
+            request,
+            fallback="Sorry, I couldn't process your question right now.",
+        )
+
+        response = {
+            "answer": result.answer,
+            "source": result.source,
+            "language": request.language,
             "success": True
         }
+        if payload.get("debug"):
+            response["trace"] = result.trace_dict()
+        return response
         
     except Exception as e:
         logger.error(f"Error in /ask endpoint: {e}")
@@ -311,30 +617,109 @@ async def ask_endpoint(payload: dict = Body(...)):
             "success": False
         }
 
+async def _stream_answer(request: AnswerRequest):
+    """Plain-text stream for /ask: FAQ answers arrive whole, Gemini text as it is generated"""
+    question, language = request.message, request.language
+    answer = find_faq_answer(question, language) or retrieve_faq_answer(question, language)
+    source = "FAQ"
+    if answer:
+        yield answer
+    else:
+        source = "Gemini"
+        async for chunk in stream_gemini(question, language, request.context):
+            answer = (answer or "") + chunk
+            yield chunk
+
+    if not answer:
+        source = "Rasa"
+        try:
+            answer = await ask_rasa(request.sender, question)
+        except Exception as e:
+            logger.error(f"Rasa error in /ask: {e}")
+        if not answer:
+            source = "Error"
+        yield answer or "Sorry, I couldn't process your question right now."
+
+    if request.session is not None:
+        sessions.record_turn(request.session, question, answer, source)
+
+    if any(keyword in question.lower() for keyword in DISCLAIMER_KEYWORDS):
+        yield health_disclaimer(language)
+
 # --- Analytics Endpoints ---
 @app.get("/analytics/stats")
 async def get_analytics_stats():
-    """Get basic analytics statistics"""
+    """Dashboard totals and recent activity, read from trigger-maintained summary tables"""
     try:
-        subscribers = list_subscribers()
-        broadcasts = get_broadcasts()
-        
-        # Language distribution
-        lang_dist = {}
-        for sub in subscribers:
-            lang = sub.language
-            lang_dist[lang] = lang_dist.get(lang, 0) + 1
-        
+        summary = await run_db(analytics_summary)
+        counters = summary["counters"]
+        day, week = summary["activity"][24], summary["activity"][168]
+        last_broadcast = summary["last_broadcast_at"]
+
         return {
-            "total_subscribers": len(subscribers),
-            "total_broadcasts": len(broadcasts),
-            "language_distribution": lang_dist,
-            "recent_broadcasts": len([b for b in broadcasts[-10:]]),  # Last 10
+            "total_subscribers": counters.get("subscribers", 0),
+            "total_broadcasts": counters.get("broadcasts", 0),
+            "language_distribution": {
+                name.split(":", 1)[1]: value
+                for name, value in counters.items()
+                if name.startswith("subscribers:") and value > 0
+            },
+            "recent_broadcasts": week.get("broadcast", 0),  # Last 7 days
+            "recent_activity": {
+                "broadcasts_24h": day.get("broadcast", 0),
+                "broadcasts_7d": week.get("broadcast", 0),
+                "replies_24h": day.get("reply", 0),
+                "replies_7d": week.get("reply", 0),
+                "last_broadcast_at": last_broadcast.isoformat() if last_broadcast else None,
+            },
         }
     except Exception as e:
         logger.error(f"Analytics error: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch analytics")
 
+@app.get("/analytics/faq-retrieval")
+async def faq_retrieval_stats():
+    """Similarity retrieval tier hit rate and Gemini calls avoided"""
+    retriever = get_retriever()
+    if retriever is None:
+        return {"enabled": False}
+    return {"enabled": True, **retriever.stats()}
+
+@app.get("/analytics/resolver")
+async def resolver_stats():
+    """Per-tier win rates and latency percentiles for Gemini/Rasa resolution"""
+    return resolver.stats()
+
+@app.get("/analytics/webhook-dedup")
+async def webhook_dedup_stats():
+    """Inbound WhatsApp message de-duplication counters"""
+    return whatsapp_dedup.stats()
+
+@app.get("/analytics/telegram-polling")
+async def telegram_polling_stats():
+    """getUpdates long-polling offset and batch counters"""
+    return {"mode": TELEGRAM_INGESTION_MODE, **telegram_poller.stats()}
+
+@app.get("/analytics/admission")
+async def admission_stats():
+    """Inbound admission decisions, in-flight reply counts and tracked senders"""
+    return admission.stats()
+
+@app.get("/analytics/coalescing")
+async def coalescing_stats():
+    """Per-sender message coalescing: fragments buffered and combined queries answered"""
+    return coalescer.stats()
+
+@app.get("/analytics/sessions")
+async def session_stats():
+    """Per-sender session store hit rate, evictions and write-behind counters"""
+    return sessions.stats()
+
+@app.get("/analytics/answer-cache")
+async def answer_cache_stats():
+    """Gemini answer cache hit/miss/eviction counters"""
+    return answer_cache.stats()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -1,7 +1,8 @@
 import os
-import httpx
 import logging
 
+from .http_clients import upstreams, CircuitOpenError
+
 logger = logging.getLogger(__name__)
 
 # WhatsApp Cloud API (Meta) configuration
@@ -18,7 +19,7 @@ async def send_whatsapp_cloud(to: str, body: str):
     """
     if not (WHATSAPP_PHONE_NUMBER_ID and WHATSAPP_CLOUD_TOKEN):
         return {"status": "skipped", "reason": "whatsapp cloud not configured"}
-    url = f"https://graph.facebook.com/v16.0/{WHATSAPP_PHONE_NUMBER_ID}/messages"
+    url = f"/v16.0/{WHATSAPP_PHONE_NUMBER_ID}/messages"
     headers = {
         "Authorization": f"Bearer {WHATSAPP_CLOUD_TOKEN}",
         "Content-Type": "application/json"
@@ -30,10 +31,12 @@ async def send_whatsapp_cloud(to: str, body: str):
         "text": {"preview_url": False, "body": body}
     }
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.post(url, headers=headers, json=payload)
-            r.raise_for_status()
-            return {"status": "sent", "meta": r.json()}
+        r = await upstreams.get("graph").post(url, headers=headers, json=payload)
+        r.raise_for_status()
+        return {"status": "sent", "meta": r.json()}
+    except CircuitOpenError as e:
+        logger.warning(f"WhatsApp Cloud send skipped: {e}")
+        return {"status": "error", "reason": str(e)}
     except Exception as e:
         logger.exception("WhatsApp Cloud send failed")
         return {"status": "error", "reason": str(e)}
@@ -45,13 +48,15 @@ async def send_telegram(chat_id: str, text: str):
     """
     if not TELEGRAM_BOT_TOKEN:
         return {"status": "skipped", "reason": "telegram not configured"}
-    url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
+    url = f"/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
     payload = {"chat_id": chat_id, "text": text}
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            r = await client.post(url, json=payload)
-            r.raise_for_status()
-            return {"status": "sent", "meta": r.json()}
+        r = await upstreams.get("telegram").post(url, json=payload)
+        r.raise_for_status()
+        return {"status": "sent", "meta": r.json()}
+    except CircuitOpenError as e:
+        logger.warning(f"Telegram send skipped: {e}")
+        return {"status": "error", "reason": str(e)}
     except Exception as e:
         logger.exception("Telegram send failed")
         return {"status": "error", "reason": str(e)}
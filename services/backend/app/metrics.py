@@ -0,0 +1,209 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Sequence, Tuple
+
+# Prometheus text exposition format, without a client library dependency
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str, **kwargs: str):
+        """Child metric for one label combination (cached, so hot paths can keep a reference)"""
+        key = tuple(str(v) for v in values) if values else tuple(str(kwargs[n]) for n in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        for key, child in sorted(self._children.items()):
+            lines.extend(self._render_child(key, child))
+        return lines
+
+    def _render_child(self, key, child) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"]
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float):
+        self.value = value
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _render_child(self, key, child) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+            cumulative += count
+            le = f'le="{_format_value(bound)}"'
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_value(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+WEBHOOK_REQUESTS = registry.register(Counter(
+    "chatbot_webhook_requests_total", "Inbound webhook requests", ["channel"]))
+WEBHOOK_EVENTS = registry.register(Counter(
+    "chatbot_webhook_events_total", "Inbound webhook events by kind (message, duplicate, status)",
+    ["channel", "kind"]))
+WEBHOOK_ACK_SECONDS = registry.register(Histogram(
+    "chatbot_webhook_ack_seconds", "Time to acknowledge an inbound webhook", ["channel"]))
+REPLY_SECONDS = registry.register(Histogram(
+    "chatbot_reply_seconds", "End-to-end time from webhook to queued reply", ["channel", "source"]))
+OUTBOUND_SENDS = registry.register(Counter(
+    "chatbot_outbound_sends_total", "Outbound reply send attempts by outcome", ["channel", "outcome"]))
+BROADCAST_MESSAGES = registry.register(Counter(
+    "chatbot_broadcast_messages_total", "Broadcast messages by outcome", ["channel", "outcome"]))
+BROADCASTS_RUNNING = registry.register(Gauge(
+    "chatbot_broadcasts_running", "Broadcast jobs currently running"))
+ADMISSION_DECISIONS = registry.register(Counter(
+    "chatbot_admission_decisions_total",
+    "Inbound messages by admission decision (admitted, emergency, emergency_shed, shed, throttled, dropped)",
+    ["channel", "decision"]))
+ADMISSION_IN_FLIGHT = registry.register(Gauge(
+    "chatbot_admission_in_flight", "Inbound messages being answered, by path (full, emergency, shed)", ["path"]))
+COALESCED_FRAGMENTS = registry.register(Histogram(
+    "chatbot_coalesced_fragments", "Inbound messages combined into one query", ["channel"],
+    buckets=(1, 2, 3, 4, 5, 8)))
+COALESCE_FLUSHES = registry.register(Counter(
+    "chatbot_coalesce_flushes_total",
+    "Coalesced queries by what ended the wait (window, max_wait, max_fragments, urgent, overflow, shutdown)",
+    ["channel", "reason"]))
+COALESCE_WAIT_SECONDS = registry.register(Histogram(
+    "chatbot_coalesce_wait_seconds", "Time the first fragment of a coalesced query was held", ["channel"]))
+DB_CALL_SECONDS = registry.register(Histogram(
+    "chatbot_db_call_seconds", "Latency of app.db helper calls", ["operation"]))
+
+
+def timed_db(fn):
+    """Record a db helper's latency in DB_CALL_SECONDS under its function name"""
+    child = DB_CALL_SECONDS.labels(fn.__name__)
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            child.observe(time.perf_counter() - start)
+    return wrapper
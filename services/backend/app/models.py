@@ -1,12 +1,23 @@
+from typing import List, Optional
 from pydantic import BaseModel
 
+class AlertSegment(BaseModel):
+    # Audience filters (any left out match everyone) and the text this audience gets
+    language: Optional[str] = None
+    region: Optional[str] = None
+    channel: Optional[str] = None
+    text: Optional[str] = None
+
 class OutboundAlert(BaseModel):
     text: str
     channel: str = "whatsapp"
+    segments: Optional[List[AlertSegment]] = None
 
 class SubscriberIn(BaseModel):
     phone: str
     language: str = "en"
+    region: Optional[str] = None
+    channel: str = "whatsapp"
 
 class InboundMessage(BaseModel):
     sender: str
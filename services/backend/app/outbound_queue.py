@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import random
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .config import (
+    OUTBOUND_WORKERS,
+    OUTBOUND_MAX_ATTEMPTS,
+    OUTBOUND_BACKOFF_BASE,
+    OUTBOUND_BACKOFF_MAX,
+    OUTBOUND_POLL_INTERVAL,
+)
+from .db import (
+    OutboundMessage,
+    enqueue_outbound,
+    claim_outbound,
+    finish_outbound,
+    requeue_stale_outbound,
+    run_db,
+)
+from .messaging_utils import send_whatsapp_cloud, send_telegram
+from .metrics import OUTBOUND_SENDS
+
+logger = logging.getLogger(__name__)
+
+Sender = Callable[[str, str], Awaitable[dict]]
+
+
+def backoff_delay(attempts: int, base: float = OUTBOUND_BACKOFF_BASE, cap: float = OUTBOUND_BACKOFF_MAX) -> float:
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**(attempts-1)))"""
+    return random.uniform(0, min(cap, base * (2 ** max(attempts - 1, 0))))
+
+
+class OutboundQueue:
+    """
+    Persistent outbound queue backed by the OutboundMessage table.
+    A dispatcher claims due rows and hands them to a pool of async send workers.
+    """
+
+    def __init__(
+        self,
+        senders: Optional[Dict[str, Sender]] = None,
+        workers: int = OUTBOUND_WORKERS,
+        max_attempts: int = OUTBOUND_MAX_ATTEMPTS,
+        poll_interval: float = OUTBOUND_POLL_INTERVAL,
+    ):
+        self.senders = senders or {"whatsapp": send_whatsapp_cloud, "telegram": send_telegram}
+        self.workers = max(1, workers)
+        self.max_attempts = max(1, max_attempts)
+        self.poll_interval = poll_interval
+        self._wakeup = asyncio.Event()
+        self._pending: "asyncio.Queue[OutboundMessage]" = asyncio.Queue(maxsize=self.workers * 2)
+        self._tasks: List[asyncio.Task] = []
+
+    async def enqueue(self, channel: str, recipient: str, body: str, idempotency_key: str) -> bool:
+        """Persist a message and wake the dispatcher. Duplicate keys are ignored."""
+        queued = await run_db(enqueue_outbound, channel, recipient, body, idempotency_key)
+        if queued:
+            self._wakeup.set()
+        return queued
+
+    async def start(self):
+        stale = await run_db(requeue_stale_outbound)
+        if stale:
+            logger.info(f"Requeued {stale} outbound messages left in flight by a previous run")
+        self._tasks.append(asyncio.create_task(self._dispatch()))
+        self._tasks.extend(asyncio.create_task(self._work()) for _ in range(self.workers))
+        logger.info(f"📤 Outbound queue started with {self.workers} workers")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        # Anything claimed but not sent is picked up again on next start
+        await run_db(requeue_stale_outbound)
+
+    async def _dispatch(self):
+        while True:
+            # Cleared before claiming, so an enqueue that lands during the claim still
+            # wakes the next wait instead of being lost until the poll interval
+            self._wakeup.clear()
+            try:
+                batch = await run_db(claim_outbound, self.workers * 2)
+            except Exception as e:
+                logger.error(f"Outbound queue claim failed: {e}")
+                batch = []
+            for message in batch:
+                await self._pending.put(message)
+            if not batch:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _work(self):
+        while True:
+            message = await self._pending.get()
+            try:
+                await self._deliver(message)
+            except Exception as e:
+                logger.error(f"Outbound worker error for message {message.id}: {e}")
+            finally:
+                self._pending.task_done()
+
+    async def _deliver(self, message: OutboundMessage):
+        sender = self.senders.get(message.channel)
+        if sender is None:
+            OUTBOUND_SENDS.labels(message.channel, "dead").inc()
+            await run_db(finish_outbound, message.id, "dead", error=f"Unknown channel: {message.channel}")
+            return
+
+        try:
+            result = await sender(message.recipient, message.body)
+        except Exception as e:
+            result = {"status": "error", "reason": str(e)}
+
+        status = result.get("status")
+        if status in ("sent", "skipped"):
+            OUTBOUND_SENDS.labels(message.channel, status).inc()
+            await run_db(finish_outbound, message.id, status, error=result.get("reason"))
+            return
+
+        error = result.get("reason") or "send failed"
+        if message.attempts >= self.max_attempts:
+            OUTBOUND_SENDS.labels(message.channel, "dead").inc()
+            logger.error(f"Dead-lettering outbound message {message.id} after {message.attempts} attempts: {error}")
+            await run_db(finish_outbound, message.id, "dead", error=error)
+        else:
+            OUTBOUND_SENDS.labels(message.channel, "retry").inc()
+            retry_at = datetime.utcnow() + timedelta(seconds=backoff_delay(message.attempts))
+            await run_db(finish_outbound, message.id, "pending", error=error, next_attempt_at=retry_at)
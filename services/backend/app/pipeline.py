@@ -0,0 +1,186 @@
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Union
+
+from .config import LANGUAGE_MIN_CONFIDENCE
+from .faqs import find_faq_answer, get_health_disclaimer
+from .faq_retrieval import retrieve_faq_answer
+from .language import LANGUAGE_SET_REPLIES, detect, parse_language_command
+from .resolver import TierTrace, resolver
+from .sessions import ConversationSession, sessions
+
+logger = logging.getLogger(__name__)
+
+DISCLAIMER_KEYWORDS = ['symptom', 'disease', 'medicine', 'treatment']
+
+
+def health_disclaimer(language: str) -> str:
+    """Safety disclaimer appended to health answers, in the reply language"""
+    return "\n\n" + get_health_disclaimer(language)
+
+# A stage returns an answer, an (answer, source) pair, or None to pass to the next stage
+StageResult = Union[None, str, Tuple[Optional[str], str]]
+Stage = Callable[["AnswerRequest"], Union[StageResult, Awaitable[StageResult]]]
+
+
+class AnswerRequest:
+    """
+    One inbound question on its way through the pipeline. Without an explicit
+    `language` it comes from the sender's session: an explicitly chosen language is used
+    as is; otherwise the message's language is detected, and a confident guess is kept
+    as the sender's preference. Unsure guesses fall back to that preference, else English.
+    """
+
+    def __init__(self, sender: str, message: str, channel: str = "web", language: Optional[str] = None,
+                 session: Optional[ConversationSession] = None):
+        self.sender = sender
+        self.message = message
+        self.channel = channel
+        self.session = session
+        # Trace of the stage currently running, for stages that report finer detail
+        self.stage_trace: Optional["StageTrace"] = None
+        if language is None:
+            language = self._session_language()
+        self.language = language
+
+    def _session_language(self) -> str:
+        session = self.session
+        if session is not None and session.language_source == "explicit":
+            return session.language
+        guess = detect(self.message)
+        if guess.confidence >= LANGUAGE_MIN_CONFIDENCE:
+            if session is not None:
+                sessions.set_language(session, guess.language, "detected")
+            return guess.language
+        return session.language if session is not None and session.language else "en"
+
+    @property
+    def context(self) -> Tuple[Tuple[str, str], ...]:
+        """Recent (question, answer) turns of this sender's conversation"""
+        return self.session.context() if self.session is not None else ()
+
+
+class StageTrace:
+    """Timing and outcome of one stage for one request"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.outcome = "skipped"
+        self.wall_ms = 0.0
+        self.source: Optional[str] = None
+        self.error: Optional[str] = None
+        # Per-tier attempts inside the stage (Gemini/Rasa for the generative stage)
+        self.tiers: List[TierTrace] = []
+
+    def to_dict(self) -> dict:
+        data: dict = {"stage": self.name, "outcome": self.outcome, "wall_ms": round(self.wall_ms, 3)}
+        if self.source and self.source != self.name:
+            data["source"] = self.source
+        if self.error:
+            data["error"] = self.error
+        if self.tiers:
+            data["tiers"] = [t.to_dict() for t in self.tiers]
+        return data
+
+
+class PipelineResult:
+    def __init__(self, answer: str, source: str, trace: List[StageTrace], total_ms: float):
+        self.answer = answer
+        self.source = source
+        self.trace = trace
+        self.total_ms = total_ms
+
+    def trace_dict(self) -> dict:
+        return {"total_ms": round(self.total_ms, 3), "stages": [t.to_dict() for t in self.trace]}
+
+
+class AnswerPipeline:
+    """
+    Ordered answer stages shared by the webhook reply path and /ask.
+    The first stage to return an answer wins; every stage is timed and its
+    hit/miss/error outcome recorded in the result's trace.
+    """
+
+    def __init__(self):
+        self.stages: List[Tuple[str, Stage]] = []
+
+    def register(self, name: str, stage: Stage) -> "AnswerPipeline":
+        self.stages.append((name, stage))
+        return self
+
+    async def run(self, request: AnswerRequest, fallback: str) -> PipelineResult:
+        """Resolve `request`; `fallback` is the reply when no stage answers"""
+        started = time.perf_counter()
+        trace = [StageTrace(name) for name, _ in self.stages]
+        answer, source = None, "Error"
+
+        for (name, stage), stage_trace in zip(self.stages, trace):
+            t0 = time.perf_counter()
+            request.stage_trace = stage_trace
+            try:
+                result: Any = stage(request)
+                if inspect.isawaitable(result):
+                    result = await result
+            except Exception as e:
+                logger.error(f"Answer stage {name} failed: {e}")
+                stage_trace.outcome = "error"
+                stage_trace.error = str(e)
+                result = None
+            stage_trace.wall_ms = (time.perf_counter() - t0) * 1000
+
+            stage_source = name
+            if isinstance(result, tuple):
+                result, stage_source = result
+            if stage_trace.outcome != "error":
+                stage_trace.outcome = "hit" if result else "miss"
+            if result:
+                stage_trace.source = stage_source
+                answer, source = result, stage_source
+                break
+        request.stage_trace = None
+
+        if not answer:
+            answer, source = fallback, "Error"
+        if request.session is not None:
+            # Fallbacks and language switches are no useful context for later questions
+            context_answer = answer if source not in ("Error", "Language") else None
+            sessions.record_turn(request.session, request.message, context_answer, source)
+
+        # Add safety disclaimer for health-related responses
+        if any(keyword in request.message.lower() for keyword in DISCLAIMER_KEYWORDS):
+            answer += health_disclaimer(request.language)
+
+        return PipelineResult(answer, source, trace, (time.perf_counter() - started) * 1000)
+
+
+def set_language_stage(request: AnswerRequest) -> Optional[str]:
+    """Handles "lang hi" / "Hindi" style messages by switching the sender's reply language"""
+    language = parse_language_command(request.message)
+    if language is None:
+        return None
+    request.language = language
+    if request.session is not None:
+        sessions.set_language(request.session, language, "explicit")
+    return LANGUAGE_SET_REPLIES[language]
+
+
+def generative_stage(request: AnswerRequest):
+    """Gemini/Rasa via the resolver; each tier's timing and outcome go on the stage trace"""
+    tiers = request.stage_trace.tiers if request.stage_trace is not None else None
+    return resolver.resolve(request.sender, request.message, request.channel, request.language,
+                            request.context, trace=tiers)
+
+
+def build_default_pipeline() -> AnswerPipeline:
+    """Language switch → FAQ → similar-FAQ retrieval → Gemini/Rasa (sequential or hedged, see resolver.py)"""
+    return (
+        AnswerPipeline()
+        .register("Language", set_language_stage)
+        .register("FAQ", lambda r: find_faq_answer(r.message, r.language))
+        .register("Retrieval", lambda r: retrieve_faq_answer(r.message, r.language))
+        .register("Generative", generative_stage)
+    )
+
+
+answer_pipeline = build_default_pipeline()
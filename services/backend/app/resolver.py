@@ -0,0 +1,219 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .config import RESOLVER_MODE, RESOLVER_HEDGE_DELAY, RESOLVER_BUDGETS, RESOLVER_RASA_RESERVE, GEMINI_TIMEOUT
+from .faqs import ask_gemini
+from .http_clients import upstreams
+
+logger = logging.getLogger(__name__)
+
+# Latency samples kept per tier for percentile reporting
+LATENCY_WINDOW = 1000
+
+
+async def ask_rasa(sender: str, message: str) -> Optional[str]:
+    """Rasa REST webhook reply, joined into one text; raises on HTTP/transport errors"""
+    response = await upstreams.get("rasa").post(
+        "/webhooks/rest/webhook",
+        json={"sender": sender, "message": message},
+    )
+    response.raise_for_status()
+    data = response.json()
+    return "\n".join([msg.get("text", "") for msg in data if msg.get("text")])
+
+
+class TierStats:
+    """Wins, attempts and a rolling latency window for one answering tier"""
+
+    def __init__(self):
+        self.started = 0
+        self.wins = 0
+        self.cancelled = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, seconds: float):
+        self.latencies.append(seconds)
+
+    def to_dict(self, total_resolutions: int) -> dict:
+        samples = sorted(self.latencies)
+
+        def pct(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            return round(samples[min(len(samples) - 1, int(p * len(samples)))] * 1000, 1)
+
+        return {
+            "started": self.started,
+            "wins": self.wins,
+            "win_rate": round(self.wins / total_resolutions, 4) if total_resolutions else 0.0,
+            "cancelled": self.cancelled,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "latency_ms": {"p50": pct(0.50), "p90": pct(0.90), "p99": pct(0.99)},
+        }
+
+
+class TierTrace:
+    """One tier's attempt within a single resolution, for the /ask debug trace"""
+
+    def __init__(self, name: str, started_ms: float):
+        self.name = name
+        self.started_ms = started_ms
+        self.wall_ms = 0.0
+        # running -> answered | empty | timeout | error | cancelled | budget_exceeded
+        self.outcome = "running"
+
+    def to_dict(self) -> dict:
+        return {"tier": self.name, "outcome": self.outcome,
+                "started_ms": round(self.started_ms, 3), "wall_ms": round(self.wall_ms, 3)}
+
+
+class HedgedResolver:
+    """
+    Resolves questions the FAQ tiers missed, using Gemini and Rasa.
+
+    sequential: Gemini, then Rasa if Gemini has no answer (the original behaviour).
+    hedged: Gemini starts first; if it hasn't answered within `hedge_delay`, Rasa is
+    started in parallel. The first non-empty answer wins and the other call is cancelled.
+    Either way the whole resolution is bounded by the channel's latency budget, and Gemini
+    gets its own shorter deadline so a slow Gemini still leaves Rasa `rasa_reserve` seconds.
+    Gemini also gets the sender's recent turns as context; Rasa keeps its own tracker.
+    Pass a `trace` list to `resolve` to get a TierTrace per tier attempted.
+    """
+
+    def __init__(self, mode: str = RESOLVER_MODE, hedge_delay: float = RESOLVER_HEDGE_DELAY,
+                 budgets: Optional[Dict[str, float]] = None,
+                 rasa_reserve: float = RESOLVER_RASA_RESERVE, gemini_timeout: float = GEMINI_TIMEOUT,
+                 gemini: Callable[..., Awaitable[Optional[str]]] = ask_gemini,
+                 rasa: Callable[[str, str], Awaitable[Optional[str]]] = ask_rasa):
+        self.mode = mode
+        self.hedge_delay = hedge_delay
+        self.budgets = budgets or dict(RESOLVER_BUDGETS)
+        self.rasa_reserve = rasa_reserve
+        self.gemini_timeout = gemini_timeout
+        self.gemini = gemini
+        self.rasa = rasa
+        self.resolutions = 0
+        self.timeouts = 0
+        self.tiers = {"Gemini": TierStats(), "Rasa": TierStats()}
+
+    async def resolve(self, sender: str, message: str, channel: str = "web", language: str = "en",
+                      context: Sequence[Tuple[str, str]] = (),
+                      trace: Optional[List[TierTrace]] = None) -> Tuple[Optional[str], str]:
+        """Returns (answer, source); answer is None if no tier answered within budget"""
+        budget = self.budgets.get(channel, max(self.budgets.values()))
+        attempts = trace if trace is not None else []
+        started = time.perf_counter()
+
+        def gemini_call():
+            return asyncio.wait_for(self.gemini(message, language, context), timeout=self.gemini_deadline(budget))
+
+        self.resolutions += 1
+        unfinished = "cancelled"
+        try:
+            if self.mode == "hedged":
+                resolution = self._hedged(sender, message, gemini_call, attempts, started)
+            else:
+                resolution = self._sequential(sender, message, gemini_call, attempts, started)
+            return await asyncio.wait_for(resolution, timeout=budget)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            unfinished = "budget_exceeded"
+            logger.warning(f"No answer within {budget}s budget for {channel}")
+            return None, "Error"
+        finally:
+            # Tiers cut off by the budget or a winning hedge don't get to finish themselves
+            now_ms = (time.perf_counter() - started) * 1000
+            for attempt in attempts:
+                if attempt.outcome == "running":
+                    attempt.outcome = unfinished
+                    attempt.wall_ms = now_ms - attempt.started_ms
+
+    def gemini_deadline(self, budget: float) -> float:
+        return min(self.gemini_timeout, max(budget - self.rasa_reserve, budget / 2))
+
+    async def _run_tier(self, name: str, call: Awaitable[Optional[str]], attempts: List[TierTrace],
+                        resolve_started: float) -> Optional[str]:
+        stats = self.tiers[name]
+        stats.started += 1
+        start = time.perf_counter()
+        attempt = TierTrace(name, (start - resolve_started) * 1000)
+        attempts.append(attempt)
+        try:
+            answer = await call
+            stats.record(time.perf_counter() - start)
+            attempt.outcome = "answered" if answer else "empty"
+            return answer
+        except asyncio.CancelledError:
+            # Left "running": resolve() labels it, as the cancellation may land after it returned
+            stats.cancelled += 1
+            raise
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            attempt.outcome = "timeout"
+            logger.warning(f"{name} gave no answer within its deadline")
+            return None
+        except Exception as e:
+            stats.errors += 1
+            attempt.outcome = "error"
+            logger.error(f"{name} call failed: {e}")
+            return None
+        finally:
+            if attempt.outcome != "running":
+                attempt.wall_ms = (time.perf_counter() - start) * 1000
+
+    async def _sequential(self, sender: str, message: str, gemini_call: Callable[[], Awaitable[Optional[str]]],
+                          attempts: List[TierTrace], started: float) -> Tuple[Optional[str], str]:
+        for name, call in (("Gemini", gemini_call),
+                           ("Rasa", lambda: self.rasa(sender, message))):
+            answer = await self._run_tier(name, call(), attempts, started)
+            if answer:
+                self.tiers[name].wins += 1
+                return answer, name
+        return None, "Error"
+
+    async def _hedged(self, sender: str, message: str, gemini_call: Callable[[], Awaitable[Optional[str]]],
+                      attempts: List[TierTrace], started: float) -> Tuple[Optional[str], str]:
+        tasks: Dict[asyncio.Future, str] = {}
+        try:
+            # Created inside the try so a budget timeout at any await cancels them
+            tasks[asyncio.ensure_future(self._run_tier("Gemini", gemini_call(), attempts, started))] = "Gemini"
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay)
+            first = next(iter(done), None)
+            if first is not None and first.result():
+                self.tiers["Gemini"].wins += 1
+                return first.result(), "Gemini"
+
+            tasks[asyncio.ensure_future(self._run_tier("Rasa", self.rasa(sender, message), attempts, started))] = "Rasa"
+            pending = {t for t in tasks if not t.done()}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.result():
+                        name = tasks[task]
+                        self.tiers[name].wins += 1
+                        return task.result(), name
+            return None, "Error"
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "hedge_delay_seconds": self.hedge_delay,
+            "budgets_seconds": self.budgets,
+            "gemini_deadlines_seconds": {c: self.gemini_deadline(b) for c, b in self.budgets.items()},
+            "resolutions": self.resolutions,
+            "budget_timeouts": self.timeouts,
+            "tiers": {name: s.to_dict(self.resolutions) for name, s in self.tiers.items()},
+        }
+
+
+resolver = HedgedResolver()
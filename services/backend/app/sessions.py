@@ -0,0 +1,242 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from .config import (
+    SESSION_CACHE_SIZE, SESSION_TTL, SESSION_CONTEXT_TURNS, SESSION_CONTEXT_CHARS,
+    SESSION_FLUSH_INTERVAL, SESSION_PERSIST, SESSION_RETENTION_DAYS,
+)
+from .db import get_sender_session, save_sender_sessions, purge_sender_sessions, run_db
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationSession:
+    """One sender's preferred language, recent (question, answer) turns and last answer source"""
+
+    __slots__ = ("sender", "language", "language_source", "turns", "last_source", "updated_at")
+
+    def __init__(self, sender: str, max_turns: int = SESSION_CONTEXT_TURNS):
+        self.sender = sender
+        self.language: Optional[str] = None
+        self.language_source: Optional[str] = None
+        self.turns: deque = deque(maxlen=max(0, max_turns))
+        self.last_source: Optional[str] = None
+        self.updated_at = time.time()
+
+    def context(self) -> Tuple[Tuple[str, str], ...]:
+        return tuple(self.turns)
+
+    def to_row(self) -> dict:
+        return {
+            "sender": self.sender,
+            "language": self.language,
+            "language_source": self.language_source,
+            "turns": json.dumps(list(self.turns), ensure_ascii=False),
+            "last_source": self.last_source,
+            "updated_at": datetime.utcfromtimestamp(self.updated_at),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "sender": self.sender,
+            "language": self.language,
+            "language_source": self.language_source,
+            "turns": [{"question": q, "answer": a} for q, a in self.turns],
+            "last_source": self.last_source,
+            "updated_at": datetime.utcfromtimestamp(self.updated_at).isoformat(),
+        }
+
+
+class SessionStore:
+    """
+    In-memory LRU + idle-TTL store of per-sender sessions with write-behind persistence.
+
+    Reads are served from memory; only a sender not seen within the TTL costs one
+    SenderSession lookup. Changes mark the session dirty and a background task writes
+    dirty sessions in batches every `flush_interval` seconds (and on stop). Sessions
+    evicted before their flush are kept aside until written, so nothing is lost.
+    The language preference outlives the TTL; conversation turns do not.
+    """
+
+    def __init__(self, max_entries: int = SESSION_CACHE_SIZE, ttl: float = SESSION_TTL,
+                 max_turns: int = SESSION_CONTEXT_TURNS, max_answer_chars: int = SESSION_CONTEXT_CHARS,
+                 flush_interval: float = SESSION_FLUSH_INTERVAL, persist: bool = SESSION_PERSIST):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.max_turns = max_turns
+        self.max_answer_chars = max_answer_chars
+        self.flush_interval = flush_interval
+        self.persist = persist
+        # sender -> (session, expires_at), least recently used first
+        self._entries: "OrderedDict[str, Tuple[ConversationSession, float]]" = OrderedDict()
+        self._dirty: Dict[str, ConversationSession] = {}
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.loads = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.flushes = 0
+        self.written = 0
+
+    async def get(self, sender: str) -> ConversationSession:
+        """The sender's session, loaded from SQLite (or created) if not in memory"""
+        now = time.monotonic()
+        entry = self._entries.get(sender)
+        if entry is not None:
+            if entry[1] > now:
+                self._entries[sender] = (entry[0], now + self.ttl)
+                self._entries.move_to_end(sender)
+                self.hits += 1
+                return entry[0]
+            del self._entries[sender]
+            self.expirations += 1
+
+        # Concurrent first messages from one sender share a single load
+        loading = self._loading.get(sender)
+        if loading is not None:
+            return await asyncio.shield(loading)
+        future = asyncio.get_running_loop().create_future()
+        self._loading[sender] = future
+        try:
+            session = await self._load(sender)
+            self._store(session, time.monotonic() + self.ttl)
+            future.set_result(session)
+            return session
+        finally:
+            del self._loading[sender]
+            if not future.done():
+                future.cancel()
+
+    async def _load(self, sender: str) -> ConversationSession:
+        # An evicted session still waiting for its write is newer than the stored row
+        pending = self._dirty.get(sender)
+        if pending is not None:
+            self.loads += 1
+            return pending
+
+        session = ConversationSession(sender, self.max_turns)
+        row = None
+        if self.persist:
+            try:
+                row = await run_db(get_sender_session, sender)
+            except Exception as e:
+                logger.warning(f"Session read failed for {sender}: {e}")
+        if row is None:
+            self.misses += 1
+            return session
+
+        self.loads += 1
+        session.language = row.language
+        session.language_source = row.language_source
+        session.last_source = row.last_source
+        session.updated_at = row.updated_at.replace(tzinfo=timezone.utc).timestamp()
+        if time.time() - session.updated_at < self.ttl:
+            try:
+                session.turns.extend(tuple(turn) for turn in json.loads(row.turns or "[]"))
+            except ValueError:
+                pass
+        return session
+
+    def _store(self, session: ConversationSession, expires_at: float):
+        self._entries[session.sender] = (session, expires_at)
+        self._entries.move_to_end(session.sender)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _expire(self, now: float):
+        # Every access pushes an entry to the back with a fresh expiry, so expired ones sit at the front
+        while self._entries:
+            sender, (_, expires_at) = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[sender]
+            self.expirations += 1
+
+    def _touch(self, session: ConversationSession):
+        session.updated_at = time.time()
+        if self.persist:
+            self._dirty[session.sender] = session
+
+    def set_language(self, session: ConversationSession, language: str, source: str = "explicit"):
+        """Remember `language` for the sender; a detected language never overrides an explicit one"""
+        if source != "explicit" and session.language_source == "explicit":
+            return
+        if session.language == language and session.language_source == source:
+            return
+        session.language = language
+        session.language_source = source
+        self._touch(session)
+
+    def record_turn(self, session: ConversationSession, question: str, answer: Optional[str], source: str):
+        """Remember an answered question as context for the sender's next ones"""
+        session.last_source = source
+        if answer and self.max_turns > 0:
+            session.turns.append((question, answer[:self.max_answer_chars]))
+        self._touch(session)
+
+    async def flush(self) -> int:
+        """Write dirty sessions to SQLite; failed writes are retried on the next flush"""
+        if not self._dirty:
+            return 0
+        batch, self._dirty = self._dirty, {}
+        try:
+            written = await run_db(save_sender_sessions, [s.to_row() for s in batch.values()])
+        except Exception as e:
+            logger.warning(f"Session flush of {len(batch)} senders failed: {e}")
+            for sender, session in batch.items():
+                self._dirty.setdefault(sender, session)
+            return 0
+        self.flushes += 1
+        self.written += written
+        return written
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            self._expire(time.monotonic())
+            await self.flush()
+
+    async def start(self):
+        if self.persist:
+            purged = await run_db(purge_sender_sessions, SESSION_RETENTION_DAYS * 86400)
+            if purged:
+                logger.info(f"Purged {purged} sender sessions older than {SESSION_RETENTION_DAYS} days")
+            self._task = asyncio.create_task(self._flush_loop())
+        logger.info(f"💬 Session store started (max {self.max_entries} senders, ttl {self.ttl:.0f}s)")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.loads + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "context_turns": self.max_turns,
+            "persistent": self.persist,
+            "hits": self.hits,
+            "loads": self.loads,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "dirty": len(self._dirty),
+            "flushes": self.flushes,
+            "written": self.written,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+sessions = SessionStore()
@@ -0,0 +1,180 @@
+import codecs
+import csv
+import json
+import logging
+import re
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from .config import SUPPORTED_LANGUAGES, DEFAULT_COUNTRY_CODE, IMPORT_BATCH_SIZE, IMPORT_MAX_ERRORS
+from .broadcast import CHANNEL_ALIASES
+from .db import upsert_subscribers, run_db
+
+logger = logging.getLogger(__name__)
+
+_PHONE_SEPARATORS_RE = re.compile(r"[\s\-().]")
+PHONE_HEADERS = ("phone", "phone_number", "number", "mobile")
+
+
+def normalize_phone(raw: str, default_country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    International digits-only form used throughout the app ('9198xxxxxxxx'),
+    or None if `raw` isn't a plausible phone number.
+    """
+    phone = _PHONE_SEPARATORS_RE.sub("", raw or "")
+    if phone.lower().startswith("whatsapp:"):
+        phone = phone[len("whatsapp:"):]
+    if phone.startswith("+"):
+        phone = phone[1:]
+    elif phone.startswith("00"):
+        phone = phone[2:]
+    elif len(phone) == 10 and default_country_code:
+        phone = default_country_code + phone
+    if not phone.isdigit() or not 8 <= len(phone) <= 15:
+        return None
+    return phone
+
+
+def normalize_recipient(raw: str, channel: str = "whatsapp") -> Optional[str]:
+    """Phone number for WhatsApp subscribers; Telegram subscribers are stored by chat id"""
+    if channel == "telegram":
+        chat_id = (raw or "").strip()
+        return chat_id if chat_id.lstrip("-").isdigit() else None
+    return normalize_phone(raw)
+
+
+def normalize_region(raw: Optional[str]) -> Optional[str]:
+    """Canonical district/region name ('khordha ' -> 'Khordha'), None when blank"""
+    region = " ".join((raw or "").split()).title()
+    return region or None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines without buffering the whole body"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class ImportReport:
+    """Counts plus a capped list of per-row errors for one bulk import"""
+
+    def __init__(self, max_errors: int = IMPORT_MAX_ERRORS):
+        self.rows = 0
+        self.imported = 0
+        self.rejected = 0
+        self.batches = 0
+        self.max_errors = max_errors
+        self.errors: List[dict] = []
+
+    def reject(self, row: int, value: str, error: str):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "value": value[:200], "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "errors": self.errors,
+            "errors_truncated": self.rejected > len(self.errors),
+        }
+
+
+class SubscriberImporter:
+    """
+    Streams CSV or NDJSON rows into the Subscriber table.
+
+    CSV is `phone[,language[,region[,channel]]]`, with an optional header row naming
+    the columns. NDJSON is one {"phone", "language", "region", "channel"} object per
+    line. Valid rows are upserted `batch_size` at a time; a phone repeated within a
+    batch keeps its last values.
+    """
+
+    def __init__(self, fmt: str, batch_size: int = IMPORT_BATCH_SIZE, languages: List[str] = SUPPORTED_LANGUAGES):
+        if fmt not in ("csv", "ndjson"):
+            raise ValueError(f"Unsupported import format: {fmt}")
+        self.fmt = fmt
+        self.batch_size = max(1, batch_size)
+        self.languages = set(languages)
+        self.report = ImportReport()
+        self._batch: Dict[str, dict] = {}
+        # Column positions of phone, language, region and channel
+        self._columns: Tuple[int, Optional[int], Optional[int], Optional[int]] = (0, 1, 2, 3)
+
+    async def run(self, chunks: AsyncIterator[bytes]) -> ImportReport:
+        row = 0
+        async for line in iter_lines(chunks):
+            row += 1
+            if not line.strip():
+                continue
+            if row == 1 and self.fmt == "csv" and self._read_header(line):
+                continue
+            self.report.rows += 1
+            self._add(row, line)
+            if len(self._batch) >= self.batch_size:
+                await self._flush()
+        await self._flush()
+        return self.report
+
+    def _read_header(self, line: str) -> bool:
+        cells = [c.strip().lower() for c in next(csv.reader([line]))]
+        phone_col = next((i for i, c in enumerate(cells) if c in PHONE_HEADERS), None)
+        if phone_col is None:
+            return False
+        lang_col = next((i for i, c in enumerate(cells) if c in ("language", "lang")), None)
+        region_col = next((i for i, c in enumerate(cells) if c in ("region", "district")), None)
+        channel_col = next((i for i, c in enumerate(cells) if c == "channel"), None)
+        self._columns = (phone_col, lang_col, region_col, channel_col)
+        return True
+
+    def _parse(self, line: str) -> Tuple[str, str, str, str]:
+        if self.fmt == "ndjson":
+            data = json.loads(line)
+            if not isinstance(data, dict):
+                raise ValueError("expected a JSON object")
+            return (str(data.get("phone") or ""), str(data.get("language") or "en"),
+                    str(data.get("region") or ""), str(data.get("channel") or "whatsapp"))
+        cells = next(csv.reader([line]))
+        phone, language, region, channel = (
+            cells[col] if col is not None and col < len(cells) else "" for col in self._columns
+        )
+        return phone, language.strip() or "en", region, channel.strip() or "whatsapp"
+
+    def _add(self, row: int, line: str):
+        try:
+            raw_phone, language, region, channel = self._parse(line)
+        except (ValueError, csv.Error) as e:
+            self.report.reject(row, line, f"unparseable row: {e}")
+            return
+        resolved = CHANNEL_ALIASES.get(channel.strip().lower())
+        if resolved is None:
+            self.report.reject(row, line, f"unsupported channel: {channel}")
+            return
+        channel = resolved
+        phone = normalize_recipient(raw_phone, channel)
+        if phone is None:
+            self.report.reject(row, line, "invalid phone number" if channel == "whatsapp" else "invalid chat id")
+            return
+        language = language.lower()
+        if language not in self.languages:
+            self.report.reject(row, line, f"unsupported language: {language}")
+            return
+        self._batch[phone] = {"phone": phone, "language": language,
+                              "region": normalize_region(region), "channel": channel}
+
+    async def _flush(self):
+        if not self._batch:
+            return
+        await run_db(upsert_subscribers, list(self._batch.values()))
+        self.report.imported += len(self._batch)
+        self.report.batches += 1
+        self._batch.clear()
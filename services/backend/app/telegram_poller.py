@@ -0,0 +1,130 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional
+
+from .config import TELEGRAM_POLL_TIMEOUT, TELEGRAM_POLL_LIMIT, TELEGRAM_API_TIMEOUT
+from .db import get_polling_offset, set_polling_offset, run_db
+from .http_clients import UpstreamClient, upstreams
+from .messaging_utils import TELEGRAM_BOT_TOKEN
+
+logger = logging.getLogger(__name__)
+
+UpdateHandler = Callable[[List[dict]], Awaitable[None]]
+
+# Seconds to wait after a failed getUpdates call, doubling up to the cap
+RETRY_DELAY = 1.0
+RETRY_DELAY_MAX = 30.0
+
+
+class TelegramPoller:
+    """
+    Pulls updates with getUpdates long-polling instead of receiving webhooks.
+
+    Each batch is handed to `handler` as a whole, and the offset (last update_id + 1)
+    is persisted once the handler returns. A crash mid-batch redelivers that batch on
+    the next start; replies are idempotent per message, so nothing is answered twice.
+    """
+
+    def __init__(self, handler: UpdateHandler, token: str = TELEGRAM_BOT_TOKEN,
+                 upstream: Optional[UpstreamClient] = None, poll_timeout: int = TELEGRAM_POLL_TIMEOUT,
+                 limit: int = TELEGRAM_POLL_LIMIT, name: str = "telegram"):
+        self.handler = handler
+        self.token = token
+        self.upstream = upstream
+        self.poll_timeout = max(0, poll_timeout)
+        self.limit = min(max(1, limit), 100)
+        self.name = name
+        self.offset: Optional[int] = None
+        self.batches = 0
+        self.updates = 0
+        self.errors = 0
+        self.last_batch_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client(self) -> UpstreamClient:
+        return self.upstream or upstreams.get("telegram")
+
+    async def start(self):
+        if not self.token:
+            logger.warning("Telegram polling enabled but TELEGRAM_BOT_TOKEN is not set")
+            return
+        self.offset = await run_db(get_polling_offset, self.name)
+        # getUpdates is refused while a webhook is registered
+        try:
+            await self.client.post(f"/bot{self.token}/deleteWebhook")
+        except Exception as e:
+            logger.warning(f"Could not remove Telegram webhook before polling: {e}")
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"📥 Telegram long-polling started at offset {self.offset}")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def fetch(self) -> List[dict]:
+        """One getUpdates call; blocks up to poll_timeout seconds when there is nothing new"""
+        params = {
+            "timeout": self.poll_timeout,
+            "limit": self.limit,
+            "allowed_updates": json.dumps(["message"]),
+        }
+        if self.offset is not None:
+            params["offset"] = self.offset
+        response = await self.client.get(
+            f"/bot{self.token}/getUpdates",
+            params=params,
+            timeout=self.poll_timeout + TELEGRAM_API_TIMEOUT,
+        )
+        response.raise_for_status()
+        data = response.json()
+        if not data.get("ok"):
+            raise RuntimeError(data.get("description") or "getUpdates failed")
+        return data.get("result") or []
+
+    async def poll_once(self) -> int:
+        """Fetch, handle and acknowledge one batch; returns the number of updates"""
+        updates = await self.fetch()
+        if not updates:
+            return 0
+        try:
+            await self.handler(updates)
+        except Exception as e:
+            logger.error(f"Telegram update batch failed: {e}")
+        self.offset = max(u["update_id"] for u in updates) + 1
+        await run_db(set_polling_offset, self.name, self.offset)
+        self.batches += 1
+        self.updates += len(updates)
+        self.last_batch_at = time.time()
+        return len(updates)
+
+    async def _run(self):
+        delay = RETRY_DELAY
+        while True:
+            try:
+                await self.poll_once()
+                delay = RETRY_DELAY
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"Telegram getUpdates failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, RETRY_DELAY_MAX)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "offset": self.offset,
+            "poll_timeout_seconds": self.poll_timeout,
+            "limit": self.limit,
+            "batches": self.batches,
+            "updates": self.updates,
+            "avg_batch_size": round(self.updates / self.batches, 2) if self.batches else 0.0,
+            "errors": self.errors,
+            "last_batch_at": self.last_batch_at,
+        }
@@ -0,0 +1,125 @@
+"""
+Flood test for inbound admission control. Messages arriving over --seconds (a few
+flooding senders plus a viral forward from many senders, with some emergencies) hit a
+simulated answer pipeline whose upstream allows GEMINI_MAX_CONCURRENCY concurrent calls
+of --upstream-ms each. Compares accepting everything (old behaviour) with
+AdmissionController.
+
+Reports upstream calls, peak traced memory, and reply latency percentiles overall and
+for emergency messages. Run from services/backend:
+
+    python -m benchmarks.bench_admission --messages 5000 --seconds 2 --upstream-ms 20
+"""
+import argparse
+import asyncio
+import random
+import time
+import tracemalloc
+
+from app.admission import AdmissionController, ADMITTED, EMERGENCY, EMERGENCY_SHED, SHED, THROTTLED
+from app.config import GEMINI_MAX_CONCURRENCY
+
+
+def flood(n: int, rng: random.Random):
+    messages = []
+    for i in range(n):
+        roll = rng.random()
+        if roll < 0.01:
+            messages.append((f"91{8000000000 + i}", "my father is unconscious, need ambulance"))
+        elif roll < 0.5:
+            # A handful of senders hammering the bot
+            messages.append((f"91{7000000000 + rng.randrange(10)}", f"spam {i}"))
+        else:
+            messages.append((f"91{9000000000 + i}", "is this forwarded message about dengue true?"))
+    return messages
+
+
+class Run:
+    def __init__(self, upstream_seconds: float):
+        self.upstream_seconds = upstream_seconds
+        self.upstream = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+        self.calls = 0
+        self.latencies = []
+        self.emergency_latencies = []
+
+    async def full_pipeline(self, started: float, emergency: bool):
+        async with self.upstream:
+            self.calls += 1
+            await asyncio.sleep(self.upstream_seconds)
+        self._done(started, emergency)
+
+    async def cheap_reply(self, started: float, emergency: bool):
+        await asyncio.sleep(0)
+        self._done(started, emergency)
+
+    def _done(self, started: float, emergency: bool):
+        elapsed = time.perf_counter() - started
+        self.latencies.append(elapsed)
+        if emergency:
+            self.emergency_latencies.append(elapsed)
+
+
+async def arrivals(messages, seconds: float, chunk: int = 50):
+    """Yields (sender, text, arrival time), spreading messages evenly over `seconds`"""
+    start = time.perf_counter()
+    for i in range(0, len(messages), chunk):
+        await asyncio.sleep(max(0.0, start + seconds * i / len(messages) - time.perf_counter()))
+        now = time.perf_counter()
+        for sender, text in messages[i:i + chunk]:
+            yield sender, text, now
+
+
+async def without_admission(messages, run: Run, seconds: float):
+    tasks = [asyncio.ensure_future(run.full_pipeline(arrived, "ambulance" in text))
+             async for _, text, arrived in arrivals(messages, seconds)]
+    await asyncio.gather(*tasks)
+
+
+async def with_admission(messages, run: Run, controller: AdmissionController, seconds: float):
+    async def answer(coro, decision):
+        try:
+            await coro
+        finally:
+            controller.release(decision)
+
+    tasks = []
+    async for sender, text, arrived in arrivals(messages, seconds):
+        decision = controller.admit(sender, text)
+        if decision in (ADMITTED, EMERGENCY):
+            tasks.append(asyncio.ensure_future(answer(run.full_pipeline(arrived, decision == EMERGENCY), decision)))
+        elif decision in (SHED, THROTTLED, EMERGENCY_SHED):
+            tasks.append(asyncio.ensure_future(answer(run.cheap_reply(arrived, decision == EMERGENCY_SHED), decision)))
+    await asyncio.gather(*tasks)
+
+
+def pct(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000 if samples else float("nan")
+
+
+def measure(label: str, coro_factory, run: Run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(coro_factory())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:18s}: {elapsed:6.2f} s, {run.calls:5d} upstream calls, peak {peak / 1e6:6.2f} MB, "
+          f"replies {len(run.latencies):5d} p50 {pct(run.latencies, 0.5):8.1f} ms "
+          f"p99 {pct(run.latencies, 0.99):8.1f} ms, emergency p99 {pct(run.emergency_latencies, 0.99):8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=2)
+    parser.add_argument("--upstream-ms", type=float, default=20)
+    args = parser.parse_args()
+    messages = flood(args.messages, random.Random(3))
+
+    run = Run(args.upstream_ms / 1000)
+    measure("accept everything", lambda: without_admission(messages, run, args.seconds), run)
+    run = Run(args.upstream_ms / 1000)
+    controller = AdmissionController()
+    measure("admission control", lambda: with_admission(messages, run, controller, args.seconds), run)
+    print(f"decisions: {controller.stats()['decisions']}")
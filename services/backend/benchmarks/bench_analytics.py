@@ -0,0 +1,59 @@
+"""
+/analytics/stats cost as tables grow: the old load-everything implementation vs the
+trigger-maintained summary tables (analytics_summary).
+
+Seeds a temporary SQLite database in steps and times both at each size.
+Run from services/backend:
+
+    python -m benchmarks.bench_analytics --steps 10000 100000 300000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("SQLITE_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from sqlmodel import Session
+
+from app.db import (
+    Broadcast, engine, init_db, list_subscribers, get_broadcasts, upsert_subscribers, analytics_summary,
+)
+
+
+def old_stats():
+    subscribers = list_subscribers()
+    broadcasts = get_broadcasts()
+    lang_dist = {}
+    for sub in subscribers:
+        lang_dist[sub.language] = lang_dist.get(sub.language, 0) + 1
+    return len(subscribers), len(broadcasts), lang_dist
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, nargs="+", default=[10000, 100000, 300000])
+    args = parser.parse_args()
+    init_db()
+
+    languages = ("en", "hi", "or")
+    seeded = 0
+    for target in args.steps:
+        upsert_subscribers([{"phone": f"91{9000000000 + i}", "language": languages[i % 3]} for i in range(seeded, target)])
+        with Session(engine) as session:
+            now = datetime.utcnow()
+            session.add_all(Broadcast(message="alert", channel="whatsapp", timestamp=now - timedelta(minutes=i))
+                            for i in range(seeded // 100, target // 100))
+            session.commit()
+        seeded = target
+        print(f"{target:8d} subscribers: old {best_of(old_stats):9.2f} ms   summary tables {best_of(analytics_summary):6.2f} ms")
@@ -0,0 +1,64 @@
+"""
+Broadcast throughput: sequential loop (old /alerts/broadcast) vs BroadcastEngine.
+
+Uses a local stub sender that sleeps for a fixed upstream latency, so no network is needed,
+and a temporary SQLite database for the delivery ledger. Run from services/backend:
+
+    python -m benchmarks.bench_broadcast --recipients 2000 --latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SQLITE_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from app.broadcast import BroadcastEngine
+from app.db import init_db, delivery_stats
+
+
+def make_stub_sender(latency: float):
+    async def stub_send(to: str, body: str):
+        await asyncio.sleep(latency)
+        return {"status": "sent"}
+    return stub_send
+
+
+async def sequential_loop(sender, recipients, text):
+    sent = 0
+    for phone in recipients:
+        result = await sender(phone, text)
+        if result.get("status") == "sent":
+            sent += 1
+    return sent
+
+
+async def main(n: int, latency: float, concurrency: int, rate: float):
+    recipients = [f"91{9000000000 + i}" for i in range(n)]
+    sender = make_stub_sender(latency)
+    text = "benchmark alert"
+
+    start = time.perf_counter()
+    await sequential_loop(sender, recipients, text)
+    seq = time.perf_counter() - start
+    print(f"sequential loop      : {n / seq:10.1f} msg/s  ({seq:.2f}s)")
+
+    for label, rates in (("engine, unlimited   ", {"whatsapp": 0}), (f"engine, {rate:g} msg/s cap", {"whatsapp": rate})):
+        engine = BroadcastEngine(senders={"whatsapp": sender}, rates=rates, concurrency=concurrency)
+        job = engine.start(text, "whatsapp", recipients, total=n)
+        start = time.perf_counter()
+        await engine._tasks[job.id]
+        elapsed = time.perf_counter() - start
+        print(f"{label}: {n / elapsed:10.1f} msg/s  ({elapsed:.2f}s, sent={job.sent}, ledger={delivery_stats(job.id)})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rate", type=float, default=80.0)
+    args = parser.parse_args()
+    init_db()
+    asyncio.run(main(args.recipients, args.latency_ms / 1000, args.concurrency, args.rate))
@@ -0,0 +1,65 @@
+"""
+Upstream passes and replies for users who split one question over several messages,
+answered per fragment (old behaviour) vs through the per-sender coalescing window.
+
+Each simulated sender sends --fragments messages with random gaps of up to --gap-ms.
+Reports answer pipeline runs and the extra wait coalescing adds. Run from
+services/backend:
+
+    python -m benchmarks.bench_coalesce --senders 300 --window-ms 1500 --max-wait-ms 4000
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.coalescer import MessageCoalescer
+
+
+async def conversation(add, sender: str, fragments: int, gap: float, rng: random.Random):
+    for i in range(fragments):
+        if i:
+            await asyncio.sleep(rng.uniform(0.1, 1.0) * gap)
+        add("whatsapp", sender, f"fragment {i}", f"{sender}:{i}")
+
+
+async def main(args):
+    rng = random.Random(11)
+    pipeline_runs = 0
+    waits = []
+    first_seen = {}
+
+    def handler(sender, text, channel, message_id):
+        nonlocal pipeline_runs
+        pipeline_runs += 1
+        waits.append(time.monotonic() - first_seen.pop(sender))
+
+    coalescer = MessageCoalescer(handler, args.window_ms, args.max_wait_ms)
+
+    def add(channel, sender, text, message_id):
+        first_seen.setdefault(sender, time.monotonic())
+        coalescer.add(channel, sender, text, message_id)
+
+    await asyncio.gather(*(
+        conversation(add, f"91{9000000000 + i}", args.fragments, args.gap_ms / 1000, rng)
+        for i in range(args.senders)
+    ))
+    await asyncio.sleep(args.max_wait_ms / 1000 + 0.1)
+
+    messages = args.senders * args.fragments
+    waits.sort()
+    print(f"per fragment (old): {messages:6d} pipeline runs / replies")
+    print(f"coalesced         : {pipeline_runs:6d} pipeline runs / replies "
+          f"({messages / pipeline_runs:.2f} fragments per query)")
+    print(f"added wait after first fragment: p50 {waits[len(waits) // 2] * 1000:7.1f} ms, "
+          f"max {waits[-1] * 1000:7.1f} ms (cap {args.max_wait_ms:.0f} ms)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--senders", type=int, default=300)
+    parser.add_argument("--fragments", type=int, default=3)
+    parser.add_argument("--gap-ms", type=float, default=1200)
+    parser.add_argument("--window-ms", type=float, default=1500)
+    parser.add_argument("--max-wait-ms", type=float, default=4000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,142 @@
+"""
+Webhook ack latency under a mixed database write load.
+
+Starts the backend with uvicorn (in its own process) on a temporary SQLite file and,
+while writer clients add subscribers and run bulk imports, probes POST /webhook/whatsapp
+and records how long each ack takes. Two server configurations are compared:
+
+  before  db helpers called directly on the event loop, rollback journal, synchronous=FULL
+  after   db helpers on the DB executor (run_db), WAL journal, synchronous=NORMAL
+
+Run from services/backend:
+
+    python -m benchmarks.bench_db_ack_latency --duration 10 --writers 16
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import Executor, Future
+
+
+class InlineExecutor(Executor):
+    """Runs submitted calls immediately on the calling thread, i.e. on the event loop"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(mode: str, port: int):
+    import uvicorn
+    import app.db as db
+    from app.main import app
+
+    if mode == "before":
+        db._db_executor = InlineExecutor()
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(mode: str, port: int) -> subprocess.Popen:
+    import httpx
+
+    env = {**os.environ, "SQLITE_DB": os.path.join(tempfile.mkdtemp(), "bench.db")}
+    if mode == "before":
+        env.update(SQLITE_WAL="false", SQLITE_SYNCHRONOUS="FULL")
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.bench_db_ack_latency", "--serve", mode, "--port", str(port)],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(200):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("backend did not start")
+
+
+def percentile(samples, p: float) -> float:
+    return samples[min(len(samples) - 1, int(p * len(samples)))] * 1000
+
+
+async def load(port: int, duration: float, writers: int, import_rows: int):
+    import httpx
+
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.perf_counter() + duration
+    acks, counts = [], {"subscriber_writes": 0, "imports": 0}
+    csv_body = "phone,language\n" + "\n".join(f"91{8000000000 + i},hi" for i in range(import_rows))
+
+    async with httpx.AsyncClient(base_url=base, timeout=60) as client:
+        async def writer(n: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                await client.post("/subscribers", json={"phone": f"91{7000000000 + n * 1000000 + i}"})
+                counts["subscriber_writes"] += 1
+                i += 1
+
+        async def importer():
+            while time.perf_counter() < deadline:
+                await client.post("/subscribers/import", content=csv_body, headers={"content-type": "text/csv"})
+                counts["imports"] += 1
+
+        async def probe():
+            i = 0
+            while time.perf_counter() < deadline:
+                payload = {"entry": [{"changes": [{"value": {"messages": [
+                    {"from": "919999999999", "id": f"wamid.probe.{i}", "text": {"body": "dengue symptoms"}}
+                ]}}]}]}
+                start = time.perf_counter()
+                await client.post("/webhook/whatsapp", json=payload)
+                acks.append(time.perf_counter() - start)
+                i += 1
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(probe(), importer(), *(writer(n) for n in range(writers)))
+    return sorted(acks), counts
+
+
+def run(mode: str, duration: float, writers: int, import_rows: int):
+    port = free_port()
+    server = start_server(mode, port)
+    try:
+        acks, counts = asyncio.run(load(port, duration, writers, import_rows))
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    print(f"{mode:6s}: ack p50 {percentile(acks, 0.50):7.1f} ms  p95 {percentile(acks, 0.95):7.1f} ms  "
+          f"p99 {percentile(acks, 0.99):7.1f} ms  max {acks[-1] * 1000:7.1f} ms  "
+          f"(probes={len(acks)}, subscriber writes={counts['subscriber_writes']}, imports={counts['imports']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--import-rows", type=int, default=5000)
+    parser.add_argument("--serve", choices=("before", "after"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.serve, args.port)
+    else:
+        for mode in ("before", "after"):
+            run(mode, args.duration, args.writers, args.import_rows)
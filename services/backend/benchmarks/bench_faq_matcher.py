@@ -0,0 +1,63 @@
+"""
+FAQ keyword matching: old per-call keyword scan vs the compiled KeywordMatcher.
+
+Measures the shipped catalog and a synthetic catalog of --topics topics.
+Run from services/backend:
+
+    python -m benchmarks.bench_faq_matcher --topics 300
+"""
+import argparse
+import random
+import string
+import timeit
+
+from app.faqs import FAQ_KEYWORDS
+from app.keyword_matcher import KeywordMatcher
+
+QUERIES = [
+    "dengue symptoms",
+    "Dengue ke lakshan kya hai?",
+    "मलेरिया के लक्षण",
+    "when is the next vaccination for my baby",
+    "how do I protect my family",
+    "please send ambulance",
+    "what is the weather today",
+]
+
+
+def old_find_topic(query, keywords_map):
+    """The previous find_faq_answer loop (minus rebuilding keywords_map on each call)"""
+    query_lower = query.lower().strip()
+    for faq_key, keywords in keywords_map.items():
+        if any(keyword in query_lower for keyword in keywords):
+            return faq_key
+    return None
+
+
+def synthetic_catalog(n_topics: int, seed: int = 7):
+    rnd = random.Random(seed)
+    words = lambda: "".join(rnd.choices(string.ascii_lowercase, k=rnd.randint(4, 10)))
+    catalog = dict(FAQ_KEYWORDS)
+    for i in range(n_topics - len(catalog)):
+        catalog[f"topic {i}"] = [words() for _ in range(8)]
+    return catalog
+
+
+def per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number / len(QUERIES) * 1e6
+
+
+def run(label, catalog, number):
+    matcher = KeywordMatcher(catalog)
+    old = per_call_us(lambda: [old_find_topic(q, catalog) for q in QUERIES], number)
+    new = per_call_us(lambda: [matcher.best(q) for q in QUERIES], number)
+    print(f"{label:28s} old scan: {old:7.2f} us/query   compiled: {new:7.2f} us/query")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=300)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+    run(f"shipped ({len(FAQ_KEYWORDS)} topics)", FAQ_KEYWORDS, args.number)
+    run(f"synthetic ({args.topics} topics)", synthetic_catalog(args.topics), args.number // 10)
@@ -0,0 +1,85 @@
+"""
+Event-loop responsiveness during a slow Gemini call.
+
+Replaces the Gemini model with a stub that blocks for --delay seconds, sends one /ask
+request that reaches the Gemini tier, and meanwhile polls /health. With Gemini running
+on its worker pool, /health keeps answering in milliseconds. Also checks that the
+streaming path (used by /ask with "stream": true) yields its first chunk early.
+Run from services/backend:
+
+    python -m benchmarks.bench_gemini_nonblocking --delay 1.0
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import httpx
+
+from app import faqs
+from app.main import app
+
+
+class SlowChunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class SlowModel:
+    """Stands in for genai.GenerativeModel; blocks its thread like the real SDK does"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        if stream:
+            return self._stream()
+        time.sleep(self.delay)
+        return SlowChunk("stub answer")
+
+    def _stream(self):
+        for word in ("stub ", "streamed ", "answer"):
+            time.sleep(self.delay / 3)
+            yield SlowChunk(word)
+
+
+async def main(delay: float):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    faqs.HAS_GENAI = True
+    faqs.GEMINI_API_KEY = "stub"
+    faqs._gemini_model = SlowModel(delay)
+    faqs.answer_cache.persist = False
+    question = "how does the thyroid gland work"
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        ask = asyncio.create_task(client.post("/ask", json={"question": question}))
+        latencies = []
+        while not ask.done():
+            start = time.perf_counter()
+            await client.get("/health")
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+        answer = (await ask).json()
+        worst = max(latencies) * 1000
+        print(f"/ask answered by {answer['source']} after ~{delay}s")
+        print(f"/health served {len(latencies)} times meanwhile, worst latency {worst:.1f} ms")
+        assert worst < delay * 1000 / 2, "event loop was blocked by the Gemini call"
+
+    # httpx's ASGI transport buffers whole responses, so time the generator directly
+    faqs.answer_cache._entries.clear()
+    start = time.perf_counter()
+    first = None
+    async for chunk in faqs.stream_gemini(question):
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    print(f"streamed answer: first chunk after {first:.2f}s, complete after {total:.2f}s")
+    assert first < total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--delay", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.delay))
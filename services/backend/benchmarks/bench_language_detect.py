@@ -0,0 +1,83 @@
+"""
+Language detection: the old faqs.detect_language (per-script character scans, then
+substring keyword checks) vs app.language.detect (one tokenizing pass, whole-word
+transliteration sets), on the labeled samples in language_samples.jsonl.
+
+Reports accuracy per language (native script and romanized) and cost per call.
+Run from services/backend:
+
+    python -m benchmarks.bench_language_detect
+"""
+import argparse
+import json
+import os
+import timeit
+from collections import defaultdict
+
+from app.language import detect
+
+SAMPLES_FILE = os.path.join(os.path.dirname(__file__), "language_samples.jsonl")
+
+
+def old_detect_language(text: str) -> str:
+    """faqs.detect_language before the single-pass detector"""
+    if not text:
+        return "en"
+    if any('ऀ' <= char <= 'ॿ' for char in text):
+        return "hi"
+    if any('଀' <= char <= '୿' for char in text):
+        return "or"
+    hindi_keywords = ["kya", "hai", "ke", "ka", "ki", "mein", "aur", "se", "ko"]
+    odia_keywords = ["kana", "kaha", "kemiti", "kouthi", "kahaku"]
+    text_lower = text.lower()
+    if any(keyword in text_lower for keyword in hindi_keywords):
+        return "hi"
+    elif any(keyword in text_lower for keyword in odia_keywords):
+        return "or"
+    return "en"
+
+
+def load_samples():
+    with open(SAMPLES_FILE, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def group(sample) -> str:
+    """'hi', 'hi (romanized)', ... - romanized when the text has no Indic letters"""
+    indic = any('ऀ' <= c <= '୿' for c in sample["text"])
+    return sample["language"] if sample["language"] == "en" or indic else f"{sample['language']} (romanized)"
+
+
+def accuracy(samples, fn):
+    hits, totals = defaultdict(int), defaultdict(int)
+    for sample in samples:
+        key = group(sample)
+        totals[key] += 1
+        hits[key] += fn(sample["text"]) == sample["language"]
+    return hits, totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=200)
+    parser.add_argument("--show-misses", action="store_true")
+    args = parser.parse_args()
+    samples = load_samples()
+    texts = [s["text"] for s in samples]
+
+    old_hits, totals = accuracy(samples, old_detect_language)
+    new_hits, _ = accuracy(samples, lambda t: detect(t).language)
+    for key in sorted(totals):
+        print(f"{key:16s} n={totals[key]:3d}   old {old_hits[key] / totals[key]:6.1%}   new {new_hits[key] / totals[key]:6.1%}")
+    n = len(samples)
+    print(f"{'overall':16s} n={n:3d}   old {sum(old_hits.values()) / n:6.1%}   new {sum(new_hits.values()) / n:6.1%}")
+
+    for label, fn in (("old", old_detect_language), ("new", detect)):
+        per_call = min(timeit.repeat(lambda: [fn(t) for t in texts], number=args.number, repeat=5))
+        print(f"{label}: {per_call / args.number / n * 1e6:6.2f} us/message")
+
+    if args.show_misses:
+        for sample in samples:
+            guess = detect(sample["text"])
+            if guess.language != sample["language"]:
+                print(f"  miss: {sample['text']!r} -> {guess} (expected {sample['language']})")
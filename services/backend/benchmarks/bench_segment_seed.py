@@ -0,0 +1,59 @@
+"""
+Selecting a district-level broadcast audience: loading every subscriber and filtering
+in Python (old /alerts/broadcast) vs the indexed INSERT ... SELECT that seeds the
+delivery ledger for one segment.
+
+Uses a temporary SQLite database. Run from services/backend:
+
+    python -m benchmarks.bench_segment_seed --subscribers 300000 --regions 30
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+os.environ.setdefault("SQLITE_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from app.db import init_db, upsert_subscribers, list_subscribers, create_broadcast_run
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1e6, result
+
+
+def load_and_filter(region: str, language: str):
+    return [s.phone for s in list_subscribers() if s.region == region and s.language == language]
+
+
+def seed_segment(region: str, language: str):
+    segment = {"language": language, "region": region, "channel": None, "text": "alert"}
+    return create_broadcast_run(uuid.uuid4().hex, "alert", "whatsapp", "whatsapp", [segment])[0]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=300000)
+    parser.add_argument("--regions", type=int, default=30)
+    args = parser.parse_args()
+    init_db()
+
+    languages = ("en", "hi", "or")
+    for start in range(0, args.subscribers, 50000):
+        upsert_subscribers([
+            {"phone": f"91{9000000000 + i}", "language": languages[i % 3],
+             "region": f"District {i % args.regions}", "channel": "whatsapp"}
+            for i in range(start, min(start + 50000, args.subscribers))
+        ])
+
+    elapsed, peak, rows = measure(lambda: load_and_filter("District 7", "hi"))
+    print(f"load all + filter (old)  : {elapsed:9.1f} ms, peak {peak:8.2f} MB  ({len(rows)} recipients)")
+    elapsed, peak, count = measure(lambda: seed_segment("District 7", "hi"))
+    print(f"indexed segment seed     : {elapsed:9.1f} ms, peak {peak:8.2f} MB  ({count} deliveries)")
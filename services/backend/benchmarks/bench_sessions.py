@@ -0,0 +1,71 @@
+"""
+Per-message cost of reading and updating a sender's session: a SenderSession read and
+write on every message (what a DB-backed session would cost) vs the in-memory session
+store with write-behind flushing.
+
+Uses a temporary SQLite database. Run from services/backend:
+
+    python -m benchmarks.bench_sessions --senders 2000 --messages 20000
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("SQLITE_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from app.db import init_db, get_sender_session, save_sender_sessions, run_db
+from app.sessions import ConversationSession, SessionStore
+
+
+async def per_message_db(traffic):
+    for sender, question in traffic:
+        row = await run_db(get_sender_session, sender)
+        session = ConversationSession(sender)
+        if row is not None:
+            session.language = row.language
+        session.turns.append((question, "answer"))
+        await run_db(save_sender_sessions, [session.to_row()])
+
+
+async def session_store(traffic, store: SessionStore):
+    for i, (sender, question) in enumerate(traffic):
+        session = await store.get(sender)
+        store.record_turn(session, question, "answer", "FAQ")
+        if i % 500 == 499:
+            # Stand-in for the periodic flush task
+            await store.flush()
+    await store.flush()
+
+
+async def main(args):
+    init_db()
+    rng = random.Random(7)
+    traffic = [(f"91{9000000000 + rng.randrange(args.senders)}", "what are dengue symptoms")
+               for _ in range(args.messages)]
+
+    start = time.perf_counter()
+    await per_message_db(traffic)
+    db_elapsed = time.perf_counter() - start
+
+    store = SessionStore(max_entries=args.senders)
+    start = time.perf_counter()
+    await session_store(traffic, store)
+    store_elapsed = time.perf_counter() - start
+
+    print(f"DB read+write per message : {args.messages / db_elapsed:9.0f} msg/s "
+          f"({db_elapsed / args.messages * 1e6:7.1f} µs/msg)")
+    print(f"session store             : {args.messages / store_elapsed:9.0f} msg/s "
+          f"({store_elapsed / args.messages * 1e6:7.1f} µs/msg)")
+    stats = store.stats()
+    print(f"  hits {stats['hits']}, loads {stats['loads']}, misses {stats['misses']}, "
+          f"flushes {stats['flushes']}, rows written {stats['written']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--senders", type=int, default=2000)
+    parser.add_argument("--messages", type=int, default=20000)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,73 @@
+"""
+Subscriber import throughput: per-row add_subscriber (one session + commit per row,
+as POST /subscribers does) vs the streaming bulk importer with batched upserts.
+
+Uses a temporary SQLite database. Run from services/backend:
+
+    python -m benchmarks.bench_subscriber_import --rows 100000 --per-row-rows 5000
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SQLITE_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from sqlmodel import Session, delete
+
+from app.db import engine, init_db, add_subscriber, Subscriber
+from app.subscriber_import import SubscriberImporter
+
+
+def make_csv(n: int, chunk_rows: int = 2000):
+    """CSV body as a list of byte chunks, roughly as an upload arrives"""
+    languages = ("en", "hi", "or")
+    lines = ["phone,language"] + [f"+91 {9000000000 + i},{languages[i % 3]}" for i in range(n)]
+    return ["\n".join(lines[i:i + chunk_rows]).encode() + b"\n" for i in range(0, len(lines), chunk_rows)]
+
+
+async def stream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def clear():
+    with Session(engine) as session:
+        session.exec(delete(Subscriber))
+        session.commit()
+
+
+def per_row(n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        add_subscriber(f"91{9000000000 + i}", "en")
+    return time.perf_counter() - start
+
+
+def bulk(chunks, batch_size: int):
+    importer = SubscriberImporter("csv", batch_size=batch_size)
+    start = time.perf_counter()
+    report = asyncio.run(importer.run(stream(chunks)))
+    return time.perf_counter() - start, report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--per-row-rows", type=int, default=5000, help="rows for the (slow) per-row path")
+    args = parser.parse_args()
+    init_db()
+
+    elapsed = per_row(args.per_row_rows)
+    print(f"per-row add_subscriber      : {args.per_row_rows / elapsed:10.0f} rows/s  ({elapsed:.2f}s, {args.per_row_rows} rows)")
+
+    chunks = make_csv(args.rows)
+    for batch_size in (500, 5000):
+        clear()
+        elapsed, report = bulk(chunks, batch_size)
+        print(f"bulk import, batch {batch_size:5d}    : {args.rows / elapsed:10.0f} rows/s  "
+              f"({elapsed:.2f}s, imported={report.imported}, batches={report.batches})")
+
+    elapsed, report = bulk(chunks, 5000)
+    print(f"bulk re-import (all updates): {args.rows / elapsed:10.0f} rows/s  ({elapsed:.2f}s)")
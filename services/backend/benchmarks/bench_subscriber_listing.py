@@ -0,0 +1,73 @@
+"""
+Subscriber listing cost: full list (old GET /subscribers) vs keyset pages vs NDJSON export.
+
+Seeds a temporary SQLite database and reports wall time and peak Python memory
+(tracemalloc) for each access pattern. Run from services/backend:
+
+    python -m benchmarks.bench_subscriber_listing --subscribers 200000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SQLITE_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+from sqlmodel import Session
+
+from app.db import engine, init_db, list_subscribers, page_subscribers, Subscriber
+from app.main import _subscriber_export
+
+
+def seed(n: int):
+    init_db()
+    languages = ("en", "hi", "or")
+    with Session(engine) as session:
+        session.add_all(Subscriber(phone=f"91{9000000000 + i}", language=languages[i % 3]) for i in range(n))
+        session.commit()
+
+
+def measure(label: str, fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:28s}: {elapsed * 1000:9.1f} ms, peak {peak / 1e6:8.2f} MB  ({result})")
+
+
+def full_list():
+    body = json.dumps([{"phone": s.phone, "language": s.language} for s in list_subscribers()])
+    return f"{len(body)} bytes"
+
+
+def first_page():
+    return f"{len(page_subscribers(None, 100))} rows"
+
+
+def walk_pages():
+    pages, cursor = 0, None
+    while True:
+        rows = page_subscribers(cursor, 1000)
+        if not rows:
+            return f"{pages} pages"
+        pages += 1
+        cursor = rows[-1][0]
+
+
+def ndjson_export():
+    return f"{sum(len(chunk) for chunk in _subscriber_export('ndjson', None, None, None, None))} bytes"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subscribers", type=int, default=100000)
+    args = parser.parse_args()
+    seed(args.subscribers)
+    measure("full list + JSON (old)", full_list)
+    measure("first keyset page (100)", first_page)
+    measure("walk all pages (1000)", walk_pages)
+    measure("NDJSON export", ndjson_export)
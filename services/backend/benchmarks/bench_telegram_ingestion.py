@@ -0,0 +1,115 @@
+"""
+Telegram ingestion throughput: webhook pushes vs getUpdates long-polling.
+
+A local stub of the Bot API (getUpdates/deleteWebhook, served in-process over
+httpx.ASGITransport) holds the pending updates, and the reply path is replaced by a stub
+that sleeps for a fixed processing latency. Admission control is opened up so every
+update reaches that stub; bench_admission covers shedding. Webhook mode replays the updates as
+concurrent POSTs to /webhook/telegram, capped like Telegram's max_connections;
+polling mode drains them with TelegramPoller. Run from services/backend:
+
+    python -m benchmarks.bench_telegram_ingestion --updates 2000 --latency-ms 50
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SQLITE_DB", os.path.join(tempfile.mkdtemp(), "bench.db"))
+
+import httpx
+from fastapi import FastAPI, Request
+
+import app.main as main_module
+from app.admission import AdmissionController
+from app.db import init_db
+from app.http_clients import UpstreamClient
+from app.telegram_poller import TelegramPoller
+
+
+def make_update(update_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {"message_id": update_id, "chat": {"id": 1000 + update_id % 500}, "text": "dengue symptoms"},
+    }
+
+
+def make_stub_bot_api(updates: list) -> FastAPI:
+    """Minimal Bot API: getUpdates honours offset/limit and long-polls while empty"""
+    stub = FastAPI()
+    arrived = asyncio.Event()
+
+    @stub.post("/bot{token}/deleteWebhook")
+    async def delete_webhook(token: str):
+        return {"ok": True, "result": True}
+
+    @stub.get("/bot{token}/getUpdates")
+    async def get_updates(token: str, request: Request):
+        offset = int(request.query_params.get("offset", 0))
+        limit = int(request.query_params.get("limit", 100))
+        timeout = float(request.query_params.get("timeout", 0))
+        pending = [u for u in updates if u["update_id"] >= offset]
+        if not pending and timeout:
+            try:
+                await asyncio.wait_for(arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return {"ok": True, "result": pending[:limit]}
+
+    return stub
+
+
+async def main(n: int, latency: float, connections: int, limit: int):
+    init_db()
+    handled = 0
+
+    async def stub_reply(sender, message, channel, message_id=None):
+        nonlocal handled
+        await asyncio.sleep(latency)
+        handled += 1
+
+    main_module._handle_message_and_reply = stub_reply
+    main_module.admission = AdmissionController(rate=0, max_in_flight=n, emergency_keywords=[])
+    updates = [make_update(i) for i in range(1, n + 1)]
+
+    # Webhook mode: Telegram pushes each update, at most `connections` at a time
+    webhook = httpx.AsyncClient(transport=httpx.ASGITransport(app=main_module.app), base_url="http://backend")
+    semaphore = asyncio.Semaphore(connections)
+
+    async def push(update):
+        async with semaphore:
+            await webhook.post("/webhook/telegram", json=update)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(push(u) for u in updates))
+    elapsed = time.perf_counter() - start
+    await webhook.aclose()
+    print(f"webhook ({connections} connections)  : {handled / elapsed:10.1f} msg/s  ({elapsed:.2f}s, handled={handled})")
+
+    # Polling mode: drain the same backlog through getUpdates batches
+    handled = 0
+    upstream = UpstreamClient("telegram-stub", "http://stub")
+    upstream._client = httpx.AsyncClient(transport=httpx.ASGITransport(app=make_stub_bot_api(updates)),
+                                         base_url="http://stub")
+    poller = TelegramPoller(main_module._handle_telegram_updates, token="TEST", upstream=upstream,
+                            poll_timeout=0, limit=limit, name="bench")
+    start = time.perf_counter()
+    # Each batch is answered before poll_once returns, so the backlog is done once the
+    # offset passes the last update
+    while (poller.offset or 0) <= n:
+        await poller.poll_once()
+    elapsed = time.perf_counter() - start
+    await upstream.close()
+    print(f"polling (batches of {limit:3d})    : {handled / elapsed:10.1f} msg/s  "
+          f"({elapsed:.2f}s, handled={handled}, batches={poller.batches}, offset={poller.offset})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--connections", type=int, default=40, help="Telegram webhook max_connections")
+    parser.add_argument("--limit", type=int, default=100, help="getUpdates batch size")
+    args = parser.parse_args()
+    asyncio.run(main(args.updates, args.latency_ms / 1000, args.connections, args.limit))
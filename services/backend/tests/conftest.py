@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Run against a throwaway database; app.config reads SQLITE_DB at import time
+os.environ.setdefault("SQLITE_DB", os.path.join(tempfile.mkdtemp(), "test.db"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,78 @@
+import asyncio
+
+import httpx
+
+import app.main as main_module
+from app.admission import (
+    AdmissionController, ADMITTED, EMERGENCY, EMERGENCY_SHED, SHED, THROTTLED, DROPPED, EMERGENCY_REPLIES,
+)
+
+
+def test_sender_over_rate_is_throttled_once_then_dropped():
+    controller = AdmissionController(rate=0.001, burst=2, max_in_flight=10, max_shed=10)
+    decisions = [controller.admit("a", "hello") for _ in range(4)]
+    assert decisions == [ADMITTED, ADMITTED, THROTTLED, DROPPED]
+    assert controller.admit("b", "hello") == ADMITTED
+
+
+def test_saturation_sheds_then_drops():
+    controller = AdmissionController(rate=0, max_in_flight=1, max_shed=1)
+    assert [controller.admit(str(i), "hello") for i in range(3)] == [ADMITTED, SHED, DROPPED]
+    controller.release(ADMITTED)
+    assert controller.admit("3", "hello") == ADMITTED
+
+
+def test_emergencies_are_capped_but_never_dropped():
+    controller = AdmissionController(rate=0.001, burst=1, max_in_flight=1, max_shed=0, max_emergency=2)
+    decisions = [controller.admit("a", "need an ambulance now") for _ in range(4)]
+    assert decisions == [EMERGENCY, EMERGENCY, EMERGENCY_SHED, EMERGENCY_SHED]
+    # Emergencies don't use up the normal pipeline's slots or the sender's bucket
+    assert controller.admit("a", "hello") == ADMITTED
+    assert controller.in_flight == 1 and controller.emergency_in_flight == 2 and controller.shed_in_flight == 2
+    controller.release(EMERGENCY)
+    assert controller.admit("b", "call 108") == EMERGENCY
+    # "108" inside a phone number is not an emergency keyword
+    assert controller.admit("c", "91081234567") == DROPPED
+
+
+def test_webhook_burst_is_bounded_and_every_message_answered(monkeypatch):
+    controller = AdmissionController(rate=0, max_in_flight=3, max_shed=100, max_emergency=1)
+    monkeypatch.setattr(main_module, "admission", controller)
+    running = peak = 0
+    answered, canned = [], []
+
+    async def slow_reply(sender, message, channel, message_id=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        answered.append(message)
+
+    async def enqueue(channel, recipient, body, idempotency_key):
+        canned.append(body)
+        return True
+
+    monkeypatch.setattr(main_module, "_handle_message_and_reply", slow_reply)
+    monkeypatch.setattr(main_module.outbound_queue, "enqueue", enqueue)
+
+    def update(i, text):
+        return {"update_id": i, "message": {"message_id": i, "chat": {"id": 5000 + i}, "text": text}}
+
+    texts = ["is this forwarded message true?"] * 18 + ["ambulance please", "ambulance please"]
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main_module.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://backend") as client:
+            responses = await asyncio.gather(*(
+                client.post("/webhook/telegram", json=update(i, text)) for i, text in enumerate(texts)
+            ))
+        assert all(r.status_code == 200 for r in responses)
+
+    asyncio.run(burst())
+    # Three normal pipelines plus one emergency at most, and exactly one reply per message
+    assert peak <= 4 and len(canned) > 1
+    assert len(answered) + len(canned) == len(texts)
+    assert answered.count("ambulance please") == 1
+    assert canned.count(EMERGENCY_REPLIES["en"]) == 1
+    assert controller.in_flight == controller.emergency_in_flight == controller.shed_in_flight == 0
@@ -0,0 +1,11 @@
+from app.answer_cache import cache_key
+
+
+def test_questions_differing_only_in_matras_get_different_keys():
+    assert cache_key("दिल की बीमारी", "hi") != cache_key("दाल की बीमारी", "hi")
+    assert cache_key("ଦିଲ", "or") != cache_key("ଦାଲ", "or")
+
+
+def test_key_normalizes_case_punctuation_and_spaces():
+    assert cache_key("  What are Dengue symptoms?? ", "en") == "en:what are dengue symptoms"
+    assert cache_key("डेंगू के लक्षण।", "hi") == cache_key("डेंगू  के लक्षण", "hi") == "hi:डेंगू के लक्षण"
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.broadcast import BroadcastEngine
+from app.db import init_db, upsert_subscribers, count_subscribers
+from app.main import _estimate_recipients
+
+
+@pytest.fixture(scope="module", autouse=True)
+def subscribers():
+    init_db()
+    upsert_subscribers([
+        {"phone": "919000000001", "language": "en", "region": "khordha", "channel": "whatsapp"},
+        {"phone": "919000000002", "language": "hi", "region": "khordha", "channel": "whatsapp"},
+        {"phone": "700000001", "language": "en", "region": "khordha", "channel": "telegram"},
+    ])
+
+
+def run_broadcast(channel, segments=None):
+    delivered = {"whatsapp": [], "telegram": []}
+
+    def sender(name):
+        async def send(recipient, text):
+            delivered[name].append(recipient)
+            return {"status": "sent"}
+        return send
+
+    async def main():
+        engine = BroadcastEngine(senders={name: sender(name) for name in delivered},
+                                 rates={"whatsapp": 0, "telegram": 0})
+        job = engine.start("alert", channel, segments=segments)
+        await engine._tasks[job.id]
+        return job
+
+    return asyncio.run(main()), delivered
+
+
+def test_default_segment_only_reaches_broadcast_channel():
+    job, delivered = run_broadcast("whatsapp")
+    assert sorted(delivered["whatsapp"]) == ["919000000001", "919000000002"]
+    assert delivered["telegram"] == []
+    assert job.sent == 2
+
+
+def test_segment_without_channel_uses_broadcast_channel():
+    job, delivered = run_broadcast("tg", segments=[{"language": "en"}])
+    assert delivered == {"whatsapp": [], "telegram": ["700000001"]}
+
+
+def test_segment_channel_overrides_broadcast_channel():
+    job, delivered = run_broadcast("whatsapp", segments=[{"language": "en", "channel": "telegram"}])
+    assert delivered == {"whatsapp": [], "telegram": ["700000001"]}
+
+
+def test_estimate_counts_only_the_broadcast_channel():
+    assert count_subscribers(channel="whatsapp") == 2
+    assert asyncio.run(_estimate_recipients("whatsapp", None)) == 2
+    assert asyncio.run(_estimate_recipients("telegram", [{"language": "en"}, {"language": "hi", "channel": "sms"}])) == 2
@@ -0,0 +1,40 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.faq_retrieval import FaqRetriever, char_ngrams, get_retriever
+
+
+@pytest.mark.parametrize("query, topic", [
+    ("maleria", "malaria symptoms"),
+    ("dengu ke lakshan", "dengue symptoms"),
+    ("fever with chills", "malaria symptoms"),
+    ("how to prevent mosquito bites", "prevention tips"),
+    ("when should my baby get vaccines", "vaccine schedule"),
+    ("डेंगू के लक्षण", "dengue symptoms"),
+    ("ଡେଙ୍ଗୁର ଲକ୍ଷଣ", "dengue symptoms"),
+])
+def test_paraphrases_match_their_topic(query, topic):
+    assert get_retriever().match(query)[0] == topic
+
+
+@pytest.mark.parametrize("query", [
+    "fever",                    # as close to malaria as to dengue
+    "tipsy",                    # shares n-grams with the bare keyword "tips"
+    "the schedule for school",  # shares one word with "vaccine schedule"
+    "typhoid symptoms",         # a symptoms question about another disease
+    "hello",
+])
+def test_unrelated_or_ambiguous_queries_do_not_match(query):
+    assert get_retriever().match(query) is None
+
+
+def test_margin_rejects_a_win_on_shared_ngrams_only():
+    corpus = {"a": ["dengue fever"], "b": ["malaria fever"]}
+    assert FaqRetriever(corpus, threshold=0.3, margin=0.0).match("fever") is not None
+    assert FaqRetriever(corpus, threshold=0.3, margin=0.08).match("fever") is None
+    assert FaqRetriever(corpus, threshold=0.3, margin=0.08).match("dengue")[0] == "a"
+
+
+def test_indic_words_are_not_split_at_vowel_signs():
+    assert " डेंगू " in char_ngrams("डेंगू", sizes=(7,))
@@ -0,0 +1,122 @@
+import asyncio
+import time
+
+import pytest
+
+from app import faqs
+from app.db import init_db
+from app.http_clients import upstreams
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Stands in for genai.GenerativeModel; blocks the worker thread for `delay` seconds, and
+    for `chunk_delay` before each streamed chunk
+    """
+
+    def __init__(self, delay=0.0, chunks=("Drink ", "clean water."), chunk_delay=0.0):
+        self.delay = delay
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.finished = False
+
+    def _stream(self):
+        for c in self.chunks:
+            time.sleep(self.chunk_delay)
+            yield FakeResponse(c)
+        self.finished = True
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        time.sleep(self.delay)
+        if stream:
+            return self._stream()
+        self.finished = True
+        return FakeResponse("".join(self.chunks))
+
+
+@pytest.fixture
+def gemini(monkeypatch):
+    upstream = upstreams.get("gemini")
+    breaker = upstream.breaker
+    breaker.state, breaker.failures, breaker._trial_in_flight = "closed", 0, False
+    monkeypatch.setattr(upstream, "timeout", 5.0)
+    monkeypatch.setattr(faqs, "gemini_available", lambda: True)
+    init_db()
+    yield upstream
+    breaker.state, breaker.failures, breaker._trial_in_flight = "closed", 0, False
+
+
+def half_open(breaker):
+    breaker.state = "open"
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+
+def test_cancelled_generate_releases_half_open_trial(gemini, monkeypatch):
+    monkeypatch.setattr(faqs, "_get_gemini_model", lambda: FakeModel(delay=0.3))
+
+    async def run():
+        half_open(gemini.breaker)
+        call = asyncio.ensure_future(faqs._generate_gemini_answer("dengue?"))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        assert gemini.breaker.allow()
+
+    asyncio.run(run())
+
+
+def test_timed_out_generate_holds_permit_until_worker_returns(gemini, monkeypatch):
+    monkeypatch.setattr(gemini, "timeout", 0.1)
+    model = FakeModel(delay=0.3)
+    monkeypatch.setattr(faqs, "_get_gemini_model", lambda: model)
+
+    async def run():
+        semaphore = asyncio.Semaphore(1)
+        monkeypatch.setattr(faqs, "_gemini_semaphore", semaphore)
+        assert await faqs._generate_gemini_answer("dengue?") is None
+        assert semaphore.locked() and not model.finished
+        await asyncio.wait_for(semaphore.acquire(), timeout=2)
+        assert model.finished
+
+    asyncio.run(run())
+
+
+def test_stream_that_cannot_start_records_failure(gemini, monkeypatch):
+    monkeypatch.setattr(gemini, "timeout", 0.05)
+
+    async def run():
+        monkeypatch.setattr(faqs, "_gemini_semaphore", asyncio.Semaphore(0))
+        half_open(gemini.breaker)
+        assert [chunk async for chunk in faqs.stream_gemini("dengue?")] == []
+        assert gemini.breaker.state == "open"
+        assert not gemini.breaker._trial_in_flight
+
+    asyncio.run(run())
+
+
+def test_stream_disconnect_releases_trial_and_holds_permit(gemini, monkeypatch):
+    model = FakeModel(chunks=("a", "b", "c"), chunk_delay=0.1)
+    monkeypatch.setattr(faqs, "_get_gemini_model", lambda: model)
+
+    async def run():
+        semaphore = asyncio.Semaphore(1)
+        monkeypatch.setattr(faqs, "_gemini_semaphore", semaphore)
+        half_open(gemini.breaker)
+        stream = faqs.stream_gemini("dengue?", context=[("hi", "hello")])
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        # No outcome for an abandoned stream, but the half-open trial is free again
+        assert gemini.breaker.state == "half_open"
+        assert gemini.breaker.allow()
+        # The worker stops at its next chunk and only then gives its permit back
+        assert semaphore.locked()
+        await asyncio.wait_for(semaphore.acquire(), timeout=2)
+        assert not model.finished
+
+    asyncio.run(run())
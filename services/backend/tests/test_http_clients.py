@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.http_clients import CircuitBreaker, UpstreamClient
+
+
+def half_open(breaker: CircuitBreaker):
+    breaker.state = "open"
+    breaker.opened_at = time.monotonic() - breaker.reset_timeout - 1
+
+
+def test_cancelled_half_open_trial_is_released():
+    async def slow(request):
+        await asyncio.sleep(10)
+        return httpx.Response(200)
+
+    async def run():
+        upstream = UpstreamClient("test", "http://upstream.test", timeout=30)
+        upstream._client = httpx.AsyncClient(base_url=upstream.base_url, transport=httpx.MockTransport(slow))
+        half_open(upstream.breaker)
+
+        call = asyncio.ensure_future(upstream.get("/slow"))
+        await asyncio.sleep(0.01)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await upstream.close()
+
+        assert upstream.breaker.state == "half_open"
+        assert upstream.in_flight == 0
+        assert upstream.breaker.allow()
+
+    asyncio.run(run())
+
+
+def test_half_open_allows_a_single_trial():
+    breaker = CircuitBreaker("test")
+    half_open(breaker)
+    trial = breaker.allow()
+    assert trial and trial.trial
+    assert not breaker.allow()
+    breaker.record_success(trial)
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def open_circuit(breaker: CircuitBreaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure(breaker.allow())
+    assert breaker.state == "open"
+
+
+def test_late_closed_state_call_cannot_settle_the_half_open_trial():
+    breaker = CircuitBreaker("test", failure_threshold=2)
+    late = breaker.allow()  # started while the circuit was still closed
+    open_circuit(breaker)
+    half_open(breaker)
+    trial = breaker.allow()
+    assert trial.trial
+
+    # Cancelling the late call must not free the trial slot for a second trial
+    breaker.release(late)
+    assert not breaker.allow()
+    # Nor may its late success close the circuit, or its failure re-open it
+    breaker.record_success(late)
+    assert breaker.state == "half_open"
+    breaker.record_failure(late)
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_success(trial)
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_late_failure_from_before_the_circuit_opened_is_ignored_once_closed_again():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    late = breaker.allow()
+    open_circuit(breaker)
+    half_open(breaker)
+    breaker.record_success(breaker.allow())
+    breaker.record_failure(late)
+    assert breaker.state == "closed" and breaker.failures == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from app.language import detect, parse_language_command
+
+
+@pytest.mark.parametrize("text, language", [
+    ("lang hi", "hi"),
+    ("Language: or", "or"),
+    ("set language english", "en"),
+    ("Hindi", "hi"),
+    ("hindi.", "hi"),
+    ("हिंदी", "hi"),
+    ("ଓଡ଼ିଆ", "or"),
+    ("lang en!", "en"),
+])
+def test_language_commands(text, language):
+    assert parse_language_command(text) == language
+
+
+@pytest.mark.parametrize("text", [
+    "hi", "Hi!", "hi.", "HI!!", "en?", "or", "Or.",
+    "hindi mein bataiye", "hi, what are dengue symptoms?", "",
+])
+def test_not_language_commands(text):
+    assert parse_language_command(text) is None
+
+
+def test_detect_scripts():
+    assert detect("डेंगू के लक्षण क्या हैं").language == "hi"
+    assert detect("ଡେଙ୍ଗୁର ଲକ୍ଷଣ କଣ").language == "or"
+    assert detect("what are the symptoms of dengue").language == "en"
+
+
+def test_greeting_does_not_pin_hindi():
+    from app.pipeline import AnswerRequest, set_language_stage
+    from app.sessions import ConversationSession
+
+    session = ConversationSession("919000000001")
+    greeting = AnswerRequest(session.sender, "Hi!", "whatsapp", session=session)
+    assert set_language_stage(greeting) is None
+    assert session.language_source != "explicit"
+
+    question = AnswerRequest(session.sender, "what are the symptoms of dengue", "whatsapp", session=session)
+    assert question.language == "en"
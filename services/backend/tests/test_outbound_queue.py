@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+from app import outbound_queue as outbound_module
+from app.db import init_db, enqueue_outbound
+from app.outbound_queue import OutboundQueue
+
+
+def test_enqueue_during_an_empty_claim_is_not_lost(monkeypatch):
+    init_db()
+    sent = []
+    real_claim = outbound_module.claim_outbound
+
+    async def send(recipient, text):
+        sent.append(time.monotonic())
+        return {"status": "sent"}
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        queue = OutboundQueue(senders={"telegram": send}, workers=1, poll_interval=5)
+        enqueued = []
+
+        def claim(limit):
+            batch = real_claim(limit)
+            if not enqueued:
+                # Another DB thread commits a message and wakes the dispatcher while
+                # this claim is still returning its (empty) result
+                enqueue_outbound("telegram", "42", "hello", "test:lost-wakeup")
+                loop.call_soon_threadsafe(queue._wakeup.set)
+                enqueued.append(time.monotonic())
+            return batch
+
+        monkeypatch.setattr(outbound_module, "claim_outbound", claim)
+        await queue.start()
+        try:
+            for _ in range(100):
+                if sent:
+                    break
+                await asyncio.sleep(0.02)
+            assert sent and sent[0] - enqueued[0] < 1.0
+        finally:
+            await queue.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,39 @@
+import asyncio
+
+from app.faqs import get_health_disclaimer
+from app.pipeline import AnswerRequest, answer_pipeline
+
+
+def answer(message, language):
+    return asyncio.run(answer_pipeline.run(AnswerRequest("test", message, language=language), "fallback")).answer
+
+
+def test_disclaimer_is_in_the_reply_language():
+    reply = answer("dengue symptoms", "hi")
+    assert reply.endswith("\n\n" + get_health_disclaimer("hi"))
+    assert get_health_disclaimer("en") not in reply
+
+
+def test_disclaimer_only_for_health_questions():
+    assert get_health_disclaimer("en") in answer("malaria symptoms", "en")
+    assert get_health_disclaimer("or") not in answer("prevention tips", "or")
+
+
+def test_debug_trace_breaks_down_the_generative_stage(monkeypatch):
+    from app import pipeline
+    from app.resolver import HedgedResolver
+
+    async def gemini(message, language, context):
+        return None
+
+    async def rasa(sender, message):
+        return "rasa answer"
+
+    monkeypatch.setattr(pipeline, "resolver", HedgedResolver(mode="sequential", gemini=gemini, rasa=rasa))
+    result = asyncio.run(answer_pipeline.run(AnswerRequest("test", "what is the capital of france", language="en"),
+                                             "fallback"))
+
+    generative = result.trace_dict()["stages"][-1]
+    assert generative["source"] == "Rasa"
+    assert [(t["tier"], t["outcome"]) for t in generative["tiers"]] == [("Gemini", "empty"), ("Rasa", "answered")]
+    assert "tiers" not in result.trace_dict()["stages"][1]
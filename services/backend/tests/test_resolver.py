@@ -0,0 +1,86 @@
+import asyncio
+
+from app.resolver import HedgedResolver
+
+
+def make_resolver(mode, gemini_seconds, state, **kwargs):
+    async def gemini(message, language, context):
+        try:
+            await asyncio.sleep(gemini_seconds)
+            return "gemini answer"
+        except asyncio.CancelledError:
+            state["gemini_cancelled"] = True
+            raise
+
+    async def rasa(sender, message):
+        await asyncio.sleep(0.01)
+        return "rasa answer"
+
+    return HedgedResolver(mode=mode, budgets={"web": 0.6}, gemini=gemini, rasa=rasa, **kwargs)
+
+
+def test_slow_gemini_still_falls_back_to_rasa_within_budget():
+    state = {}
+    resolver = make_resolver("sequential", 5, state, rasa_reserve=0.3, gemini_timeout=20)
+    assert resolver.gemini_deadline(0.6) == 0.3
+
+    answer, source = asyncio.run(resolver.resolve("u1", "question", "web"))
+
+    assert (answer, source) == ("rasa answer", "Rasa")
+    assert resolver.tiers["Gemini"].timeouts == 1
+    assert resolver.timeouts == 0
+
+
+def test_gemini_deadline_never_exceeds_its_own_timeout():
+    resolver = HedgedResolver(budgets={"web": 60}, rasa_reserve=4, gemini_timeout=20)
+    assert resolver.gemini_deadline(60) == 20
+    assert resolver.gemini_deadline(6) == 3
+
+
+def test_hedged_budget_timeout_cancels_gemini_task():
+    state = {}
+    # Hedge delay past the budget: the budget expires while waiting on Gemini alone
+    resolver = make_resolver("hedged", 5, state, hedge_delay=5, rasa_reserve=0, gemini_timeout=20)
+
+    async def run():
+        result = await resolver.resolve("u1", "question", "web")
+        await asyncio.sleep(0.01)
+        # Checked inside the loop: asyncio.run would cancel a leaked task on exit anyway
+        return result, state.get("gemini_cancelled", False)
+
+    assert asyncio.run(run()) == ((None, "Error"), True)
+    assert resolver.timeouts == 1
+
+
+def outcomes(trace):
+    return [(t.name, t.outcome) for t in trace]
+
+
+def test_trace_records_gemini_timeout_and_rasa_fallback():
+    resolver = make_resolver("sequential", 5, {}, rasa_reserve=0.3, gemini_timeout=20)
+    trace = []
+    asyncio.run(resolver.resolve("u1", "question", "web", trace=trace))
+
+    assert outcomes(trace) == [("Gemini", "timeout"), ("Rasa", "answered")]
+    gemini, rasa = trace
+    assert 250 < gemini.wall_ms < 450
+    assert rasa.started_ms >= gemini.wall_ms
+
+
+def test_trace_records_hedge_winner_and_cancelled_loser():
+    resolver = make_resolver("hedged", 5, {}, hedge_delay=0.05, rasa_reserve=0, gemini_timeout=20)
+    trace = []
+    assert asyncio.run(resolver.resolve("u1", "question", "web", trace=trace))[1] == "Rasa"
+
+    assert sorted(outcomes(trace)) == [("Gemini", "cancelled"), ("Rasa", "answered")]
+    rasa = next(t for t in trace if t.name == "Rasa")
+    assert rasa.started_ms >= 50
+
+
+def test_trace_marks_tiers_cut_off_by_the_budget():
+    resolver = make_resolver("hedged", 5, {}, hedge_delay=5, rasa_reserve=0, gemini_timeout=20)
+    trace = []
+    asyncio.run(resolver.resolve("u1", "question", "web", trace=trace))
+
+    assert outcomes(trace) == [("Gemini", "budget_exceeded")]
+    assert trace[0].wall_ms >= 550
@@ -2,12 +2,22 @@ import { useEffect, useState } from "react";
 
 export default function History() {
   const [history, setHistory] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
 
-  useEffect(() => {
-    fetch("http://localhost:8000/history")
+  const loadPage = (cursor) => {
+    const params = new URLSearchParams({ limit: "50" });
+    if (cursor) params.set("cursor", cursor);
+    fetch(`http://localhost:8000/history?${params}`)
       .then((res) => res.json())
-      .then(setHistory)
-      .catch(() => setHistory([]));
+      .then((data) => {
+        setHistory((prev) => (cursor ? [...prev, ...data.items] : data.items));
+        setNextCursor(data.next_cursor);
+      })
+      .catch(() => cursor || setHistory([]));
+  };
+
+  useEffect(() => {
+    loadPage(null);
   }, []);
 
   return (
@@ -31,6 +41,14 @@ export default function History() {
             ))
           )}
         </ul>
+        {nextCursor && (
+          <button
+            onClick={() => loadPage(nextCursor)}
+            className="mt-6 w-full py-2 rounded-2xl border border-gray-200 text-gray-600 hover:bg-gray-50"
+          >
+            Load older broadcasts
+          </button>
+        )}
       </div>
     </div>
   );
@@ -11,6 +11,8 @@ interface BroadcastHistory {
 export default function Alerts() {
   const [text, setText] = useState('🚨 Public Health Alert: Rising dengue cases reported in Khordha district. Please use mosquito nets, remove standing water, and seek medical attention for fever symptoms. Stay safe! 🏥');
   const [channel, setChannel] = useState<'whatsapp' | 'telegram'>('whatsapp');
+  const [region, setRegion] = useState('');
+  const [language, setLanguage] = useState('');
   const [result, setResult] = useState('');
   const [loading, setLoading] = useState(false);
   const [history, setHistory] = useState<BroadcastHistory[]>([]);
@@ -21,10 +23,10 @@ export default function Alerts() {
 
   const fetchHistory = async () => {
     try {
-      const response = await fetch('/api/history');
+      const response = await fetch('/api/history?limit=10');
       if (response.ok) {
         const data = await response.json();
-        setHistory(data.slice(0, 10)); // Show last 10 broadcasts
+        setHistory(data.items); // Show last 10 broadcasts
       }
     } catch (error) {
       console.error('Failed to fetch history:', error);
@@ -44,14 +46,19 @@ export default function Alerts() {
       const response = await fetch('/api/alerts/broadcast', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ text, channel }),
+        // Target one region and/or language; with neither set the alert goes to everyone
+        body: JSON.stringify({
+          text,
+          channel,
+          segments: region.trim() || language ? [{ region: region.trim() || null, language: language || null }] : null,
+        }),
       });
 
       const data = await response.json();
       
       if (response.ok && data.success) {
-        setResult(`✅ Broadcast sent successfully!\n📊 Sent: ${data.sent} | Failed: ${data.failed} | Total: ${data.total}`);
-        fetchHistory(); // Refresh history
+        setResult(`⏳ Broadcast started...\n📊 Sent: ${data.sent} | Failed: ${data.failed} | Total: ${data.total}`);
+        pollBroadcast(data.job_id);
       } else {
         setResult(`❌ Failed to send broadcast: ${data.message || 'Unknown error'}`);
       }
@@ -62,6 +69,28 @@ export default function Alerts() {
     }
   };
 
+  const pollBroadcast = async (jobId: string) => {
+    try {
+      const response = await fetch(`/api/alerts/broadcast/${jobId}`);
+      if (!response.ok) return;
+      const job = await response.json();
+      const counts = `📊 Sent: ${job.sent} | Failed: ${job.failed} | Total: ${job.total}`;
+      if (job.status === 'queued' || job.status === 'running') {
+        setResult(`⏳ Broadcast in progress...\n${counts}`);
+        setTimeout(() => pollBroadcast(jobId), 1000);
+      } else if (job.status === 'completed') {
+        setResult(`✅ Broadcast sent successfully!\n${counts}`);
+        fetchHistory(); // Refresh history
+      } else if (job.status === 'paused') {
+        setResult(`⏸️ Broadcast paused, remaining recipients are kept for resume\n${counts}`);
+      } else {
+        setResult(`❌ Broadcast ${job.status}: ${job.error || 'Unknown error'}\n${counts}`);
+      }
+    } catch (error) {
+      console.error('Failed to fetch broadcast status:', error);
+    }
+  };
+
   const formatTimestamp = (timestamp: string) => {
     return new Date(timestamp).toLocaleString('en-IN', {
       year: 'numeric',
@@ -160,6 +189,37 @@ export default function Alerts() {
               </div>
             </div>
 
+            {/* Audience */}
+            <div className="grid grid-cols-2 gap-4">
+              <div>
+                <label className="block text-sm font-medium text-gray-700 mb-2">
+                  Region (optional)
+                </label>
+                <input
+                  type="text"
+                  value={region}
+                  onChange={(e) => setRegion(e.target.value)}
+                  placeholder="e.g. Khordha"
+                  className="w-full border border-gray-300 rounded-lg p-2 focus:outline-none focus:ring-2 focus:ring-red-600 focus:border-transparent"
+                />
+              </div>
+              <div>
+                <label className="block text-sm font-medium text-gray-700 mb-2">
+                  Language
+                </label>
+                <select
+                  value={language}
+                  onChange={(e) => setLanguage(e.target.value)}
+                  className="w-full border border-gray-300 rounded-lg p-2 focus:outline-none focus:ring-2 focus:ring-red-600 focus:border-transparent"
+                >
+                  <option value="">All languages</option>
+                  <option value="en">English</option>
+                  <option value="hi">Hindi</option>
+                  <option value="or">Odia</option>
+                </select>
+              </div>
+            </div>
+
             {/* Send Button */}
             <button
               onClick={sendBroadcast}
@@ -215,7 +215,7 @@ export default function Dashboard() {
             </div>
             <div>
               <h3 className="text-3xl font-bold text-gray-800">{analytics.recent_broadcasts}</h3>
-              <p className="text-sm text-gray-500">Recent alerts</p>
+              <p className="text-sm text-gray-500">Alerts in the last 7 days</p>
             </div>
           </div>
         </Card>
@@ -7,22 +7,58 @@ interface Subscriber {
   language: string;
 }
 
+const PAGE_SIZE = 100;
+
 export default function Subscribers() {
   const [subscribers, setSubscribers] = useState<Subscriber[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [languageStats, setLanguageStats] = useState<Record<string, number>>({});
+  const [totalSubscribers, setTotalSubscribers] = useState(0);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [searchTerm, setSearchTerm] = useState('');
   const [selectedLanguage, setSelectedLanguage] = useState('all');
 
   useEffect(() => {
-    fetchSubscribers();
+    fetchStats();
   }, []);
 
-  const fetchSubscribers = async () => {
+  // Filters are applied server-side, so changing them restarts from the first page
+  useEffect(() => {
+    fetchSubscribers(null);
+  }, [searchTerm, selectedLanguage]);
+
+  const filterParams = () => {
+    const params = new URLSearchParams();
+    if (selectedLanguage !== 'all') params.set('language', selectedLanguage);
+    if (searchTerm.trim()) params.set('prefix', searchTerm.trim());
+    return params;
+  };
+
+  const fetchStats = async () => {
     try {
-      const response = await fetch('/api/subscribers');
+      const response = await fetch('/api/subscribers/stats');
       if (response.ok) {
         const data = await response.json();
-        setSubscribers(data);
+        setTotalSubscribers(data.total);
+        setLanguageStats(data.by_language);
+      }
+    } catch (error) {
+      console.error('Error fetching subscriber stats:', error);
+    }
+  };
+
+  const fetchSubscribers = async (cursor: string | null) => {
+    const params = filterParams();
+    params.set('limit', String(PAGE_SIZE));
+    if (cursor) params.set('cursor', cursor);
+    if (cursor) setLoadingMore(true);
+    try {
+      const response = await fetch(`/api/subscribers?${params}`);
+      if (response.ok) {
+        const data = await response.json();
+        setSubscribers(prev => (cursor ? [...prev, ...data.items] : data.items));
+        setNextCursor(data.next_cursor);
       } else {
         console.error('Failed to fetch subscribers');
       }
@@ -30,6 +66,7 @@ export default function Subscribers() {
       console.error('Error fetching subscribers:', error);
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -45,6 +82,7 @@ export default function Subscribers() {
 
       if (response.ok) {
         setSubscribers(prev => prev.filter(sub => sub.phone !== phone));
+        fetchStats();
       } else {
         alert('Failed to remove subscriber');
       }
@@ -54,19 +92,6 @@ export default function Subscribers() {
     }
   };
 
-  // Filter subscribers based on search and language
-  const filteredSubscribers = subscribers.filter(subscriber => {
-    const matchesSearch = subscriber.phone.toLowerCase().includes(searchTerm.toLowerCase());
-    const matchesLanguage = selectedLanguage === 'all' || subscriber.language === selectedLanguage;
-    return matchesSearch && matchesLanguage;
-  });
-
-  // Get language statistics
-  const languageStats = subscribers.reduce((acc, sub) => {
-    acc[sub.language] = (acc[sub.language] || 0) + 1;
-    return acc;
-  }, {} as Record<string, number>);
-
   if (loading) {
     return (
       <div className="flex items-center justify-center min-h-[400px]">
@@ -103,7 +128,7 @@ export default function Subscribers() {
               <span className="text-2xl">👥</span>
             </div>
             <div>
-              <h3 className="text-3xl font-bold text-gray-800">{subscribers.length}</h3>
+              <h3 className="text-3xl font-bold text-gray-800">{totalSubscribers}</h3>
               <p className="text-sm text-gray-500">Active users</p>
             </div>
           </div>
@@ -154,7 +179,7 @@ export default function Subscribers() {
             <div className="flex-1">
               <input
                 type="text"
-                placeholder="Search by phone number..."
+                placeholder="Search by phone number prefix..."
                 value={searchTerm}
                 onChange={(e) => setSearchTerm(e.target.value)}
                 className="w-full border border-gray-300 rounded-lg px-4 py-2 focus:outline-none focus:ring-2 focus:ring-blue-600 focus:border-transparent"
@@ -175,8 +200,24 @@ export default function Subscribers() {
           </div>
 
           {/* Results Summary */}
-          <div className="text-sm text-gray-600">
-            Showing {filteredSubscribers.length} of {subscribers.length} subscribers
+          <div className="flex items-center justify-between text-sm text-gray-600">
+            <span>
+              Showing {subscribers.length} of {totalSubscribers} subscribers
+            </span>
+            <span className="flex gap-4">
+              <a
+                href={`/api/subscribers/export?format=csv&${filterParams()}`}
+                className="text-blue-600 hover:text-blue-800 font-medium"
+              >
+                ⬇️ Export CSV
+              </a>
+              <a
+                href={`/api/subscribers/export?${filterParams()}`}
+                className="text-blue-600 hover:text-blue-800 font-medium"
+              >
+                ⬇️ Export NDJSON
+              </a>
+            </span>
           </div>
 
           {/* Subscribers Table */}
@@ -196,7 +237,7 @@ export default function Subscribers() {
                 </tr>
               </thead>
               <tbody className="bg-white divide-y divide-gray-200">
-                {filteredSubscribers.length === 0 ? (
+                {subscribers.length === 0 ? (
                   <tr>
                     <td colSpan={3} className="px-6 py-12 text-center text-gray-500">
                       <div className="flex flex-col items-center">
@@ -212,7 +253,7 @@ export default function Subscribers() {
                     </td>
                   </tr>
                 ) : (
-                  filteredSubscribers.map((subscriber) => (
+                  subscribers.map((subscriber) => (
                     <tr key={subscriber.phone} className="hover:bg-gray-50 transition-colors duration-200">
                       <td className="px-6 py-4 whitespace-nowrap">
                         <div className="flex items-center">
@@ -244,7 +285,18 @@ export default function Subscribers() {
             </table>
           </div>
 
-          {/* Pagination could be added here for large datasets */}
+          {/* Keyset pagination */}
+          {nextCursor && (
+            <div className="flex justify-center">
+              <button
+                onClick={() => fetchSubscribers(nextCursor)}
+                disabled={loadingMore}
+                className="px-4 py-2 rounded-lg border border-gray-300 text-gray-700 hover:bg-gray-50 disabled:opacity-50"
+              >
+                {loadingMore ? 'Loading...' : 'Load more'}
+              </button>
+            </div>
+          )}
         </div>
       </Card>
     </div>
@@ -1,14 +1,14 @@
 from __future__ import annotations
-import json
-import os
 import re
 from typing import Any, Dict, List, Text
 
-import requests
 from rasa_sdk import Action, Tracker
 from rasa_sdk.executor import CollectingDispatcher
 from rasa_sdk.events import SlotSet
 
+from .backend_client import set_language, subscriptions, unsubscribe
+from .data_loaders import VACCINE_SCHEDULE_HEADERS, outbreaks, region_key, vaccine_schedule
+
 RASA_LANGS = {"en": "English", "hi": "Hindi", "or": "Odia"}
 
 
@@ -29,11 +29,13 @@ class ActionSetLanguage(Action):
     def name(self) -> Text:
         return "action_set_language"
 
-    def run(
+    async def run(
         self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]
     ) -> List[Dict[Text, Any]]:
         last = tracker.latest_message.get("text") or ""
         lang = _lang_from_text(last)
+        # The slot only lives in Rasa's tracker; the backend session serves the other tiers
+        await set_language(tracker.sender_id, lang)
         dispatcher.utter_message(text=f"Language set to {RASA_LANGS.get(lang, 'English')}.")
         return [SlotSet("language", lang)]
 
@@ -94,21 +96,11 @@ class ActionVaccineSchedule(Action):
         elif any(w in text for w in ["adult", "वयस्क", "ବୟସ୍କ"]):
             stage = "adult"
 
-        path = os.getenv("VACCINE_SCHEDULE_PATH", "vaccines/vaccine_schedule.json")
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            items = data.get(stage, [])
-            lines = [f"- {x['age']}: {x['vaccine']}" for x in items]
-            body = "\n".join(lines) or "No data."
+            schedules = vaccine_schedule.get()
+            msg = schedules.get((stage, lang)) or schedules[(stage, "en")]
         except Exception:
-            body = "Schedule not available."
-
-        msg = {
-            "en": f"Recommended {stage} vaccine schedule:\n{body}",
-            "hi": f"अनुमोदित {stage} टीकाकरण समय-सारणी:\n{body}",
-            "or": f"ସୁପାରିଶୀତ {stage} ଟୀକାକରଣ ସମୟସୂଚୀ:\n{body}",
-        }[lang]
+            msg = VACCINE_SCHEDULE_HEADERS[lang].format(stage=stage, body="Schedule not available.")
         dispatcher.utter_message(text=_safe_text(msg))
         return []
 
@@ -124,17 +116,12 @@ class ActionOutbreaks(Action):
             (e.get("value") for e in tracker.latest_message.get("entities", []) if e.get("entity") == "location"),
             None,
         )
-        feed = os.getenv("PUBLIC_HEALTH_ALERTS_FEED_FILE", "data/mock_outbreaks.json")
         try:
-            with open(feed, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            alerts = data.get("alerts", [])
-            relevant = [a for a in alerts if not loc or a["region"].lower() == loc.lower()]
+            relevant = outbreaks.get().get(region_key(loc) if loc else "")
             if not relevant:
                 dispatcher.utter_message(text="No active alerts found for your region at the moment.")
                 return []
-            resp = [f"{a['region']}: {a['disease']} ({a['severity']}). Advice: {a['advice']}" for a in relevant]
-            dispatcher.utter_message(text="\n".join(resp))
+            dispatcher.utter_message(text="\n".join(relevant))
         except Exception:
             dispatcher.utter_message(text="Could not fetch outbreak data right now.")
         return []
@@ -144,7 +131,7 @@ class ActionSubscribe(Action):
     def name(self) -> Text:
         return "action_subscribe"
 
-    def run(
+    async def run(
         self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]
     ) -> List[Dict[Text, Any]]:
         phone = tracker.get_slot("phone")
@@ -159,15 +146,9 @@ class ActionSubscribe(Action):
             )
             return []
 
-        backend = os.getenv("BACKEND_HOST", "http://localhost:8000")
-        try:
-            requests.post(
-                f"{backend}/subscribers",
-                json={"phone": phone, "language": tracker.get_slot("language") or "en"},
-                timeout=5,
-            )
+        if await subscriptions.subscribe(phone, tracker.get_slot("language") or "en"):
             dispatcher.utter_message(text=f"Subscribed {phone} for health alerts on SMS/WhatsApp.")
-        except Exception:
+        else:
             dispatcher.utter_message(text="Couldn't subscribe right now. Please try again later.")
 
         return [SlotSet("phone", phone)]
@@ -177,18 +158,15 @@ class ActionUnsubscribe(Action):
     def name(self) -> Text:
         return "action_unsubscribe"
 
-    def run(
+    async def run(
         self, dispatcher: CollectingDispatcher, tracker: Tracker, domain: Dict[Text, Any]
     ) -> List[Dict[Text, Any]]:
         phone = tracker.get_slot("phone")
-        backend = os.getenv("BACKEND_HOST", "http://localhost:8000")
-        try:
-            if phone:
-                requests.delete(f"{backend}/subscribers/{phone}", timeout=5)
-                dispatcher.utter_message(text=f"Unsubscribed {phone}.")
-            else:
-                dispatcher.utter_message(text="No phone on file. Send 'unsubscribe +<number>' to remove.")
-        except Exception:
+        if not phone:
+            dispatcher.utter_message(text="No phone on file. Send 'unsubscribe +<number>' to remove.")
+        elif await unsubscribe(phone):
+            dispatcher.utter_message(text=f"Unsubscribed {phone}.")
+        else:
             dispatcher.utter_message(text="Couldn't unsubscribe right now.")
         return []
 
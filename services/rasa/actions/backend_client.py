@@ -0,0 +1,126 @@
+"""
+Async access to the backend API from the action server.
+
+One pooled httpx.AsyncClient is shared by every action for the life of the action
+server process, so calls reuse keep-alive connections and never block the event loop.
+Subscriptions go through SubscriptionBatcher, which coalesces the subscribe requests
+arriving within a short window into one bulk import call.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from typing import List, Optional, Set, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+BACKEND_HOST = os.getenv("BACKEND_HOST", "http://localhost:8000")
+BACKEND_TIMEOUT = float(os.getenv("BACKEND_TIMEOUT", "5"))
+BACKEND_MAX_CONNECTIONS = int(os.getenv("BACKEND_MAX_CONNECTIONS", "20"))
+# Subscribe requests are held up to this long (or until the batch is full) and sent together
+SUBSCRIBE_BATCH_WINDOW_MS = float(os.getenv("SUBSCRIBE_BATCH_WINDOW_MS", "50"))
+SUBSCRIBE_BATCH_MAX = int(os.getenv("SUBSCRIBE_BATCH_MAX", "500"))
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client, created on first use inside the action server's event loop"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=BACKEND_HOST,
+            timeout=BACKEND_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=BACKEND_MAX_CONNECTIONS,
+                max_keepalive_connections=BACKEND_MAX_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def unsubscribe(phone: str) -> bool:
+    try:
+        response = await get_client().delete(f"/subscribers/{phone}")
+        return response.is_success
+    except httpx.HTTPError as e:
+        logger.warning(f"Unsubscribe call failed: {e}")
+        return False
+
+
+async def set_language(sender: str, language: str) -> bool:
+    """Tell the backend the sender's chosen language, so the FAQ and Gemini tiers reply in it"""
+    try:
+        response = await get_client().put(f"/sessions/{sender}/language", json={"language": language})
+        return response.is_success
+    except httpx.HTTPError as e:
+        logger.warning(f"Language sync failed: {e}")
+        return False
+
+
+class SubscriptionBatcher:
+    """
+    Coalesces concurrent subscribe calls into POST /subscribers/import (NDJSON).
+
+    The first pending request starts a `window` second timer; the batch is sent when
+    it fires or when `max_batch` requests are waiting. Each caller gets True once the
+    backend accepted its row, False if the row was rejected or the call failed.
+    """
+
+    def __init__(self, window: float = SUBSCRIBE_BATCH_WINDOW_MS / 1000, max_batch: int = SUBSCRIBE_BATCH_MAX):
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.batches = 0
+        self.subscriptions = 0
+        self._pending: List[Tuple[str, str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._sending: Set[asyncio.Task] = set()
+
+    async def subscribe(self, phone: str, language: str = "en") -> bool:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((phone, language or "en", future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        body = "".join(json.dumps({"phone": phone, "language": language}) + "\n" for phone, language, _ in batch)
+        try:
+            response = await get_client().post(
+                "/subscribers/import",
+                params={"format": "ndjson"},
+                content=body.encode(),
+                headers={"Content-Type": "application/x-ndjson"},
+            )
+            response.raise_for_status()
+            # Import errors are reported by 1-based row, i.e. position in this batch
+            rejected = {error["row"] for error in response.json().get("errors", [])}
+            results = [row not in rejected for row in range(1, len(batch) + 1)]
+        except Exception as e:
+            logger.warning(f"Bulk subscribe of {len(batch)} numbers failed: {e}")
+            results = [False] * len(batch)
+        self.batches += 1
+        self.subscriptions += len(batch)
+        for (_, _, future), ok in zip(batch, results):
+            if not future.done():
+                future.set_result(ok)
+
+
+subscriptions = SubscriptionBatcher()
@@ -0,0 +1,114 @@
+"""
+JSON data files used by the custom actions, parsed once and kept as lookup indexes.
+
+Each loader re-reads its file only when the file's mtime or size changes (checked at
+most every DATA_RELOAD_CHECK_SECONDS) and swaps the rebuilt index in as a single
+reference, so a turn always sees either the old or the new data, never a mix.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RELOAD_CHECK_SECONDS = float(os.getenv("DATA_RELOAD_CHECK_SECONDS", "2"))
+
+VACCINE_STAGES = ("infant", "child", "adolescent", "adult")
+VACCINE_SCHEDULE_HEADERS = {
+    "en": "Recommended {stage} vaccine schedule:\n{body}",
+    "hi": "अनुमोदित {stage} टीकाकरण समय-सारणी:\n{body}",
+    "or": "ସୁପାରିଶୀତ {stage} ଟୀକାକରଣ ସମୟସୂଚୀ:\n{body}",
+}
+
+
+class CachedJsonLoader(Generic[T]):
+    """Parses a JSON file with `build` into an index, rebuilding it when the file changes"""
+
+    def __init__(self, path: str, build: Callable[[Any], T], check_interval: float = RELOAD_CHECK_SECONDS):
+        self.path = path
+        self.build = build
+        self.check_interval = check_interval
+        self.reloads = 0
+        # (file stamp, index); replaced as a whole, never mutated
+        self._snapshot: Optional[Tuple[Tuple[float, int], T]] = None
+        self._failed_stamp: Optional[Tuple[float, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        """Current index; raises if the file has never been loaded successfully"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot[1]
+        return self._refresh()
+
+    def _refresh(self) -> T:
+        with self._lock:
+            self._checked_at = time.monotonic()
+            snapshot = self._snapshot
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                if snapshot is None:
+                    raise
+                # Keep serving the last good data if the file briefly disappears
+                return snapshot[1]
+            stamp = (st.st_mtime, st.st_size)
+            if snapshot is not None and (stamp == snapshot[0] or stamp == self._failed_stamp):
+                return snapshot[1]
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    index = self.build(json.load(f))
+            except Exception as e:
+                if snapshot is None:
+                    raise
+                logger.warning(f"Keeping previous {self.path}, reload failed: {e}")
+                self._failed_stamp = stamp
+                return snapshot[1]
+            self._snapshot = (stamp, index)
+            self._failed_stamp = None
+            self.reloads += 1
+            return index
+
+
+def region_key(region: str) -> str:
+    return " ".join(region.split()).casefold()
+
+
+def index_outbreaks(data: dict) -> Dict[str, List[str]]:
+    """
+    Region key -> pre-rendered alert lines; the "" key holds every alert
+    (used when the user didn't name a region).
+    """
+    index: Dict[str, List[str]] = {"": []}
+    for alert in data.get("alerts", []):
+        line = f"{alert['region']}: {alert['disease']} ({alert['severity']}). Advice: {alert['advice']}"
+        index.setdefault(region_key(alert["region"]), []).append(line)
+        index[""].append(line)
+    return index
+
+
+def index_vaccine_schedule(data: dict) -> Dict[Tuple[str, str], str]:
+    """(stage, language) -> the complete localized schedule message"""
+    index = {}
+    for stage in set(VACCINE_STAGES) | set(data):
+        lines = [f"- {x['age']}: {x['vaccine']}" for x in data.get(stage, [])]
+        body = "\n".join(lines) or "No data."
+        for lang, header in VACCINE_SCHEDULE_HEADERS.items():
+            index[(stage, lang)] = header.format(stage=stage, body=body)
+    return index
+
+
+outbreaks = CachedJsonLoader(
+    os.getenv("PUBLIC_HEALTH_ALERTS_FEED_FILE", "data/mock_outbreaks.json"), index_outbreaks
+)
+vaccine_schedule = CachedJsonLoader(
+    os.getenv("VACCINE_SCHEDULE_PATH", "vaccines/vaccine_schedule.json"), index_vaccine_schedule
+)
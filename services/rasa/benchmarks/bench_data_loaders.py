@@ -0,0 +1,67 @@
+"""
+Per-turn cost of action_outbreaks: reading and scanning the feed on every turn (old)
+vs the cached region index from actions.data_loaders, as the feed grows.
+
+Writes synthetic feeds to a temporary directory. Run from services/rasa:
+
+    python -m benchmarks.bench_data_loaders --alerts 100 10000 100000 --regions 700
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from actions.data_loaders import CachedJsonLoader, index_outbreaks, region_key
+
+
+def old_turn(path: str, loc: str):
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    alerts = data.get("alerts", [])
+    relevant = [a for a in alerts if not loc or a["region"].lower() == loc.lower()]
+    return [f"{a['region']}: {a['disease']} ({a['severity']}). Advice: {a['advice']}" for a in relevant]
+
+
+def write_feed(path: str, alerts: int, regions: int):
+    feed = {"alerts": [
+        {"region": f"District {i % regions}", "disease": "Dengue", "severity": "medium",
+         "advice": "Use mosquito repellents, dry stagnant water, sleep under nets."}
+        for i in range(alerts)
+    ]}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(feed, f)
+
+
+def per_turn_us(fn, turns: int) -> float:
+    start = time.perf_counter()
+    for _ in range(turns):
+        fn()
+    return (time.perf_counter() - start) / turns * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--alerts", type=int, nargs="+", default=[100, 10000, 100000])
+    parser.add_argument("--regions", type=int, default=700)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "outbreaks.json")
+    loc = "district 7"
+    for alerts in args.alerts:
+        write_feed(path, alerts, args.regions)
+        loader = CachedJsonLoader(path, index_outbreaks)
+        expected = old_turn(path, loc)
+        assert loader.get()[region_key(loc)] == expected
+        turns = max(5, 200000 // alerts)
+        old = per_turn_us(lambda: old_turn(path, loc), turns)
+        new = per_turn_us(lambda: loader.get()[region_key(loc)], 100000)
+        print(f"{alerts:7d} alerts: load + scan {old:12.1f} us/turn   cached index {new:6.2f} us/turn  "
+              f"({len(expected)} matching)")
+
+    # A changed file is picked up on the next check
+    loader = CachedJsonLoader(path, index_outbreaks, check_interval=0)
+    before = len(loader.get()[""])
+    write_feed(path, 10, args.regions)
+    os.utime(path, (time.time() + 1, time.time() + 1))
+    print(f"reload after change: {before} -> {len(loader.get()[''])} alerts (reloads={loader.reloads})")
@@ -0,0 +1,81 @@
+"""
+Subscription rush through the action server's backend calls: the old blocking
+per-request POST /subscribers (new connection per call, one at a time since a sync
+action blocks the action server's loop) vs the shared async client with batched
+subscriptions.
+
+Starts the backend with uvicorn (from ../backend) on a temporary SQLite file.
+Run from services/rasa:
+
+    python -m benchmarks.bench_subscribe --requests 2000
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "backend")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_backend(port: int) -> subprocess.Popen:
+    env = {**os.environ, "SQLITE_DB": os.path.join(tempfile.mkdtemp(), "bench.db")}
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    for _ in range(200):
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.05)
+    server.kill()
+    raise RuntimeError("backend did not start")
+
+
+def blocking_rush(base: str, n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        httpx.post(f"{base}/subscribers", json={"phone": f"91{8000000000 + i}", "language": "en"}, timeout=5)
+    return time.perf_counter() - start
+
+
+async def batched_rush(n: int):
+    from actions.backend_client import subscriptions
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(subscriptions.subscribe(f"91{9000000000 + i}", "hi") for i in range(n)))
+    return time.perf_counter() - start, sum(results), subscriptions.batches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    os.environ["BACKEND_HOST"] = base
+    server = start_backend(port)
+    try:
+        elapsed = blocking_rush(base, args.requests)
+        print(f"blocking per-request POST : {args.requests / elapsed:9.1f} subscriptions/s  ({elapsed:.2f}s)")
+        elapsed, accepted, batches = asyncio.run(batched_rush(args.requests))
+        print(f"async batched import      : {args.requests / elapsed:9.1f} subscriptions/s  "
+              f"({elapsed:.2f}s, accepted={accepted}, backend calls={batches})")
+        print(f"subscribers in backend    : {httpx.get(f'{base}/subscribers/stats').json()['total']}")
+    finally:
+        server.terminate()
+        server.wait(timeout=10)